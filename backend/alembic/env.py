@@ -18,7 +18,9 @@ db_url = (
 config.set_main_option("sqlalchemy.url", db_url)
 
 # Import all models so autogenerate can detect them
-from app.models import User, WatchlistItem, PriceSnapshot, Notification  # noqa: F401, E402
+from app.models import (  # noqa: F401, E402
+    User, WatchlistItem, PriceSnapshot, Notification, AlertOutbox, LineBindingCode,
+)
 from app.extensions import db  # noqa: E402
 
 target_metadata = db.metadata
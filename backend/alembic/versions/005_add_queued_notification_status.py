@@ -0,0 +1,25 @@
+"""add queued to notification_status
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ALTER TYPE ... ADD VALUE cannot run inside a transaction block on older PostgreSQL
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE notification_status ADD VALUE IF NOT EXISTS 'queued' BEFORE 'sent'")
+
+
+def downgrade() -> None:
+    # PostgreSQL cannot drop enum values; just make sure nothing uses it
+    op.execute("UPDATE notifications SET status = 'failed' WHERE status = 'queued'")
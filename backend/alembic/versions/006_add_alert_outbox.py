@@ -0,0 +1,44 @@
+"""add alert_outbox
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "alert_outbox",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("idempotency_key", sa.String(36), unique=True, nullable=False),
+        sa.Column("recipients", sa.JSON, nullable=False),
+        sa.Column("messages", sa.Text, nullable=False),
+        sa.Column("notification_ids", sa.JSON, nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("pending", "sending", "sent", "failed", name="outbox_status"),
+            server_default="pending",
+            nullable=False,
+        ),
+        sa.Column("attempts", sa.Integer, server_default=sa.text("0"), nullable=False),
+        sa.Column("available_at", sa.DateTime, server_default=sa.func.now(), nullable=False),
+        sa.Column("created_at", sa.DateTime, server_default=sa.func.now()),
+        sa.Column("sent_at", sa.DateTime, nullable=True),
+        sa.Column("last_error", sa.Text, nullable=True),
+    )
+    op.create_index("idx_outbox_due", "alert_outbox", ["status", "available_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_outbox_due", table_name="alert_outbox")
+    op.drop_table("alert_outbox")
+    sa.Enum(name="outbox_status").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,36 @@
+"""add line_binding_codes
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "line_binding_codes",
+        sa.Column("code", sa.String(6), primary_key=True),
+        sa.Column(
+            "user_id",
+            sa.Integer,
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=False,
+            unique=True,
+        ),
+        sa.Column("expires_at", sa.DateTime, nullable=False),
+    )
+    op.create_index("ix_line_binding_codes_expires_at", "line_binding_codes", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_line_binding_codes_expires_at", table_name="line_binding_codes")
+    op.drop_table("line_binding_codes")
@@ -0,0 +1,38 @@
+"""add notifications.user_id and keyset index
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("notifications", sa.Column("user_id", sa.Integer, nullable=True))
+    op.execute(
+        "UPDATE notifications SET user_id = watchlist_items.user_id "
+        "FROM watchlist_items WHERE watchlist_items.id = notifications.watchlist_item_id"
+    )
+    op.alter_column("notifications", "user_id", nullable=False)
+    op.create_foreign_key(
+        "notifications_user_id_fkey", "notifications", "users", ["user_id"], ["id"]
+    )
+    op.create_index(
+        "idx_user_sent_id",
+        "notifications",
+        ["user_id", sa.text("sent_at DESC"), sa.text("id DESC")],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_user_sent_id", table_name="notifications")
+    op.drop_constraint("notifications_user_id_fkey", "notifications", type_="foreignkey")
+    op.drop_column("notifications", "user_id")
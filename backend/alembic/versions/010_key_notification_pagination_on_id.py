@@ -0,0 +1,29 @@
+"""key notification pagination on id alone
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index("idx_user_sent_id", table_name="notifications")
+    op.create_index("idx_user_id_desc", "notifications", ["user_id", sa.text("id DESC")])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_user_id_desc", table_name="notifications")
+    op.create_index(
+        "idx_user_sent_id",
+        "notifications",
+        ["user_id", sa.text("sent_at DESC"), sa.text("id DESC")],
+    )
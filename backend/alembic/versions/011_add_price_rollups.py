@@ -0,0 +1,48 @@
+"""add price_rollups
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "011"
+down_revision: Union[str, None] = "010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "price_rollups",
+        sa.Column(
+            "watchlist_item_id",
+            sa.Integer,
+            sa.ForeignKey("watchlist_items.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("granularity", sa.String(4), primary_key=True),
+        sa.Column("bucket_start", sa.DateTime, primary_key=True),
+        sa.Column("min_price", sa.Integer, nullable=False),
+        sa.Column("min_at", sa.DateTime, nullable=False),
+        sa.Column("max_price", sa.Integer, nullable=False),
+        sa.Column("max_at", sa.DateTime, nullable=False),
+        sa.Column("snapshot_count", sa.Integer, nullable=False),
+    )
+    for granularity in ("hour", "day"):
+        op.execute(
+            "INSERT INTO price_rollups "
+            "SELECT watchlist_item_id, '{g}', date_trunc('{g}', checked_at), "
+            "min(lowest_price), (array_agg(checked_at ORDER BY lowest_price, checked_at))[1], "
+            "max(lowest_price), (array_agg(checked_at ORDER BY lowest_price DESC, checked_at))[1], "
+            "count(*) "
+            "FROM price_snapshots WHERE lowest_price IS NOT NULL "
+            "GROUP BY watchlist_item_id, date_trunc('{g}', checked_at)".format(g=granularity)
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("price_rollups")
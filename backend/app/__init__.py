@@ -9,9 +9,18 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    from app.json_provider import OrjsonProvider
+    app.json = OrjsonProvider(app)
+
     CORS(app)
     db.init_app(app)
 
+    from app.auth import init_user_cache
+    init_user_cache(app)
+
+    from app.compression import init_compression
+    init_compression(app)
+
     from app.routes.auth import auth_bp
     from app.routes.cards import cards_bp
     from app.routes.watchlist import watchlist_bp
@@ -24,7 +33,14 @@ def create_app(config_class=Config):
     app.register_blueprint(notifications_bp, url_prefix="/api/notifications")
     app.register_blueprint(line_bp, url_prefix="/api/line")
 
-    from app.scheduler import init_scheduler
-    init_scheduler(app)
+    @app.get("/api/health")
+    def health():
+        # Liveness only: no database round trip
+        return {"status": "ok"}
+
+    # Background jobs normally run in `python -m app.worker`
+    if app.config["SCHEDULER_ENABLED"]:
+        from app.scheduler import init_scheduler
+        init_scheduler(app)
 
     return app
@@ -1,4 +1,8 @@
 """JWT utilities and login_required decorator."""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from functools import wraps
 
@@ -21,6 +25,116 @@ def decode_jwt(token: str) -> dict:
     return jwt.decode(token, current_app.config["JWT_SECRET_KEY"], algorithms=["HS256"])
 
 
+@dataclass(frozen=True)
+class CachedUser:
+    """Read-only snapshot of the fields routes need from the authenticated user.
+
+    Routes that modify the user load the ORM row with ``load()`` and call
+    ``invalidate_user`` after committing.
+    """
+    id: int
+    is_admin: bool
+    line_user_id: str | None
+    alert_digest: bool
+    data: dict
+
+    @classmethod
+    def from_user(cls, user) -> "CachedUser":
+        return cls(
+            id=user.id,
+            is_admin=user.is_admin,
+            line_user_id=user.line_user_id,
+            alert_digest=user.alert_digest,
+            data=user.to_dict(),
+        )
+
+    def to_dict(self) -> dict:
+        return dict(self.data)
+
+    def load(self):
+        from app.models import User
+        return User.query.get(self.id)
+
+
+class UserCache:
+    """Per-process LRU cache of CachedUser with a short TTL.
+
+    Invalidation only reaches the current process; other workers pick up
+    changes, including deleted users, once their entry expires.
+    """
+
+    def __init__(self, ttl_seconds: float = 30.0, max_size: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[int, tuple[float, CachedUser]] = OrderedDict()
+
+    def get(self, user_id: int) -> CachedUser | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return entry[1]
+
+    def put(self, user: CachedUser):
+        if self.ttl_seconds <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self.ttl_seconds, user)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+def init_user_cache(app):
+    user_cache.ttl_seconds = app.config["USER_CACHE_TTL_SECONDS"]
+    user_cache.max_size = app.config["USER_CACHE_MAX_SIZE"]
+
+
+def invalidate_user(user_id: int):
+    """Drop ``user_id`` from the cache; call after committing changes to the user."""
+    user_cache.invalidate(user_id)
+
+
+def load_current_user(user_id: int) -> CachedUser | None:
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+    return refresh_user(user_id)
+
+
+def refresh_user(user_id: int) -> CachedUser | None:
+    """Read ``user_id`` from the database, bypassing and then updating the cache.
+
+    For responses that must reflect writes made by other processes, such as
+    the LINE binding the webhook consumer records.
+    """
+    from app.models import User
+    row = User.query.get(user_id)
+    if row is None:
+        user_cache.invalidate(user_id)
+        return None
+    user = CachedUser.from_user(row)
+    user_cache.put(user)
+    return user
+
+
 def login_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -36,8 +150,7 @@ def login_required(f):
         except jwt.InvalidTokenError:
             return jsonify({"error": "Invalid token"}), 401
 
-        from app.models import User
-        user = User.query.get(int(payload["sub"]))
+        user = load_current_user(int(payload["sub"]))
         if not user:
             return jsonify({"error": "User not found"}), 401
 
@@ -0,0 +1,193 @@
+"""Negotiated gzip / brotli response compression.
+
+``init_compression`` installs an ``after_request`` hook that compresses JSON
+(and NDJSON) responses above ``COMPRESS_MIN_SIZE`` bytes with the best
+encoding the client accepts. Streamed responses are compressed chunk by chunk
+and flushed after every chunk, so streaming endpoints keep streaming.
+
+``ResponseCache`` is for shared, cacheable proxy responses (card search and
+listings): the body is serialized and compressed once per encoding when it is
+stored, and later hits serve the stored bytes.
+"""
+import gzip
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; fall back to gzip only
+    brotli = None
+
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "application/x-ndjson"}
+
+
+def negotiate_encoding() -> str | None:
+    """Pick the preferred encoding from the request's Accept-Encoding, if any."""
+    accepted = request.accept_encodings
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        q = accepted[encoding]
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    config = current_app.config
+    if encoding == "br":
+        return brotli.compress(data, quality=config["COMPRESS_BROTLI_QUALITY"])
+    return gzip.compress(data, compresslevel=config["COMPRESS_GZIP_LEVEL"])
+
+
+class StreamCompressor:
+    """Incremental compressor that flushes after every chunk."""
+
+    def __init__(self, encoding: str, gzip_level: int = 6, brotli_quality: int = 4):
+        self.encoding = encoding
+        if encoding == "br":
+            self._c = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._c = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # 31 = gzip container
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._c.process(chunk) + self._c.flush()
+        return self._c.compress(chunk) + self._c.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._c.finish()
+        return self._c.flush()
+
+    def wrap(self, chunks):
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            if chunk:
+                yield self.compress(chunk)
+        yield self.finish()
+
+
+def _etag_with_encoding(response, encoding: str):
+    # A strong ETag names one byte-exact representation, so tag each encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f"{etag}-{encoding}")
+
+
+def compress_response(response):
+    if (
+        response.status_code < 200
+        or response.status_code in (204, 304)
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        or request.method == "HEAD"
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+
+    config = current_app.config
+    if response.is_streamed:
+        compressor = StreamCompressor(
+            encoding, config["COMPRESS_GZIP_LEVEL"], config["COMPRESS_BROTLI_QUALITY"]
+        )
+        response.response = compressor.wrap(response.response)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < config["COMPRESS_MIN_SIZE"]:
+            return response
+        response.set_data(compress(data, encoding))
+
+    response.headers["Content-Encoding"] = encoding
+    _etag_with_encoding(response, encoding)
+    return response
+
+
+def init_compression(app):
+    if app.config["COMPRESS_ENABLED"]:
+        app.after_request(compress_response)
+
+
+class _CachedBody:
+    __slots__ = ("expires_at", "status", "bodies")
+
+    def __init__(self, expires_at: float, status: int, bodies: dict[str | None, bytes]):
+        self.expires_at = expires_at
+        self.status = status
+        self.bodies = bodies
+
+
+class ResponseCache:
+    """Small TTL + LRU cache of JSON responses, stored pre-compressed."""
+
+    def __init__(self, ttl_seconds: float = 60.0, max_entries: int = 512):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, _CachedBody] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, key: str):
+        """Return a response for ``key`` in the negotiated encoding, or None."""
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return self._respond(entry)
+
+    def store(self, key: str, payload, status: int = 200):
+        """Serialize ``payload``, cache it pre-compressed and return the response."""
+        data = current_app.json.dumps(payload).encode("utf-8")
+        if not self.enabled:
+            return current_app.response_class(data, status=status, mimetype="application/json")
+
+        bodies: dict[str | None, bytes] = {None: data}
+        if current_app.config["COMPRESS_ENABLED"] and len(data) >= current_app.config["COMPRESS_MIN_SIZE"]:
+            for encoding in ENCODINGS:
+                bodies[encoding] = compress(data, encoding)
+
+        entry = _CachedBody(time.monotonic() + self.ttl_seconds, status, bodies)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return self._respond(entry)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @staticmethod
+    def _respond(entry: _CachedBody):
+        encoding = negotiate_encoding() if len(entry.bodies) > 1 else None
+        response = current_app.response_class(
+            entry.bodies.get(encoding, entry.bodies[None]),
+            status=entry.status,
+            mimetype="application/json",
+        )
+        response.vary.add("Accept-Encoding")
+        if encoding is not None and encoding in entry.bodies:
+            response.headers["Content-Encoding"] = encoding
+        return response
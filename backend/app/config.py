@@ -16,13 +16,88 @@ class Config:
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Connection pool, per process: every gunicorn worker has its own, so
+    # keep pool_size >= GUNICORN_THREADS and
+    # workers * (pool_size + max_overflow) below Postgres max_connections
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "5")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+    }
+
     LINE_CHANNEL_ACCESS_TOKEN = os.getenv("LINE_CHANNEL_ACCESS_TOKEN", "")
     LINE_CHANNEL_SECRET = os.getenv("LINE_CHANNEL_SECRET", "")
 
+    # LINE webhook event consumer
+    LINE_WEBHOOK_WORKERS = int(os.getenv("LINE_WEBHOOK_WORKERS", "4"))
+    LINE_WEBHOOK_QUEUE_SIZE = int(os.getenv("LINE_WEBHOOK_QUEUE_SIZE", "1000"))
+
+    # LINE push dispatch worker pool
+    LINE_DISPATCH_WORKERS = int(os.getenv("LINE_DISPATCH_WORKERS", "4"))
+    LINE_DISPATCH_MAX_RETRIES = int(os.getenv("LINE_DISPATCH_MAX_RETRIES", "5"))
+    LINE_DISPATCH_BACKOFF_SECONDS = float(os.getenv("LINE_DISPATCH_BACKOFF_SECONDS", "1"))
+    LINE_DISPATCH_BACKOFF_MAX_SECONDS = float(os.getenv("LINE_DISPATCH_BACKOFF_MAX_SECONDS", "60"))
+
+    # Alert outbox relay
+    ALERT_OUTBOX_BATCH_SIZE = int(os.getenv("ALERT_OUTBOX_BATCH_SIZE", "100"))
+    ALERT_OUTBOX_LEASE_SECONDS = int(os.getenv("ALERT_OUTBOX_LEASE_SECONDS", "300"))
+    ALERT_OUTBOX_POLL_SECONDS = float(os.getenv("ALERT_OUTBOX_POLL_SECONDS", "30"))
+    # Claims before a retryably failing row is marked failed, and the backoff between them
+    ALERT_OUTBOX_MAX_ATTEMPTS = int(os.getenv("ALERT_OUTBOX_MAX_ATTEMPTS", "10"))
+    ALERT_OUTBOX_RETRY_SECONDS = float(os.getenv("ALERT_OUTBOX_RETRY_SECONDS", "60"))
+    ALERT_OUTBOX_RETRY_MAX_SECONDS = float(os.getenv("ALERT_OUTBOX_RETRY_MAX_SECONDS", "3600"))
+
     PRICE_CHECK_INTERVAL_MINUTES = int(os.getenv("PRICE_CHECK_INTERVAL_MINUTES", "10"))
 
+    # Variant fetches in flight during a price check sweep
+    PRICE_CHECK_FETCH_WORKERS = int(os.getenv("PRICE_CHECK_FETCH_WORKERS", "4"))
+    MAINTENANCE_INTERVAL_MINUTES = int(os.getenv("MAINTENANCE_INTERVAL_MINUTES", "60"))
+    # Delivered outbox rows are deleted after this long; failed rows are kept
+    OUTBOX_RETENTION_DAYS = int(os.getenv("OUTBOX_RETENTION_DAYS", "7"))
+
+    # Background worker (python -m app.worker)
+    WORKER_THREADS = int(os.getenv("WORKER_THREADS", "4"))
+    WORKER_SHUTDOWN_TIMEOUT = float(os.getenv("WORKER_SHUTDOWN_TIMEOUT", "30"))
+
+    # Run the background jobs inside the web process instead of the worker,
+    # for single-process setups. Across every worker and replica sharing the
+    # database, only the process holding the scheduler's Postgres advisory
+    # lock runs them
+    SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "false").lower() == "true"
+
+    # Raw listing archive (Parquet); disabled when empty
+    LISTING_ARCHIVE_DIR = os.getenv("LISTING_ARCHIVE_DIR", "")
+    LISTING_ARCHIVE_COMPRESSION = os.getenv("LISTING_ARCHIVE_COMPRESSION", "zstd")
+
     LINE_BOT_ADD_FRIEND_URL = os.getenv("LINE_BOT_ADD_FRIEND_URL", "")
+    # "database" shares codes across worker processes; "memory" is process-local
+    LINE_BINDING_CODE_STORE = os.getenv("LINE_BINDING_CODE_STORE", "database")
+
+    # Response compression (gzip, plus brotli when installed)
+    COMPRESS_ENABLED = os.getenv("COMPRESS_ENABLED", "true").lower() == "true"
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+    COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "4"))
+
+    # Card search / listing responses cached pre-compressed; 0 disables
+    CARDS_CACHE_SECONDS = float(os.getenv("CARDS_CACHE_SECONDS", "60"))
+    CARDS_CACHE_MAX_ENTRIES = int(os.getenv("CARDS_CACHE_MAX_ENTRIES", "512"))
+
+    # Shared thread pool for multi-search upstream calls (search + listing fetches)
+    MULTI_SEARCH_WORKERS = int(os.getenv("MULTI_SEARCH_WORKERS", "32"))
+
+    # Multi-seller basket optimizer (/api/cards/multi-search/optimize)
+    BASKET_MAX_SELLERS = int(os.getenv("BASKET_MAX_SELLERS", "5"))
+    BASKET_TIME_BUDGET_MS = float(os.getenv("BASKET_TIME_BUDGET_MS", "250"))
+    # Above this many candidate sellers only the heuristic runs
+    BASKET_EXACT_MAX_SELLERS = int(os.getenv("BASKET_EXACT_MAX_SELLERS", "200"))
 
     GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID", "")
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", os.getenv("SECRET_KEY", "dev-secret-key"))
     JWT_EXPIRATION_HOURS = int(os.getenv("JWT_EXPIRATION_HOURS", "720"))
+
+    # Authenticated-user cache used by login_required; a TTL of 0 disables it
+    USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+    USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "1024"))
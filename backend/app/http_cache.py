@@ -0,0 +1,40 @@
+"""Conditional GET helpers for per-user API responses.
+
+Routes derive a strong ETag from cheap version markers (counts, max ids,
+max timestamps) before building the payload; if the client already holds
+that version it gets a bare 304 and nothing is serialized.
+"""
+import hashlib
+
+from flask import Response, request
+
+# Authenticated content: never shared, always revalidated
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*markers) -> str:
+    """Hash version markers (plus the request's query string) into an ETag value."""
+    raw = "|".join(str(m) for m in (request.query_string.decode(), *markers))
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def apply_cache_headers(response: Response, etag: str) -> Response:
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    response.vary.add("Authorization")
+    return response
+
+
+def not_modified(etag: str) -> Response | None:
+    """Return a 304 response if the request's If-None-Match matches ``etag``.
+
+    Uses the weak comparison RFC 9110 requires for If-None-Match, so a tag a
+    proxy or CDN weakened to ``W/"..."`` still matches. Compressed responses
+    carry ``<etag>-<encoding>``; those match too and are echoed back unchanged.
+    """
+    from app.compression import ENCODINGS
+
+    for candidate in (etag, *(f"{etag}-{encoding}" for encoding in ENCODINGS)):
+        if request.if_none_match.contains_weak(candidate):
+            return apply_cache_headers(Response(status=304), candidate)
+    return None
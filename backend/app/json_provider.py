@@ -0,0 +1,35 @@
+"""orjson-backed JSON provider for Flask.
+
+Registered in ``create_app`` so every ``jsonify`` goes through it. Output is
+compact UTF-8 (card names are not ``\\u``-escaped), datetimes are ISO 8601,
+and ``Decimal`` values (e.g. ``PriceSnapshot.avg_price``) become floats.
+"""
+from decimal import Decimal
+
+import orjson
+from flask.json.provider import JSONProvider
+
+OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(o):
+    if isinstance(o, Decimal):
+        return float(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(JSONProvider):
+    mimetype = "application/json"
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=_default, option=OPTIONS).decode("utf-8")
+
+    def dumps_bytes(self, obj) -> bytes:
+        return orjson.dumps(obj, default=_default, option=OPTIONS)
+
+    def loads(self, s: str | bytes, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
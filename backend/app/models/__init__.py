@@ -1,6 +1,12 @@
 from app.models.user import User
 from app.models.watchlist import WatchlistItem
 from app.models.price_snapshot import PriceSnapshot
+from app.models.price_rollup import PriceRollup
 from app.models.notification import Notification
+from app.models.alert_outbox import AlertOutbox
+from app.models.line_binding_code import LineBindingCode
 
-__all__ = ["User", "WatchlistItem", "PriceSnapshot", "Notification"]
+__all__ = [
+    "User", "WatchlistItem", "PriceSnapshot", "PriceRollup", "Notification", "AlertOutbox",
+    "LineBindingCode",
+]
@@ -0,0 +1,33 @@
+from app.extensions import db
+from datetime import datetime, timezone
+import uuid
+
+
+class AlertOutbox(db.Model):
+    """A LINE push/multicast waiting to be relayed, written with the alerts it carries."""
+
+    __tablename__ = "alert_outbox"
+    __table_args__ = (
+        db.Index("idx_outbox_due", "status", "available_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    # Sent as X-Line-Retry-Key so LINE drops duplicates of a redelivered row
+    idempotency_key = db.Column(
+        db.String(36), unique=True, nullable=False, default=lambda: str(uuid.uuid4())
+    )
+    recipients = db.Column(db.JSON, nullable=False)
+    messages = db.Column(db.Text, nullable=False)
+    notification_ids = db.Column(db.JSON, nullable=False)
+    status = db.Column(
+        db.Enum("pending", "sending", "sent", "failed", name="outbox_status"),
+        default="pending", nullable=False,
+    )
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    # Due time while pending; lease expiry while sending
+    available_at = db.Column(
+        db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False
+    )
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    sent_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
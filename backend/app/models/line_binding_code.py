@@ -0,0 +1,13 @@
+from app.extensions import db
+
+
+class LineBindingCode(db.Model):
+    """A pending LINE binding code, shared by all web workers."""
+
+    __tablename__ = "line_binding_codes"
+
+    code = db.Column(db.String(6), primary_key=True)
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False, unique=True
+    )
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
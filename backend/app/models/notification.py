@@ -4,15 +4,23 @@ from datetime import datetime, timezone
 
 class Notification(db.Model):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Keyset pagination of a user's history: WHERE user_id = ? AND id < ? ORDER BY id DESC
+        db.Index("idx_user_id_desc", "user_id", db.text("id DESC")),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     watchlist_item_id = db.Column(
         db.Integer, db.ForeignKey("watchlist_items.id", ondelete="CASCADE"), nullable=False
     )
+    # Denormalized from watchlist_items so history queries don't need the join to filter
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     triggered_price = db.Column(db.Integer, nullable=False)
     target_price = db.Column(db.Integer, nullable=False)
     message = db.Column(db.Text, nullable=False)
-    status = db.Column(db.Enum("sent", "failed", name="notification_status"), default="sent")
+    status = db.Column(
+        db.Enum("queued", "sent", "failed", name="notification_status"), default="queued"
+    )
     sent_at = db.Column(
         db.DateTime, default=lambda: datetime.now(timezone.utc), index=True
     )
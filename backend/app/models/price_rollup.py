@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, func
+from sqlalchemy.dialects.postgresql import insert
+
+from app.extensions import db
+
+
+class PriceRollup(db.Model):
+    """Min and max lowest_price per item per hour and per day.
+
+    Kept up to date by the price checker as it writes snapshots, so price
+    history over long ranges reads one row per bucket instead of every
+    snapshot. The primary key serves those range reads.
+    """
+    __tablename__ = "price_rollups"
+
+    # Finest first; bucket width of each granularity
+    GRANULARITIES = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+    watchlist_item_id = db.Column(
+        db.Integer, db.ForeignKey("watchlist_items.id", ondelete="CASCADE"), primary_key=True
+    )
+    granularity = db.Column(db.String(4), primary_key=True)
+    bucket_start = db.Column(db.DateTime, primary_key=True)
+    min_price = db.Column(db.Integer, nullable=False)
+    min_at = db.Column(db.DateTime, nullable=False)
+    max_price = db.Column(db.Integer, nullable=False)
+    max_at = db.Column(db.DateTime, nullable=False)
+    snapshot_count = db.Column(db.Integer, nullable=False)
+
+    @staticmethod
+    def bucket_of(granularity: str, at: datetime) -> datetime:
+        if granularity == "day":
+            return at.replace(hour=0, minute=0, second=0, microsecond=0)
+        return at.replace(minute=0, second=0, microsecond=0)
+
+    @classmethod
+    def record(cls, item_ids, lowest_price: int, checked_at: datetime):
+        """Fold one snapshot price, shared by ``item_ids``, into their buckets."""
+        if not item_ids:
+            return
+        checked_at = checked_at.replace(tzinfo=None)
+        for granularity in cls.GRANULARITIES:
+            stmt = insert(cls).values([
+                {
+                    "watchlist_item_id": item_id,
+                    "granularity": granularity,
+                    "bucket_start": cls.bucket_of(granularity, checked_at),
+                    "min_price": lowest_price,
+                    "min_at": checked_at,
+                    "max_price": lowest_price,
+                    "max_at": checked_at,
+                    "snapshot_count": 1,
+                }
+                for item_id in item_ids
+            ])
+            new = stmt.excluded
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[cls.watchlist_item_id, cls.granularity, cls.bucket_start],
+                set_={
+                    "min_price": func.least(cls.min_price, new.min_price),
+                    "min_at": case((new.min_price < cls.min_price, new.min_at), else_=cls.min_at),
+                    "max_price": func.greatest(cls.max_price, new.max_price),
+                    "max_at": case((new.max_price > cls.max_price, new.max_at), else_=cls.max_at),
+                    "snapshot_count": cls.snapshot_count + 1,
+                },
+            )
+            db.session.execute(stmt)
+
+    @classmethod
+    def read(cls, item_id: int, granularity: str, start: datetime, end: datetime,
+             limit: int) -> list["PriceRollup"]:
+        """Buckets of ``item_id`` overlapping [start, end), oldest first, at most ``limit``."""
+        return db.session.execute(
+            db.select(cls)
+            .where(
+                cls.watchlist_item_id == item_id,
+                cls.granularity == granularity,
+                cls.bucket_start >= cls.bucket_of(granularity, start),
+                cls.bucket_start < end,
+            )
+            .order_by(cls.bucket_start)
+            .limit(limit)
+        ).scalars().all()
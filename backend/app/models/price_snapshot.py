@@ -19,6 +19,22 @@ class PriceSnapshot(db.Model):
 
     watchlist_item = db.relationship("WatchlistItem", back_populates="price_snapshots")
 
+    @classmethod
+    def latest_for_items(cls, item_ids) -> dict[int, "PriceSnapshot"]:
+        """Latest snapshot per watchlist item in one query, keyed by item id.
+
+        Uses Postgres ``DISTINCT ON``, served by ``idx_item_checked``.
+        """
+        if not item_ids:
+            return {}
+        snapshots = db.session.execute(
+            db.select(cls)
+            .where(cls.watchlist_item_id.in_(item_ids))
+            .distinct(cls.watchlist_item_id)
+            .order_by(cls.watchlist_item_id, cls.checked_at.desc(), cls.id.desc())
+        ).scalars()
+        return {s.watchlist_item_id: s for s in snapshots}
+
     def to_dict(self):
         return {
             "id": self.id,
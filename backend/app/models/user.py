@@ -13,6 +13,8 @@ class User(db.Model):
     line_user_id = db.Column(db.String(255), nullable=True)
     line_display_name = db.Column(db.String(255), nullable=True)
     nickname = db.Column(db.String(100), nullable=False, default="default")
+    # Send one carousel per price check run instead of one push per alert
+    alert_digest = db.Column(db.Boolean, default=False, nullable=False)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(
         db.DateTime,
@@ -32,5 +34,6 @@ class User(db.Model):
             "line_user_id": self.line_user_id,
             "line_display_name": self.line_display_name,
             "nickname": self.nickname,
+            "alert_digest": self.alert_digest,
             "created_at": self.created_at.isoformat() if self.created_at else None,
         }
@@ -1,11 +1,10 @@
 """Authentication routes — Google OAuth2 login."""
 from flask import Blueprint, jsonify, request, current_app, g
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
 
 from app.extensions import db
 from app.models import User
-from app.auth import generate_jwt, login_required
+from app.auth import generate_jwt, invalidate_user, login_required, refresh_user
+from app.services.google_auth import google_verifier
 
 auth_bp = Blueprint("auth", __name__)
 
@@ -19,11 +18,7 @@ def google_login():
         return jsonify({"error": "credential is required"}), 400
 
     try:
-        idinfo = id_token.verify_oauth2_token(
-            credential,
-            google_requests.Request(),
-            current_app.config["GOOGLE_CLIENT_ID"],
-        )
+        idinfo = google_verifier.verify(credential, current_app.config["GOOGLE_CLIENT_ID"])
     except ValueError as e:
         return jsonify({"error": f"Invalid token: {e}"}), 401
 
@@ -47,6 +42,7 @@ def google_login():
         user.nickname = name
         user.avatar_url = picture
         db.session.commit()
+        invalidate_user(user.id)
 
     token = generate_jwt(user.id)
     return jsonify({"token": token, "user": user.to_dict()})
@@ -55,8 +51,40 @@ def google_login():
 @auth_bp.route("/me", methods=["GET"])
 @login_required
 def me():
-    """Return the current authenticated user."""
-    return jsonify({"user": g.current_user.to_dict()})
+    """Return the current authenticated user.
+
+    Read from the database rather than the user cache: the LINE binding page
+    polls this for a binding another process (the webhook consumer) wrote,
+    which this process's cache would otherwise hide until its entry expires.
+    """
+    user = refresh_user(g.current_user.id)
+    if user is None:
+        return jsonify({"error": "User not found"}), 401
+    return jsonify({"user": user.to_dict()})
+
+
+@auth_bp.route("/settings", methods=["PATCH"])
+@login_required
+def update_settings():
+    """Update notification preferences.
+
+    PATCH /api/auth/settings
+    Body: { "alert_digest": true }
+    """
+    body = request.get_json()
+    if not body:
+        return jsonify({"error": "request body is required"}), 400
+
+    user = g.current_user.load()
+    if user is None:
+        invalidate_user(g.current_user.id)
+        return jsonify({"error": "User not found"}), 401
+    if "alert_digest" in body:
+        user.alert_digest = bool(body["alert_digest"])
+    db.session.commit()
+    invalidate_user(user.id)
+
+    return jsonify({"user": user.to_dict()})
 
 
 @auth_bp.route("/line-binding", methods=["PATCH"])
@@ -66,12 +94,17 @@ def bind_line():
     body = request.get_json()
     line_user_id = body.get("line_user_id", "").strip() if body else ""
 
-    g.current_user.line_user_id = line_user_id or None
+    user = g.current_user.load()
+    if user is None:
+        invalidate_user(g.current_user.id)
+        return jsonify({"error": "User not found"}), 401
+    user.line_user_id = line_user_id or None
     if not line_user_id:
-        g.current_user.line_display_name = None
+        user.line_display_name = None
     db.session.commit()
+    invalidate_user(user.id)
 
-    return jsonify({"user": g.current_user.to_dict()})
+    return jsonify({"user": user.to_dict()})
 
 
 @auth_bp.route("/line-binding/code", methods=["POST"])
@@ -79,6 +112,9 @@ def bind_line():
 def generate_line_code():
     """Generate a 6-digit verification code for LINE binding."""
     from app.services.line_binding import generate_binding_code
+    if g.current_user.load() is None:
+        invalidate_user(g.current_user.id)
+        return jsonify({"error": "User not found"}), 401
     code = generate_binding_code(g.current_user.id)
     bot_url = current_app.config.get("LINE_BOT_ADD_FRIEND_URL", "")
     return jsonify({"code": code, "bot_url": bot_url})
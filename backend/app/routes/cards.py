@@ -1,12 +1,24 @@
 """Card search routes - proxy to kapaipai API."""
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
 
+from app.compression import ResponseCache
 from app.services.kapaipai import search_cards, fetch_products, filter_buyable
-from app.services.multi_search import multi_card_search
+from app.services.market_stats import market_stats, parse_bins
+from app.services.multi_search import multi_card_basket, multi_card_search, multi_card_search_events
 from app.auth import login_required
 
 cards_bp = Blueprint("cards", __name__)
 
+# Search and listing responses are the same for every user; keep them
+# serialized and pre-compressed for a short while
+response_cache = ResponseCache()
+
+
+@cards_bp.record_once
+def _configure_cache(state):
+    response_cache.ttl_seconds = state.app.config["CARDS_CACHE_SECONDS"]
+    response_cache.max_entries = state.app.config["CARDS_CACHE_MAX_ENTRIES"]
+
 
 @cards_bp.route("/search")
 @login_required
@@ -19,12 +31,16 @@ def search():
     if not name:
         return jsonify({"error": "name parameter is required"}), 400
 
+    cached = response_cache.get(request.full_path)
+    if cached is not None:
+        return cached
+
     try:
         variants = search_cards(name)
     except Exception as e:
         return jsonify({"error": str(e)}), 502
 
-    return jsonify({"data": variants, "total": len(variants)})
+    return response_cache.store(request.full_path, {"data": variants, "total": len(variants)})
 
 
 @cards_bp.route("/products")
@@ -42,6 +58,10 @@ def products():
     pack_id = request.args.get("packId")
     pack_card_id = request.args.get("packCardId")
 
+    cached = response_cache.get(request.full_path)
+    if cached is not None:
+        return cached
+
     try:
         data = fetch_products(card_key, rare, pack_id, pack_card_id)
     except Exception as e:
@@ -50,7 +70,7 @@ def products():
     buyable = filter_buyable(data["products"])
     prices = [p["price"] for p in buyable]
 
-    return jsonify({
+    return response_cache.store(request.full_path, {
         "data": {
             "products": buyable,
             "total": data["total"],
@@ -61,6 +81,48 @@ def products():
     })
 
 
+@cards_bp.route("/stats")
+@login_required
+def stats():
+    """Market statistics over a card variant's buyable listings.
+
+    GET /api/cards/stats?cardKey=...&rare=RR&packId=M3&packCardId=061&bins=0,100,500
+
+    Returns price percentiles, a histogram (``bins`` is a bin count or
+    ascending lower edges; default matches the legacy CLI brackets),
+    condition mix, seller-area distribution and credit-weighted prices.
+    Flawed listings are included so the condition mix means something;
+    pass ``includeFlawed=0`` for perfect-condition listings only.
+    """
+    card_key = request.args.get("cardKey", "").strip()
+    rare = request.args.get("rare", "").strip()
+    if not card_key or not rare:
+        return jsonify({"error": "cardKey and rare parameters are required"}), 400
+
+    try:
+        bins = parse_bins(request.args.get("bins"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    pack_id = request.args.get("packId")
+    pack_card_id = request.args.get("packCardId")
+    include_flawed = request.args.get("includeFlawed", "1") not in ("0", "false")
+
+    cached = response_cache.get(request.full_path)
+    if cached is not None:
+        return cached
+
+    try:
+        data = fetch_products(card_key, rare, pack_id, pack_card_id)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 502
+
+    buyable = filter_buyable(data["products"], include_flawed=include_flawed)
+    return response_cache.store(request.full_path, {
+        "data": dict(market_stats(buyable, bins), total=data["total"]),
+    })
+
+
 @cards_bp.route("/multi-search", methods=["POST"])
 @login_required
 def multi_search():
@@ -69,23 +131,97 @@ def multi_search():
     POST /api/cards/multi-search
     Body: {"cards": [{"name": "喵喵ex", "quantity": 2}, ...]}
     """
+    cards, error = _parse_multi_search_body(request.get_json())
+    if error:
+        return jsonify({"error": error}), 400
+
+    try:
+        result = multi_card_search(cards)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 502
+
+    return jsonify({"data": result})
+
+
+@cards_bp.route("/multi-search/optimize", methods=["POST"])
+@login_required
+def multi_search_optimize():
+    """Cheapest way to buy all cards across several sellers.
+
+    POST /api/cards/multi-search/optimize
+    Body: {"cards": [...], "shipping_cost": 60, "max_sellers": 3}
+
+    ``cards`` is as for /multi-search. Each seller in the plan adds
+    ``shipping_cost``; ``plan.unfilled`` lists units no plan could cover.
+    """
     data = request.get_json()
+    cards, error = _parse_multi_search_body(data)
+    if error:
+        return jsonify({"error": error}), 400
+
+    config = current_app.config
+    try:
+        shipping_cost = max(0.0, float(data.get("shipping_cost", 0)))
+        max_sellers = max(1, min(int(data.get("max_sellers", 3)), config["BASKET_MAX_SELLERS"]))
+    except (TypeError, ValueError):
+        return jsonify({"error": "shipping_cost and max_sellers must be numbers"}), 400
+
+    try:
+        result = multi_card_basket(
+            cards, shipping_cost, max_sellers,
+            time_budget=config["BASKET_TIME_BUDGET_MS"] / 1000,
+            exact_max_sellers=config["BASKET_EXACT_MAX_SELLERS"],
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 502
+
+    return jsonify({"data": result})
+
+
+@cards_bp.route("/multi-search/stream", methods=["POST"])
+@login_required
+def multi_search_stream():
+    """Streaming multi-search: newline-delimited JSON progress events.
+
+    POST /api/cards/multi-search/stream
+    Body: same as /multi-search
+
+    Emits search / fetch / candidates / seller events as upstream calls
+    complete and a final summary; see ``multi_card_search_events``. An
+    upstream failure ends the stream with an ``error`` event.
+    """
+    cards, error = _parse_multi_search_body(request.get_json())
+    if error:
+        return jsonify({"error": error}), 400
+
+    def generate():
+        try:
+            for event in multi_card_search_events(cards):
+                yield current_app.json.dumps(event) + "\n"
+        except Exception as e:
+            yield current_app.json.dumps({"type": "error", "error": str(e)}) + "\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="application/x-ndjson",
+        # Tell nginx not to buffer, or events arrive all at once at the end
+        headers={"X-Accel-Buffering": "no", "Cache-Control": "no-cache"},
+    )
+
+
+def _parse_multi_search_body(data) -> tuple[list[dict] | None, str | None]:
+    """Validate and normalize a multi-search body. Returns (cards, error)."""
     if not data or not data.get("cards"):
-        return jsonify({"error": "cards array is required"}), 400
+        return None, "cards array is required"
 
     cards = data["cards"]
     if len(cards) > 10:
-        return jsonify({"error": "Maximum 10 cards per search"}), 400
+        return None, "Maximum 10 cards per search"
 
     for card in cards:
         if not card.get("name", "").strip():
-            return jsonify({"error": "Each card must have a name"}), 400
+            return None, "Each card must have a name"
         card["name"] = card["name"].strip()
         card["quantity"] = max(1, min(99, int(card.get("quantity", 1))))
 
-    try:
-        result = multi_card_search(cards)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 502
-
-    return jsonify({"data": result})
+    return cards, None
@@ -1,30 +1,95 @@
 """Notification history routes."""
+import base64
+import binascii
+
 from flask import Blueprint, jsonify, request, g
+from sqlalchemy import func
+from sqlalchemy.orm import contains_eager
 
-from app.models import Notification, WatchlistItem
+from app.extensions import db
+from app.http_cache import apply_cache_headers, make_etag, not_modified
+from app.models import Notification
 from app.auth import login_required
 
 notifications_bp = Blueprint("notifications", __name__)
 
+MAX_LIMIT = 200
+
+
+def encode_cursor(notification: Notification) -> str:
+    return base64.urlsafe_b64encode(str(notification.id).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """Parse a cursor from ``encode_cursor``; raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError(str(e)) from e
+    # Cursors issued before pagination moved to id alone were "sent_at|id"
+    return int(raw.rpartition("|")[2])
+
 
 @notifications_bp.route("", methods=["GET"])
 @login_required
 def list_notifications():
-    """Get notification history.
+    """Get notification history, newest first.
 
-    GET /api/notifications?limit=50
+    GET /api/notifications?limit=50&cursor=<next_cursor>
+
+    Pages are keyed on id, which follows creation order and never changes,
+    so every page costs the same however far back it is and no row can move
+    between pages. ``next_cursor`` is null on the last page. Answers
+    If-None-Match with 304 while the user's history is unchanged.
     """
-    limit = request.args.get("limit", 50, type=int)
+    etag = _notifications_etag(g.current_user.id)
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
 
-    notifications = (
+    limit = max(1, min(request.args.get("limit", 50, type=int), MAX_LIMIT))
+
+    query = (
         Notification.query
-        .join(WatchlistItem)
-        .filter(WatchlistItem.user_id == g.current_user.id)
-        .order_by(Notification.sent_at.desc())
-        .limit(limit)
+        .join(Notification.watchlist_item)
+        .options(contains_eager(Notification.watchlist_item))
+        .filter(Notification.user_id == g.current_user.id)
+    )
+
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            notification_id = decode_cursor(cursor)
+        except ValueError:
+            return jsonify({"error": "invalid cursor"}), 400
+        query = query.filter(Notification.id < notification_id)
+
+    notifications = (
+        query
+        .order_by(Notification.id.desc())
+        .limit(limit + 1)
         .all()
     )
 
-    return jsonify({
-        "data": [n.to_dict() for n in notifications]
-    })
+    next_cursor = None
+    if len(notifications) > limit:
+        notifications = notifications[:limit]
+        next_cursor = encode_cursor(notifications[-1])
+
+    return apply_cache_headers(jsonify({
+        "data": [n.to_dict() for n in notifications],
+        "next_cursor": next_cursor,
+    }), etag)
+
+
+def _notifications_etag(user_id: int) -> str:
+    # New alerts raise max(id), deliveries lower the queued count, and
+    # deleting a watchlist item (which cascades) lowers the total count
+    markers = db.session.execute(
+        db.select(
+            func.count(Notification.id),
+            func.max(Notification.id),
+            func.count(Notification.id).filter(Notification.status == "queued"),
+        ).where(Notification.user_id == user_id)
+    ).one()
+    return make_etag("notifications", user_id, *markers)
@@ -1,9 +1,16 @@
 """Watchlist CRUD routes."""
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
 from flask import Blueprint, jsonify, request, g
+from sqlalchemy import func
 
 from app.extensions import db
-from app.models import WatchlistItem, User
+from app.http_cache import apply_cache_headers, make_etag, not_modified
+from app.models import PriceRollup, PriceSnapshot, WatchlistItem, User
+from app.services.downsample import lttb
 from app.services.price_checker import check_single_item
+from app.services.watchlist_import import REQUIRED_FIELDS, upsert_items
 from app.auth import login_required
 
 watchlist_bp = Blueprint("watchlist", __name__)
@@ -15,14 +22,50 @@ def list_items():
     """List all watchlist items with latest price snapshot.
 
     GET /api/watchlist
+
+    Answers If-None-Match with 304 while the user's items and their latest
+    snapshots are unchanged. Each snapshot's id and checked_at are part of the
+    payload, so the ETag changes on every price-check sweep that reaches any
+    of the user's items, even when no price moved.
     """
+    etag = _watchlist_etag(g.current_user.id)
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+
     items = WatchlistItem.query.filter_by(user_id=g.current_user.id).order_by(
         WatchlistItem.created_at.desc()
     ).all()
+    latest = PriceSnapshot.latest_for_items([item.id for item in items])
 
-    return jsonify({
-        "data": [item.to_dict(include_latest_snapshot=True) for item in items]
-    })
+    data = []
+    for item in items:
+        result = item.to_dict()
+        snapshot = latest.get(item.id)
+        result["latest_snapshot"] = snapshot.to_dict() if snapshot else None
+        data.append(result)
+
+    return apply_cache_headers(jsonify({"data": data}), etag)
+
+
+def _watchlist_etag(user_id: int) -> str:
+    # Latest snapshot per item via idx_item_checked, so this stays O(items)
+    latest_snapshot = (
+        db.select(PriceSnapshot.id)
+        .where(PriceSnapshot.watchlist_item_id == WatchlistItem.id)
+        .order_by(PriceSnapshot.checked_at.desc(), PriceSnapshot.id.desc())
+        .limit(1)
+        .correlate(WatchlistItem)
+        .scalar_subquery()
+    )
+    markers = db.session.execute(
+        db.select(
+            func.count(WatchlistItem.id),
+            func.max(WatchlistItem.updated_at),
+            func.max(latest_snapshot),
+        ).where(WatchlistItem.user_id == user_id)
+    ).one()
+    return make_etag("watchlist", user_id, *markers)
 
 
 @watchlist_bp.route("", methods=["POST"])
@@ -38,42 +81,13 @@ def add_items():
     if not body or "items" not in body:
         return jsonify({"error": "items array is required"}), 400
 
-    created = []
     for item_data in body["items"]:
-        required = ["card_key", "card_name", "rare", "target_price"]
-        missing = [f for f in required if f not in item_data]
+        missing = [f for f in REQUIRED_FIELDS if f not in item_data]
         if missing:
             return jsonify({"error": f"Missing fields: {missing}"}), 400
 
-        # Check for duplicate
-        existing = WatchlistItem.query.filter_by(
-            user_id=g.current_user.id,
-            card_key=item_data["card_key"],
-            rare=item_data["rare"],
-            pack_id=item_data.get("pack_id"),
-        ).first()
-
-        if existing:
-            # Update target price if already exists
-            existing.target_price = item_data["target_price"]
-            existing.target_price_min = item_data.get("target_price_min", 0)
-            existing.is_active = True
-            created.append(existing)
-            continue
-
-        item = WatchlistItem(
-            user_id=g.current_user.id,
-            card_key=item_data["card_key"],
-            card_name=item_data["card_name"],
-            pack_id=item_data.get("pack_id"),
-            pack_name=item_data.get("pack_name"),
-            pack_card_id=item_data.get("pack_card_id"),
-            rare=item_data["rare"],
-            target_price=item_data["target_price"],
-            target_price_min=item_data.get("target_price_min", 0),
-        )
-        db.session.add(item)
-        created.append(item)
+    # Existing items get the new target price and are reactivated
+    created = upsert_items(g.current_user.id, body["items"])
 
     db.session.commit()
 
@@ -146,3 +160,113 @@ def check_item(item_id):
         })
     else:
         return jsonify({"error": "Failed to check price"}), 502
+
+
+# Most snapshots (or twice the rollup buckets) one history request reads
+HISTORY_MAX_RAW_ROWS = 5000
+HISTORY_DEFAULT_DAYS = 30
+HISTORY_MAX_POINTS = 2000
+
+
+@watchlist_bp.route("/<int:item_id>/history", methods=["GET"])
+@login_required
+def item_history(item_id):
+    """Lowest-price history for one item, downsampled to at most ``points``.
+
+    GET /api/watchlist/:id/history?from=2026-01-01&to=2026-02-01&points=500
+
+    ``from``/``to`` are ISO 8601 (default: the last 30 days). Snapshots
+    without a buyable listing are skipped. The history is read from the
+    finest source that fits in HISTORY_MAX_RAW_ROWS: the snapshots
+    themselves, else the hourly or daily min/max rollups. Every read is an
+    index range scan with a LIMIT, so the cost is bounded whatever the range
+    or the number of stored snapshots; the result is then shaped with LTTB.
+    For rollups, ``raw_count`` counts the snapshots of every bucket that
+    overlaps the range, so it can include a few just outside it.
+    """
+    item = WatchlistItem.query.filter_by(id=item_id, user_id=g.current_user.id).first()
+    if not item:
+        return jsonify({"error": "Item not found"}), 404
+
+    try:
+        end = _parse_time(request.args.get("to")) or datetime.now(timezone.utc).replace(tzinfo=None)
+        start = _parse_time(request.args.get("from")) or end - timedelta(days=HISTORY_DEFAULT_DAYS)
+    except ValueError:
+        return jsonify({"error": "from/to must be ISO 8601 timestamps"}), 400
+    if start >= end:
+        return jsonify({"error": "from must be before to"}), 400
+    points = max(3, min(request.args.get("points", 500, type=int), HISTORY_MAX_POINTS))
+
+    rows = db.session.execute(
+        db.select(PriceSnapshot.checked_at, PriceSnapshot.lowest_price)
+        .where(
+            PriceSnapshot.watchlist_item_id == item.id,
+            PriceSnapshot.checked_at >= start,
+            PriceSnapshot.checked_at < end,
+            PriceSnapshot.lowest_price.isnot(None),
+        )
+        .order_by(PriceSnapshot.checked_at)
+        .limit(HISTORY_MAX_RAW_ROWS + 1)
+    ).all()
+
+    if len(rows) <= HISTORY_MAX_RAW_ROWS:
+        x = np.array([r[0] for r in rows], dtype="datetime64[ms]").astype(np.int64) / 1000.0
+        y = np.array([r[1] for r in rows], dtype=np.float64)
+        raw_count = len(rows)
+        method = "lttb"
+    else:
+        # Each bucket contributes two points, its min and its max
+        for granularity in PriceRollup.GRANULARITIES:
+            buckets = PriceRollup.read(item.id, granularity, start, end, HISTORY_MAX_RAW_ROWS // 2 + 1)
+            if len(buckets) <= HISTORY_MAX_RAW_ROWS // 2:
+                break
+        else:
+            return jsonify({"error": "range too long"}), 400
+        x, y = _rollup_points(buckets, start, end)
+        raw_count = sum(b.snapshot_count for b in buckets)
+        method = f"{granularity}+lttb"
+
+    x, y = lttb(x, y, points)
+
+    return jsonify({
+        "data": {
+            "item_id": item.id,
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "raw_count": raw_count,
+            "method": method,
+            "points": [
+                {
+                    "t": datetime.fromtimestamp(t, timezone.utc).replace(tzinfo=None).isoformat(),
+                    "lowest_price": int(round(p)),
+                }
+                for t, p in zip(x.tolist(), y.tolist())
+            ],
+        }
+    })
+
+
+def _parse_time(value: str | None) -> datetime | None:
+    """Parse an ISO 8601 timestamp into the naive UTC the snapshot table stores."""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _rollup_points(buckets, start: datetime, end: datetime) -> tuple[np.ndarray, np.ndarray]:
+    """Each bucket's min and max, placed at the time they occurred, within [start, end).
+
+    Keeping both extremes preserves spikes for the LTTB pass.
+    """
+    points = sorted({
+        (at, price)
+        for b in buckets
+        for at, price in ((b.min_at, b.min_price), (b.max_at, b.max_price))
+        if start <= at < end
+    })
+    x = np.array([p[0] for p in points], dtype="datetime64[ms]").astype(np.int64) / 1000.0
+    y = np.array([p[1] for p in points], dtype=np.float64)
+    return x, y
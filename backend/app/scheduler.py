@@ -1,41 +1,134 @@
-"""APScheduler setup for periodic price checking."""
+"""APScheduler setup for the background jobs.
+
+``add_jobs`` registers the price check and maintenance jobs; ``app.worker``
+runs them in a dedicated process. ``init_scheduler`` runs them inside the
+web process instead, for single-process setups with SCHEDULER_ENABLED.
+"""
 import logging
 import os
+import threading
+import zlib
+from contextlib import contextmanager
 
 from apscheduler.schedulers.background import BackgroundScheduler
+from sqlalchemy import func, select
+
+from app.extensions import db
 
 logger = logging.getLogger(__name__)
 
 scheduler = BackgroundScheduler()
 
+_lock_connection = None
+
+
+def lock_key(name: str) -> int:
+    """Postgres advisory lock key for ``name``, stable across processes."""
+    return zlib.crc32(f"kapaipai:{name}".encode())
+
 
 def init_scheduler(app):
-    """Initialize the scheduler with the Flask app context."""
-    # Skip in testing or when reloader spawns a child process
-    if app.config.get("TESTING") or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
-        # Only run scheduler in the main process (not the reloader)
-        pass
+    """Start the scheduler in exactly one process per database.
 
-    if os.environ.get("WERKZEUG_RUN_MAIN") != "true" and not app.debug:
-        _start_scheduler(app)
-    elif os.environ.get("WERKZEUG_RUN_MAIN") == "true":
-        _start_scheduler(app)
+    With ``flask run --debug`` that is the reloader child. Under gunicorn
+    every worker, on every replica, builds the app; the first to take the
+    scheduler's Postgres advisory lock runs the scheduler and holds the lock
+    until it exits, after which the next process to start takes over.
+    """
+    if app.config.get("TESTING"):
+        return
+    # The reloader parent only watches files
+    if app.debug and os.environ.get("WERKZEUG_RUN_MAIN") != "true":
+        return
+    if not _acquire_lock(app):
+        logger.info("Scheduler already running in another process")
+        return
+    _start_scheduler(app)
 
 
-def _start_scheduler(app):
-    interval = app.config.get("PRICE_CHECK_INTERVAL_MINUTES", 10)
+def _acquire_lock(app) -> bool:
+    global _lock_connection
+    if _lock_connection is not None:
+        return True
+    with app.app_context():
+        connection = db.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+    acquired = connection.execute(
+        select(func.pg_try_advisory_lock(lock_key("scheduler")))
+    ).scalar()
+    if not acquired:
+        connection.close()
+        return False
+    # Session-level lock: held on this connection until the process exits
+    # and Postgres drops the connection
+    _lock_connection = connection
+    return True
+
+
+@contextmanager
+def advisory_lock(name: str):
+    """Try the Postgres advisory lock ``name`` for the block; yields whether it was taken.
+
+    Held on its own autocommit connection, so the block's own commits don't
+    affect it and it is released even if the process dies mid-block.
+    """
+    key = lock_key(name)
+    connection = db.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+    try:
+        acquired = connection.execute(select(func.pg_try_advisory_lock(key))).scalar()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                connection.execute(select(func.pg_advisory_unlock(key)))
+    finally:
+        connection.close()
+
 
-    def job():
-        with app.app_context():
+def add_jobs(sched, app, stop: threading.Event | None = None):
+    """Register the periodic jobs on ``sched``; ``stop`` cuts a running price check short.
+
+    Each job runs under its own advisory lock, so a second worker (or a web
+    process with SCHEDULER_ENABLED) skips a run another process has started.
+    """
+    price_interval = app.config["PRICE_CHECK_INTERVAL_MINUTES"]
+    maintenance_interval = app.config["MAINTENANCE_INTERVAL_MINUTES"]
+
+    def price_check():
+        with app.app_context(), advisory_lock("price_check") as acquired:
+            if not acquired:
+                logger.warning("Price check already running in another process, skipping")
+                return
             from app.services.price_checker import check_all_active_items
-            check_all_active_items()
-
-    scheduler.add_job(
-        job,
-        "interval",
-        minutes=interval,
-        id="price_check",
-        replace_existing=True,
+            check_all_active_items(stop)
+
+    def maintenance():
+        with app.app_context(), advisory_lock("maintenance") as acquired:
+            if not acquired:
+                logger.warning("Maintenance already running in another process, skipping")
+                return
+            from app.services.maintenance import run_maintenance
+            run_maintenance()
+
+    # A slow sweep must not overlap the next one; missed runs collapse into one
+    sched.add_job(
+        price_check, "interval", minutes=price_interval, id="price_check",
+        replace_existing=True, max_instances=1, coalesce=True,
+    )
+    sched.add_job(
+        maintenance, "interval", minutes=maintenance_interval, id="maintenance",
+        replace_existing=True, max_instances=1, coalesce=True,
     )
+    logger.info(
+        "Jobs scheduled: price check every %d minutes, maintenance every %d minutes",
+        price_interval, maintenance_interval,
+    )
+
+
+def _start_scheduler(app):
+    add_jobs(scheduler, app)
     scheduler.start()
-    logger.info("Scheduler started: price check every %d minutes", interval)
+
+    # Relay alerts left in the outbox by a previous process
+    with app.app_context():
+        from app.services.alert_outbox import get_relay
+        get_relay().start()
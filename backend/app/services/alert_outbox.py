@@ -0,0 +1,225 @@
+"""Transactional outbox for price alerts.
+
+``stage_alert`` is called while a sweep is building its transaction. Right
+before that transaction commits, the staged alerts are rendered and written as
+``AlertOutbox`` rows alongside the snapshots and ``Notification`` rows: users
+in digest mode get their alerts as carousels, the rest are batched so that
+identical payloads become one multicast. No network I/O happens inside the sweep.
+
+``OutboxRelay`` drains due rows in short transactions using
+``FOR UPDATE SKIP LOCKED`` and hands them to the LINE dispatcher. A claimed row
+is leased; if the process dies mid-send the lease expires and the row is
+re-delivered with the same ``X-Line-Retry-Key``, so LINE drops the duplicate.
+Rows whose send failed retryably go back to ``pending`` with a backoff (see
+``line_dispatch``), so an outage only delays them.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models import AlertOutbox
+from app.services.line_dispatch import PushJob, get_dispatcher
+from app.services.notifier import (
+    AlertBatcher, build_digest_messages, encode_messages, render_price_alert_flex,
+)
+
+logger = logging.getLogger(__name__)
+
+_SESSION_KEY = "alert_outbox_staged"
+_WRITTEN_KEY = "alert_outbox_written"
+
+
+def stage_alert(notification, to: str, alert: dict, digest: bool = False):
+    """Write a price alert for ``notification`` to the outbox on commit.
+
+    ``alert`` holds ``render_price_alert_bubble`` keyword arguments. With
+    ``digest``, all of ``to``'s alerts in this transaction are sent together.
+    """
+    db.session.info.setdefault(_SESSION_KEY, []).append((notification, to, alert, digest))
+
+
+@event.listens_for(Session, "before_commit")
+def _write_outbox(session):
+    staged = session.info.pop(_SESSION_KEY, None)
+    if not staged:
+        return
+    session.flush()  # assign Notification ids
+
+    batcher = AlertBatcher()
+    digests: dict[str, list[tuple[int, dict]]] = {}
+    for notification, to, alert, digest in staged:
+        if digest:
+            digests.setdefault(to, []).append((notification.id, alert))
+        else:
+            batcher.add(to, [render_price_alert_flex(**alert)], notification.id)
+
+    for to, entries in digests.items():
+        if len(entries) == 1:
+            notification_id, alert = entries[0]
+            batcher.add(to, [render_price_alert_flex(**alert)], notification_id)
+            continue
+        alerts = [alert for _, alert in entries]
+        for messages, indexes in build_digest_messages(alerts):
+            session.add(AlertOutbox(
+                recipients=[to],
+                messages=encode_messages(messages).decode("utf-8"),
+                notification_ids=[entries[i][0] for i in indexes],
+            ))
+
+    for recipients, messages, notification_ids in batcher.batches():
+        session.add(AlertOutbox(
+            recipients=recipients,
+            messages=encode_messages(messages).decode("utf-8"),
+            notification_ids=notification_ids,
+        ))
+    session.info[_WRITTEN_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_relay(session):
+    if session.info.pop(_WRITTEN_KEY, False):
+        get_relay().wake()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_staged(session, previous_transaction):
+    session.info.pop(_SESSION_KEY, None)
+    session.info.pop(_WRITTEN_KEY, None)
+
+
+def claim_due(limit: int, lease_seconds: int) -> list[PushJob]:
+    """Claim up to ``limit`` due outbox rows and return them as push jobs.
+
+    Pending rows and ``sending`` rows whose lease expired are both due. The
+    claim is its own short transaction; concurrent relays skip locked rows.
+    """
+    now = datetime.now(timezone.utc)
+    due = (
+        select(AlertOutbox.id)
+        .where(
+            AlertOutbox.status.in_(("pending", "sending")),
+            AlertOutbox.available_at <= now,
+        )
+        .order_by(AlertOutbox.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    rows = db.session.execute(
+        update(AlertOutbox)
+        .where(AlertOutbox.id.in_(due.scalar_subquery()))
+        .values(
+            status="sending",
+            attempts=AlertOutbox.attempts + 1,
+            available_at=now + timedelta(seconds=lease_seconds),
+        )
+        .returning(
+            AlertOutbox.id, AlertOutbox.idempotency_key, AlertOutbox.recipients,
+            AlertOutbox.messages, AlertOutbox.notification_ids, AlertOutbox.attempts,
+        )
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.session.commit()
+    lease_expires = time.monotonic() + lease_seconds
+
+    jobs = []
+    for row in rows:
+        recipients = list(row.recipients)
+        jobs.append(PushJob(
+            to=recipients[0] if len(recipients) == 1 else recipients,
+            messages=row.messages.encode("utf-8"),
+            notification_ids=list(row.notification_ids),
+            outbox_id=row.id,
+            retry_key=row.idempotency_key,
+            attempts=row.attempts,
+            lease_expires=lease_expires,
+        ))
+    return jobs
+
+
+class OutboxRelay:
+    """Background thread that drains the outbox into the LINE dispatcher."""
+
+    def __init__(self, app, batch_size: int = 100, lease_seconds: int = 300,
+                 poll_seconds: float = 30.0):
+        self.app = app
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="outbox-relay", daemon=True)
+            self._thread.start()
+        logger.info("Outbox relay started")
+
+    def wake(self):
+        """Drain now if the relay runs in this process; otherwise its poll picks rows up."""
+        self._wake.set()
+
+    def stop(self, timeout: float | None = None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def drain(self) -> int:
+        """Claim and dispatch due rows until none are left. Returns rows dispatched."""
+        total = 0
+        with self.app.app_context():
+            dispatcher = get_dispatcher()
+            while not self._stop.is_set():
+                # Don't claim more than the senders can start on before the lease runs out
+                if dispatcher.qsize() >= dispatcher.workers * 2:
+                    self._stop.wait(0.2)
+                    continue
+                jobs = claim_due(self.batch_size, self.lease_seconds)
+                if not jobs:
+                    break
+                for job in jobs:
+                    dispatcher.submit(job)
+                total += len(jobs)
+        if total:
+            logger.info("Outbox relay dispatched %d row(s)", total)
+        return total
+
+    def _run(self):
+        # Drain immediately on start so rows left by a previous process go out
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                self.drain()
+            except Exception:
+                logger.exception("Outbox relay drain failed")
+            self._wake.wait(self.poll_seconds)
+
+
+_relay: OutboxRelay | None = None
+_relay_lock = threading.Lock()
+
+
+def get_relay() -> OutboxRelay:
+    """Return the process-wide relay, creating it for the current app."""
+    global _relay
+    with _relay_lock:
+        if _relay is None:
+            app = current_app._get_current_object()
+            _relay = OutboxRelay(
+                app,
+                batch_size=app.config["ALERT_OUTBOX_BATCH_SIZE"],
+                lease_seconds=app.config["ALERT_OUTBOX_LEASE_SECONDS"],
+                poll_seconds=app.config["ALERT_OUTBOX_POLL_SECONDS"],
+            )
+        return _relay
@@ -0,0 +1,274 @@
+"""Cheapest multi-seller purchase plan for a multi-card request.
+
+Given each card's requested quantity and every seller's listings, choose at
+most ``max_sellers`` sellers and the units to buy from them, minimising item
+cost plus a fixed ``fixed_cost`` (shipping) per seller used.
+
+Once the set of sellers is fixed the rest is easy: each card takes its
+cheapest units across the chosen sellers. So the search is over seller sets
+only, and a set's cost is ``fixed_cost * |S|`` plus, per card, the sum of the
+cheapest ``quantity`` unit prices among S's listings. Units nobody in S can
+supply carry a penalty larger than any complete plan, so plans that cover
+more units always win and an uncoverable request still gets the best
+partial plan.
+
+``solve_basket`` first builds a plan heuristically: vectorised greedy
+additions, then drop/swap local search. If the instance is small enough it
+then runs an exact branch-and-bound, which keeps that plan as the incumbent.
+Both stop at the time budget; ``optimal`` says whether the exact search
+finished. The budget's clock starts before the price matrices are built, but
+only the search checks it: setup, the first greedy step and the final
+allocation always run, so very large inputs can overrun it by their cost.
+"""
+import time
+
+import numpy as np
+
+
+class _Timeout(Exception):
+    pass
+
+
+class BasketSolver:
+    """One solve over a fixed set of demands and offers. Use ``solve_basket``."""
+
+    def __init__(self, demands: dict[str, int], offers: dict[str, dict[str, list[dict]]],
+                 fixed_cost: float, max_sellers: int, deadline: float):
+        self.cards = list(demands)
+        self.quantity = [demands[c] for c in self.cards]
+        self.fixed_cost = float(fixed_cost)
+        self.max_sellers = max_sellers
+        self.deadline = deadline
+        self.nodes = 0
+
+        self.sellers = sorted({s for c in self.cards for s in offers.get(c, {})})
+        index = {s: i for i, s in enumerate(self.sellers)}
+        max_price = max(
+            (p["price"] for c in self.cards for ps in offers.get(c, {}).values() for p in ps),
+            default=0,
+        )
+        # Dearer than any complete plan, so coverage always comes first
+        self.missing = float(
+            self.fixed_cost * max_sellers + sum(self.quantity) * max_price + 1
+        )
+
+        # prices[c][s] = seller s's cheapest quantity[c] unit prices, padded
+        self.prices = []
+        for card, q in zip(self.cards, self.quantity):
+            matrix = np.full((len(self.sellers), q), self.missing)
+            for seller, products in offers.get(card, {}).items():
+                units = _cheapest_units(products, q)
+                matrix[index[seller], :len(units)] = units
+            self.prices.append(matrix)
+        # prefix[c][s, k] = cost of seller s's k cheapest units of card c
+        self.prefix = [
+            np.concatenate([np.zeros((len(self.sellers), 1)), np.cumsum(m, axis=1)], axis=1)
+            for m in self.prices
+        ]
+
+    # --- evaluation ---------------------------------------------------------
+
+    def _empty(self) -> list[np.ndarray]:
+        return [np.full(q, self.missing) for q in self.quantity]
+
+    def _state(self, chosen: list[int]) -> list[np.ndarray]:
+        """Per card, the cheapest units available from ``chosen``."""
+        if not chosen:
+            return self._empty()
+        return [
+            np.sort(np.concatenate([m[chosen].ravel(), np.full(q, self.missing)]))[:q]
+            for m, q in zip(self.prices, self.quantity)
+        ]
+
+    def _cost(self, chosen: list[int]) -> float:
+        return self.fixed_cost * len(chosen) + sum(float(u.sum()) for u in self._state(chosen))
+
+    def _cost_adding_each(self, state: list[np.ndarray], size: int) -> np.ndarray:
+        """Cost of the current sellers plus each single seller, for every seller at once."""
+        total = np.full(len(self.sellers), self.fixed_cost * (size + 1))
+        for units, prefix in zip(state, self.prefix):
+            # Both sides are sorted, so the q cheapest of the union are the k
+            # cheapest of the seller's plus the q - k cheapest of the state's,
+            # for the best k
+            state_prefix = np.concatenate([[0.0], np.cumsum(units)])[::-1]
+            total += (prefix + state_prefix).min(axis=1)
+        return total
+
+    def _best_addition(self, chosen: list[int]) -> tuple[int | None, float]:
+        costs = self._cost_adding_each(self._state(chosen), len(chosen))
+        costs[chosen] = np.inf
+        j = int(np.argmin(costs))
+        return (j, float(costs[j])) if np.isfinite(costs[j]) else (None, np.inf)
+
+    # --- heuristic ----------------------------------------------------------
+
+    def greedy(self) -> tuple[list[int], float]:
+        """Greedy additions while they pay for their fixed cost, then drop/swap moves."""
+        chosen: list[int] = []
+        cost = self._cost(chosen)
+        while len(chosen) < self.max_sellers:
+            j, new_cost = self._best_addition(chosen)
+            if j is None or new_cost >= cost:
+                break
+            chosen.append(j)
+            cost = new_cost
+
+        improved = True
+        while improved:
+            improved = False
+            for s in list(chosen):
+                if time.perf_counter() > self.deadline:
+                    return chosen, cost
+                rest = [t for t in chosen if t != s]
+                candidates = [(self._cost(rest), rest)]
+                j, swap_cost = self._best_addition(rest)
+                if j is not None:
+                    candidates.append((swap_cost, rest + [j]))
+                best_cost, best = min(candidates, key=lambda c: c[0])
+                if best_cost < cost:
+                    chosen, cost, improved = best, best_cost, True
+                    break
+        return chosen, cost
+
+    # --- exact --------------------------------------------------------------
+
+    def branch_and_bound(self, incumbent: list[int],
+                         incumbent_cost: float) -> tuple[list[int], float, bool]:
+        """Exact search over seller sets, seeded with ``incumbent``.
+
+        Returns (sellers, cost, finished); if the deadline cuts the search
+        short, the best set found so far comes back with ``finished`` False.
+
+        Sellers are tried cheapest-alone first. At each node, the bound for
+        adding any sellers from position i on is the fixed cost of one more
+        seller plus the cheapest units from the current set and all of
+        those sellers together. That bound only grows with i, so the first
+        position that fails it ends the loop.
+        """
+        order = np.argsort(self._cost_adding_each(self._empty(), 0), kind="stable").tolist()
+        n = len(order)
+        units = [[m[s].tolist() for s in order] for m in self.prices]
+        suffix = []
+        for card_units, q in zip(units, self.quantity):
+            best = [[self.missing] * q]
+            for k in range(n - 1, -1, -1):
+                best.append(sorted(best[-1] + card_units[k])[:q])
+            best.reverse()
+            suffix.append(best)
+
+        best_set, best_cost = list(incumbent), incumbent_cost
+        quantity = self.quantity
+        fixed = self.fixed_cost
+
+        def search(start: int, chosen: list[int], state: list[list[float]]):
+            nonlocal best_set, best_cost
+            size = len(chosen) + 1
+            for i in range(start, n):
+                self.nodes += 1
+                if self.nodes & 255 == 0 and time.perf_counter() > self.deadline:
+                    raise _Timeout
+                bound = fixed * size + sum(
+                    sum(sorted(state[c] + suffix[c][i])[:q]) for c, q in enumerate(quantity)
+                )
+                if bound >= best_cost:
+                    break
+                new_state = [sorted(state[c] + units[c][i])[:q] for c, q in enumerate(quantity)]
+                cost = fixed * size + sum(sum(u) for u in new_state)
+                if cost < best_cost:
+                    best_set, best_cost = chosen + [order[i]], cost
+                if size < self.max_sellers:
+                    search(i + 1, chosen + [order[i]], new_state)
+
+        try:
+            search(0, [], [[self.missing] * q for q in quantity])
+        except _Timeout:
+            return best_set, best_cost, False
+        return best_set, best_cost, True
+
+
+def _cheapest_units(products: list[dict], limit: int) -> list[float]:
+    """Unit prices of the cheapest ``limit`` units across ``products``."""
+    units: list[float] = []
+    for p in sorted(products, key=lambda p: p["price"]):
+        units.extend([float(p["price"])] * min(p["stock"], limit - len(units)))
+        if len(units) >= limit:
+            break
+    return units
+
+
+def solve_basket(demands: dict[str, int], offers: dict[str, dict[str, list[dict]]],
+                 fixed_cost: float = 0, max_sellers: int = 3,
+                 time_budget: float = 0.25, exact_max_sellers: int = 200) -> dict:
+    """Cheapest plan buying ``demands`` (card -> quantity) from at most ``max_sellers`` sellers.
+
+    ``offers`` maps card -> seller -> buyable listings (dicts with at least
+    ``price`` and ``stock``). Returns the plan per seller, its costs, any
+    units no plan could cover (``unfilled``), and solver metadata.
+
+    ``time_budget`` counts from the call but only cuts the search short; see
+    the module docstring for what can run past it.
+    """
+    start = time.perf_counter()
+    demands = {card: q for card, q in demands.items() if q > 0}
+    solver = BasketSolver(demands, offers, fixed_cost, max_sellers, start + time_budget)
+
+    method, optimal = "greedy", False
+    chosen: list[int] = []
+    if solver.sellers and demands:
+        chosen, cost = solver.greedy()
+        if len(solver.sellers) <= exact_max_sellers:
+            chosen, cost, optimal = solver.branch_and_bound(chosen, cost)
+            method = "branch_and_bound"
+
+    plan = _allocate([solver.sellers[i] for i in chosen], demands, offers, fixed_cost)
+    plan.update({
+        "method": method,
+        "optimal": optimal,
+        "candidate_sellers": len(solver.sellers),
+        "nodes": solver.nodes,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    })
+    return plan
+
+
+def _allocate(sellers: list[str], demands: dict[str, int],
+              offers: dict[str, dict[str, list[dict]]], fixed_cost: float) -> dict:
+    """Buy each card's cheapest units across ``sellers`` and group them by seller."""
+    by_seller: dict[str, dict] = {}
+    unfilled = {}
+    for card, q in demands.items():
+        listings = sorted(
+            ((p, seller) for seller in sellers for p in offers.get(card, {}).get(seller, [])),
+            key=lambda ps: (ps[0]["price"], -ps[0].get("credit", 0)),
+        )
+        remaining = q
+        for product, seller in listings:
+            if remaining <= 0:
+                break
+            take = min(remaining, product["stock"])
+            remaining -= take
+            entry = by_seller.setdefault(seller, {
+                "seller_nickname": seller,
+                "seller_area": product.get("seller_area", ""),
+                "credit": product.get("credit", 0),
+                "order_complete": product.get("order_complete", 0),
+                "items": [],
+                "items_cost": 0,
+            })
+            entry["items"].append({**product, "request_card": card, "quantity": take})
+            entry["items_cost"] += take * product["price"]
+        if remaining > 0:
+            unfilled[card] = remaining
+
+    plan_sellers = sorted(by_seller.values(), key=lambda s: -s["items_cost"])
+    for entry in plan_sellers:
+        entry["fixed_cost"] = fixed_cost
+        entry["total_cost"] = entry["items_cost"] + fixed_cost
+    items_cost = sum(s["items_cost"] for s in plan_sellers)
+    return {
+        "sellers": plan_sellers,
+        "items_cost": items_cost,
+        "fixed_cost_total": fixed_cost * len(plan_sellers),
+        "total_cost": items_cost + fixed_cost * len(plan_sellers),
+        "unfilled": unfilled,
+    }
@@ -0,0 +1,147 @@
+"""Google ID token verification with cached signing certificates.
+
+``id_token.verify_oauth2_token`` downloads Google's certificates through
+whatever transport it is given, so building a new ``Request()`` per login puts
+an external fetch on the login path. ``GoogleTokenVerifier`` keeps one pooled
+session and the current certificates, honours the ``Cache-Control: max-age``
+Google sends with them, and refreshes them in the background shortly before
+they expire so logins never wait on the fetch once the cache is warm.
+"""
+import logging
+import re
+import threading
+import time
+
+import jwt
+import requests
+from google.auth import jwt as google_jwt
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+def parse_max_age(cache_control: str | None) -> int | None:
+    """Return the ``max-age`` directive of a Cache-Control header, in seconds."""
+    if not cache_control:
+        return None
+    match = _MAX_AGE.search(cache_control)
+    return int(match.group(1)) if match else None
+
+
+class GoogleTokenVerifier:
+    """Verifies Google ID tokens against a cached copy of Google's certificates."""
+
+    def __init__(self, certs_url: str = GOOGLE_CERTS_URL, timeout: float = 5.0,
+                 default_ttl: float = 3600.0, refresh_margin: float = 300.0,
+                 min_refetch_interval: float = 60.0, clock_skew_seconds: int = 10):
+        self.certs_url = certs_url
+        self.timeout = timeout
+        self.default_ttl = default_ttl
+        self.refresh_margin = refresh_margin
+        self.min_refetch_interval = min_refetch_interval
+        self.clock_skew_seconds = clock_skew_seconds
+
+        self._certs: dict[str, str] | None = None
+        self._expires_at = 0.0
+        self._last_attempt = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+    def verify(self, token: str, audience: str) -> dict:
+        """Verify ``token`` and return its claims.
+
+        Raises ValueError if the token is malformed, expired, for another
+        audience, signed by an unknown key or issued by someone other than Google.
+        """
+        try:
+            key_id = jwt.get_unverified_header(token).get("kid")
+        except jwt.InvalidTokenError as e:
+            raise ValueError(str(e)) from e
+
+        certs = self.certs()
+        if key_id and key_id not in certs:
+            # Google rotated its keys before our copy expired
+            certs = self.certs(force=True)
+
+        idinfo = google_jwt.decode(
+            token,
+            certs=certs,
+            audience=audience,
+            clock_skew_in_seconds=self.clock_skew_seconds,
+        )
+        if idinfo.get("iss") not in GOOGLE_ISSUERS:
+            raise ValueError(f"Wrong issuer: {idinfo.get('iss')}")
+        return idinfo
+
+    def certs(self, force: bool = False) -> dict[str, str]:
+        """Return the current certificates, fetching them only when needed.
+
+        A cold or expired cache is filled synchronously; within
+        ``refresh_margin`` of expiry a background refresh is started and the
+        cached copy is returned immediately.
+        """
+        now = time.monotonic()
+        certs = self._certs
+        if certs is not None and now < self._expires_at and not force:
+            if now >= self._expires_at - self.refresh_margin:
+                self._refresh_in_background()
+            return certs
+
+        with self._lock:
+            # Another thread may have refreshed while we waited for the lock
+            now = time.monotonic()
+            recently_fetched = now - self._last_attempt < self.min_refetch_interval
+            if self._certs is not None and now < self._expires_at and (not force or recently_fetched):
+                return self._certs
+            try:
+                self._fetch()
+            except requests.RequestException as e:
+                if self._certs is None:
+                    raise
+                # Keep serving the last good copy rather than failing logins
+                logger.warning("Google certs refresh failed, using cached copy: %s", e)
+            return self._certs
+
+    def _fetch(self):
+        self._last_attempt = time.monotonic()
+        resp = self.session.get(self.certs_url, timeout=self.timeout)
+        resp.raise_for_status()
+        certs = resp.json()
+        ttl = parse_max_age(resp.headers.get("Cache-Control"))
+        now = time.monotonic()
+        self._certs = certs
+        self._expires_at = now + (ttl if ttl is not None else self.default_ttl)
+        logger.info("Fetched %d Google signing certs, valid for %ss", len(certs),
+                    ttl if ttl is not None else self.default_ttl)
+
+    def _refresh_in_background(self):
+        # Unlocked check; a rare second thread re-checks under the lock and exits
+        if self._refreshing:
+            return
+        self._refreshing = True
+        threading.Thread(target=self._background_refresh, name="google-certs-refresh",
+                         daemon=True).start()
+
+    def _background_refresh(self):
+        try:
+            with self._lock:
+                now = time.monotonic()
+                if (now < self._expires_at - self.refresh_margin
+                        or now - self._last_attempt < self.min_refetch_interval):
+                    return
+                self._fetch()
+        except Exception:
+            logger.exception("Google certs background refresh failed")
+        finally:
+            self._refreshing = False
+
+
+google_verifier = GoogleTokenVerifier()
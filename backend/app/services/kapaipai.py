@@ -138,4 +138,5 @@ def get_price_summary(card_key: str, rare: str,
         "lowest_price": lowest,
         "avg_price": round(avg, 2) if avg else None,
         "products": buyable,
+        "raw_products": products,
     }
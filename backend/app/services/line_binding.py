@@ -1,84 +1,216 @@
 """LINE account binding via verification code."""
+import heapq
 import logging
 import random
 import string
+import threading
 from datetime import datetime, timezone, timedelta
 
 import requests
 from flask import current_app
+from sqlalchemy import delete, literal
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 
+from app.auth import invalidate_user
 from app.extensions import db
-from app.models import User
+from app.models import LineBindingCode, User
 
 logger = logging.getLogger(__name__)
 
-_pending_codes: dict[str, dict] = {}
-
 CODE_TTL_MINUTES = 5
 
+# Attempts at drawing an unused code before giving up
+ISSUE_ATTEMPTS = 100
+
+# Postgres's default name for the table's primary key, on ``code``
+_CODE_PKEY = f"{LineBindingCode.__tablename__}_pkey"
+
+
+def _random_code() -> str:
+    return "".join(random.choices(string.digits, k=6))
+
+
+def _is_code_collision(e: IntegrityError) -> bool:
+    """Whether ``e`` is a unique violation of the code primary key."""
+    diag = getattr(e.orig, "diag", None)
+    return (
+        getattr(e.orig, "pgcode", None) == "23505"
+        and getattr(diag, "constraint_name", None) == _CODE_PKEY
+    )
+
+
+class InMemoryBindingCodeStore:
+    """Process-local store; codes are only visible to the process that issued them.
+
+    Keeps a per-user index and an expiry heap so every operation is O(log n).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._codes: dict[str, tuple[int, datetime]] = {}
+        self._by_user: dict[int, str] = {}
+        self._expiry: list[tuple[datetime, str]] = []
+
+    def issue(self, user_id: int, ttl: timedelta) -> str:
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            self._purge_expired(now)
+            old = self._by_user.pop(user_id, None)
+            if old is not None:
+                self._codes.pop(old, None)
+
+            for _ in range(ISSUE_ATTEMPTS):
+                code = _random_code()
+                if code not in self._codes:
+                    break
+            else:
+                raise RuntimeError(f"No free binding code after {ISSUE_ATTEMPTS} attempts")
+
+            expires = now + ttl
+            self._codes[code] = (user_id, expires)
+            self._by_user[user_id] = code
+            heapq.heappush(self._expiry, (expires, code))
+            return code
+
+    def consume(self, code: str) -> tuple[int, bool] | None:
+        """Remove ``code`` and return ``(user_id, expired)``, or None if unknown."""
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            entry = self._codes.pop(code, None)
+            if entry is None:
+                return None
+            user_id, expires = entry
+            if self._by_user.get(user_id) == code:
+                del self._by_user[user_id]
+            return user_id, expires < now
+
+    def _purge_expired(self, now: datetime):
+        while self._expiry and self._expiry[0][0] < now:
+            expires, code = heapq.heappop(self._expiry)
+            entry = self._codes.get(code)
+            # Skip heap entries whose code was consumed or reissued since
+            if entry is not None and entry[1] == expires:
+                del self._codes[code]
+                if self._by_user.get(entry[0]) == code:
+                    del self._by_user[entry[0]]
+
+
+class DatabaseBindingCodeStore:
+    """Codes in the ``line_binding_codes`` table, shared by every worker process.
+
+    ``user_id`` is unique and ``expires_at`` is indexed, so replacing a user's
+    code and purging expired codes are index lookups.
+    """
+
+    def issue(self, user_id: int, ttl: timedelta) -> str:
+        now = datetime.now(timezone.utc)
+        db.session.execute(delete(LineBindingCode).where(LineBindingCode.expires_at < now))
+
+        for _ in range(ISSUE_ATTEMPTS):
+            code = _random_code()
+            # Replaces the user's code in place, so a concurrent issue() for the
+            # same user overwrites rather than conflicts; the last one wins
+            stmt = insert(LineBindingCode).values(code=code, user_id=user_id, expires_at=now + ttl)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[LineBindingCode.user_id],
+                set_={"code": stmt.excluded.code, "expires_at": stmt.excluded.expires_at},
+            )
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(stmt)
+            except IntegrityError as e:
+                if _is_code_collision(e):
+                    continue  # the code belongs to another user, try another
+                # e.g. the user row is gone (foreign key violation)
+                db.session.rollback()
+                raise
+            db.session.commit()
+            return code
+        db.session.rollback()
+        raise RuntimeError(f"No free binding code after {ISSUE_ATTEMPTS} attempts")
+
+    def consume(self, code: str) -> tuple[int, bool] | None:
+        """Delete ``code`` and return ``(user_id, expired)``, or None if unknown.
+
+        The caller commits; the delete is atomic, so a code is consumed once.
+        """
+        row = db.session.execute(
+            delete(LineBindingCode)
+            .where(LineBindingCode.code == code)
+            .returning(
+                LineBindingCode.user_id,
+                LineBindingCode.expires_at < literal(datetime.now(timezone.utc)),
+            )
+        ).first()
+        if row is None:
+            return None
+        return row[0], bool(row[1])
+
+
+_memory_store = InMemoryBindingCodeStore()
+_database_store = DatabaseBindingCodeStore()
+
+
+def get_code_store():
+    """Return the backend selected by ``LINE_BINDING_CODE_STORE``."""
+    if current_app.config.get("LINE_BINDING_CODE_STORE") == "memory":
+        return _memory_store
+    return _database_store
+
 
 def generate_binding_code(user_id: int) -> str:
     """Generate a 6-digit binding code for the given user. Replaces any existing code."""
-    # Remove old codes for this user
-    to_remove = [c for c, v in _pending_codes.items() if v["user_id"] == user_id]
-    for c in to_remove:
-        del _pending_codes[c]
-
-    # Clean expired codes
-    now = datetime.now(timezone.utc)
-    expired = [c for c, v in _pending_codes.items() if v["expires"] < now]
-    for c in expired:
-        del _pending_codes[c]
-
-    # Generate unique 6-digit code
-    for _ in range(100):
-        code = "".join(random.choices(string.digits, k=6))
-        if code not in _pending_codes:
-            break
-
-    _pending_codes[code] = {
-        "user_id": user_id,
-        "expires": now + timedelta(minutes=CODE_TTL_MINUTES),
-    }
-    return code
-
-
-def verify_binding_code(code: str, line_user_id: str) -> tuple[bool, str]:
+    return get_code_store().issue(user_id, timedelta(minutes=CODE_TTL_MINUTES))
+
+
+def verify_binding_code(code: str, line_user_id: str,
+                        session: requests.Session | None = None) -> tuple[bool, str]:
     """Verify a binding code and link the LINE user ID to the user account.
 
+    ``session`` is an optional pooled HTTP session for the profile lookup.
+
     Returns (success, message).
     """
-    now = datetime.now(timezone.utc)
-
-    entry = _pending_codes.get(code)
-    if not entry:
+    entry = get_code_store().consume(code)
+    if entry is None:
+        db.session.commit()
         return False, "驗證碼無效，請重新產生"
 
-    if entry["expires"] < now:
-        del _pending_codes[code]
+    user_id, expired = entry
+    if expired:
+        db.session.commit()
         return False, "驗證碼已過期，請重新產生"
 
-    user = User.query.get(entry["user_id"])
+    user = User.query.get(user_id)
     if not user:
-        del _pending_codes[code]
+        db.session.commit()
         return False, "找不到對應的使用者"
 
     user.line_user_id = line_user_id
-    user.line_display_name = _fetch_line_display_name(line_user_id)
+    user.line_display_name = None
     db.session.commit()
-    del _pending_codes[code]
+    invalidate_user(user_id)
+
+    # Profile lookup happens outside the binding transaction
+    display_name = _fetch_line_display_name(line_user_id, session)
+    if display_name:
+        user.line_display_name = display_name
+        db.session.commit()
+        invalidate_user(user_id)
 
     display = user.line_display_name or user.nickname
     return True, f"綁定成功！{display}，之後到價通知會發送到你的 LINE"
 
 
-def _fetch_line_display_name(line_user_id: str) -> str | None:
+def _fetch_line_display_name(line_user_id: str,
+                             session: requests.Session | None = None) -> str | None:
     """Fetch LINE user display name via the LINE Bot Profile API."""
     token = current_app.config.get("LINE_CHANNEL_ACCESS_TOKEN", "")
     if not token:
         return None
     try:
-        resp = requests.get(
+        resp = (session or requests).get(
             f"https://api.line.me/v2/bot/profile/{line_user_id}",
             headers={"Authorization": f"Bearer {token}"},
             timeout=5,
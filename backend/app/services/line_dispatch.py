@@ -0,0 +1,301 @@
+"""Asynchronous LINE push dispatch.
+
+A bounded pool of sender threads delivers push/multicast jobs handed over by
+the outbox relay (see ``alert_outbox``). Senders share a pooled HTTP session,
+honour ``Retry-After`` on 429 and back off exponentially on 5xx / network
+errors, then mark the outbox row and its notifications ``sent`` or ``failed``.
+
+A sender never waits past its job's lease. If retries are used up, the lease
+would run out, or ``Retry-After`` is longer than the in-process backoff cap,
+the row goes back to ``pending`` with a later ``available_at`` for the relay
+to claim again. Only a non-retryable 4xx, or a row that reached
+``max_attempts`` claims, is marked ``failed``.
+"""
+import logging
+import queue
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from flask import current_app
+from requests.adapters import HTTPAdapter
+
+from app.extensions import db
+from app.services.notifier import encode_payload
+
+logger = logging.getLogger(__name__)
+
+PUSH_URL = "https://api.line.me/v2/bot/message/push"
+MULTICAST_URL = "https://api.line.me/v2/bot/message/multicast"
+
+
+@dataclass
+class PushJob:
+    """One LINE API call: a push if ``to`` is a user id, a multicast if it is a list."""
+    to: str | list[str]
+    messages: bytes  # serialized JSON array of message objects
+    notification_ids: list[int] = field(default_factory=list)
+    outbox_id: int | None = None
+    retry_key: str | None = None
+    attempts: int = 0  # outbox claims so far, including this one
+    lease_expires: float | None = None  # time.monotonic() deadline of the claim
+
+    @property
+    def is_multicast(self) -> bool:
+        return isinstance(self.to, list)
+
+
+class _RetryLater(Exception):
+    """Delivery failed for now; the outbox row should be claimed again later."""
+
+    def __init__(self, error: str | None, delay: float | None = None):
+        super().__init__(error)
+        self.error = error
+        self.delay = delay
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class LineDispatcher:
+    """Bounded worker pool that delivers PushJobs to the LINE Messaging API."""
+
+    def __init__(self, app, workers: int = 4, max_retries: int = 5,
+                 backoff_base: float = 1.0, backoff_max: float = 60.0,
+                 timeout: float = 10.0, max_attempts: int = 10,
+                 retry_base: float = 60.0, retry_max: float = 3600.0):
+        self.app = app
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        # Outbox-level retries, across claims
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+
+        self._queue: queue.Queue[PushJob | None] = queue.Queue()
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        # Shared pause after a 429 so all senders respect the rate limit together
+        self._paused_until = 0.0
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount("https://", adapter)
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._run, name=f"line-dispatch-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+        logger.info("LINE dispatcher started with %d workers", self.workers)
+
+    def submit(self, job: PushJob):
+        self.start()
+        self._queue.put(job)
+
+    def shutdown(self, wait: bool = True):
+        """Stop workers after the queue drains."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        if wait:
+            for t in threads:
+                t.join()
+        self.session.close()
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                try:
+                    error = self._deliver(job)
+                except _RetryLater as e:
+                    self._retry_later(job, e.error, e.delay)
+                else:
+                    self._record(job, "sent" if error is None else "failed", error)
+            except Exception:
+                logger.exception("LINE dispatch worker error")
+            finally:
+                self._queue.task_done()
+
+    def _deliver(self, job: PushJob) -> str | None:
+        """Send ``job``, retrying as needed. Returns None on success, else the error.
+
+        Raises ``_RetryLater`` when the failure is retryable but this claim
+        can't (or shouldn't) keep trying.
+        """
+        token = self.app.config["LINE_CHANNEL_ACCESS_TOKEN"]
+        if not token or not job.to:
+            logger.error("LINE credentials not configured")
+            return "LINE credentials not configured"
+
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {token}",
+        }
+        if job.retry_key:
+            headers["X-Line-Retry-Key"] = job.retry_key
+        url = MULTICAST_URL if job.is_multicast else PUSH_URL
+        payload = encode_payload(job.to, job.messages)
+        target = f"{len(job.to)} recipients" if job.is_multicast else job.to
+
+        error = None
+        for attempt in range(self.max_retries + 1):
+            paused = max(0.0, self._paused_until - time.monotonic())
+            self._check_lease(job, paused, error)
+            if paused:
+                time.sleep(paused)
+            delay = self._backoff(attempt)
+            try:
+                resp = self.session.post(url, headers=headers, data=payload,
+                                         timeout=self.timeout)
+            except requests.RequestException as e:
+                error = str(e)
+                logger.warning("LINE push to %s failed (attempt %d): %s", target, attempt + 1, e)
+            else:
+                if resp.status_code == 200:
+                    logger.info("LINE message sent successfully to %s", target)
+                    return None
+                if resp.status_code == 409 and job.retry_key:
+                    # Same X-Line-Retry-Key already accepted by an earlier attempt
+                    logger.info("LINE message to %s already accepted (retry key %s)",
+                                target, job.retry_key)
+                    return None
+                error = f"[{resp.status_code}] {resp.text}"
+                if resp.status_code == 429:
+                    retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                    delay = retry_after if retry_after is not None else delay
+                    self._pause(delay)
+                    if delay > self.backoff_max:
+                        # Don't hold a sender that long; the outbox keeps the row
+                        raise _RetryLater(error, delay)
+                    logger.warning("LINE rate limited, retrying in %.1fs", delay)
+                elif resp.status_code < 500:
+                    logger.error("LINE Error [%d]: %s", resp.status_code, resp.text)
+                    return error
+                else:
+                    logger.warning("LINE Error [%d] (attempt %d): %s",
+                                   resp.status_code, attempt + 1, resp.text)
+            if attempt < self.max_retries:
+                self._check_lease(job, delay, error)
+                time.sleep(delay)
+
+        logger.warning("LINE push to %s still failing after %d attempts", target, self.max_retries + 1)
+        raise _RetryLater(error)
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _pause(self, seconds: float):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _check_lease(self, job: PushJob, wait: float, error: str | None):
+        """Hand ``job`` back if waiting ``wait`` and one more request would outlive its lease."""
+        if job.lease_expires is not None and time.monotonic() + wait + self.timeout > job.lease_expires:
+            raise _RetryLater(error, wait)
+
+    def _retry_backoff(self, attempts: int) -> float:
+        return min(self.retry_max, self.retry_base * (2 ** max(0, attempts - 1)))
+
+    def _retry_later(self, job: PushJob, error: str | None, delay: float | None):
+        """Put the outbox row back to ``pending``, or fail it once it is out of attempts."""
+        from app.models import AlertOutbox
+
+        if job.outbox_id is None or job.attempts >= self.max_attempts:
+            logger.error("LINE push for outbox row %s gave up after %d claim(s): %s",
+                         job.outbox_id, job.attempts, error)
+            self._record(job, "failed", error)
+            return
+        delay = max(delay or 0.0, self._retry_backoff(job.attempts))
+        logger.warning("LINE push for outbox row %d retried in %.0fs (claim %d of %d): %s",
+                       job.outbox_id, delay, job.attempts, self.max_attempts, error)
+        with self.app.app_context():
+            # Only while this claim still holds the row
+            AlertOutbox.query.filter_by(
+                id=job.outbox_id, status="sending", attempts=job.attempts,
+            ).update(
+                {
+                    "status": "pending",
+                    "available_at": datetime.now(timezone.utc) + timedelta(seconds=delay),
+                    "last_error": error,
+                },
+                synchronize_session=False,
+            )
+            db.session.commit()
+
+    def _record(self, job: PushJob, status: str, error: str | None = None):
+        from app.models import AlertOutbox, Notification
+
+        now = datetime.now(timezone.utc)
+        with self.app.app_context():
+            if job.outbox_id is not None:
+                # A claim whose lease ran out leaves the row to whoever claimed it next
+                claimed = AlertOutbox.query.filter_by(
+                    id=job.outbox_id, status="sending", attempts=job.attempts,
+                ).update(
+                    {"status": status, "sent_at": now, "last_error": error},
+                    synchronize_session=False,
+                )
+                if not claimed:
+                    db.session.rollback()
+                    return
+            if job.notification_ids:
+                # sent_at stays the time the alert was raised
+                Notification.query.filter(Notification.id.in_(job.notification_ids)).update(
+                    {"status": status},
+                    synchronize_session=False,
+                )
+            db.session.commit()
+
+
+_dispatcher: LineDispatcher | None = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> LineDispatcher:
+    """Return the process-wide dispatcher, creating it for the current app."""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            app = current_app._get_current_object()
+            _dispatcher = LineDispatcher(
+                app,
+                workers=app.config["LINE_DISPATCH_WORKERS"],
+                max_retries=app.config["LINE_DISPATCH_MAX_RETRIES"],
+                backoff_base=app.config["LINE_DISPATCH_BACKOFF_SECONDS"],
+                backoff_max=app.config["LINE_DISPATCH_BACKOFF_MAX_SECONDS"],
+                max_attempts=app.config["ALERT_OUTBOX_MAX_ATTEMPTS"],
+                retry_base=app.config["ALERT_OUTBOX_RETRY_SECONDS"],
+                retry_max=app.config["ALERT_OUTBOX_RETRY_MAX_SECONDS"],
+            )
+        return _dispatcher
@@ -0,0 +1,255 @@
+"""Background processing of LINE webhook events.
+
+The webhook route only verifies the signature and enqueues events here. A
+small pool of consumer threads handles them with a pooled HTTP session,
+replying while the reply token is still valid and falling back to a push
+message once it has expired.
+
+The queue lives in the web worker process, so gunicorn's ``worker_exit``
+hook calls ``shutdown_consumer`` to finish queued events before a recycled
+or redeployed worker exits.
+"""
+import logging
+import queue
+import re
+import threading
+import time
+from collections import deque
+
+import requests
+from flask import current_app
+from requests.adapters import HTTPAdapter
+
+from app.services.line_binding import verify_binding_code
+
+logger = logging.getLogger(__name__)
+
+CODE_PATTERN = re.compile(r"^\d{6}$")
+
+REPLY_URL = "https://api.line.me/v2/bot/message/reply"
+PUSH_URL = "https://api.line.me/v2/bot/message/push"
+
+# LINE only guarantees a reply token for about a minute after the event
+REPLY_TOKEN_TTL_SECONDS = 60
+
+
+class WebhookMetrics:
+    """Thread-safe counters and recent latency samples for webhook handling."""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self.counters = {
+            "received": 0,
+            "rejected": 0,
+            "processed": 0,
+            "failed": 0,
+            "replied": 0,
+            "pushed": 0,
+            "send_failed": 0,
+            "reply_expired": 0,
+        }
+        self._queue_ms: deque[float] = deque(maxlen=window)
+        self._handler_ms: deque[float] = deque(maxlen=window)
+
+    def incr(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] += n
+
+    def observe(self, queue_ms: float, handler_ms: float):
+        with self._lock:
+            self._queue_ms.append(queue_ms)
+            self._handler_ms.append(handler_ms)
+
+    @staticmethod
+    def _summary(samples) -> dict:
+        if not samples:
+            return {"count": 0, "p50": None, "p95": None, "p99": None, "max": None}
+        ordered = sorted(samples)
+
+        def pct(p):
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 2)
+
+        return {
+            "count": len(ordered),
+            "p50": pct(0.50),
+            "p95": pct(0.95),
+            "p99": pct(0.99),
+            "max": round(ordered[-1], 2),
+        }
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "queue_wait_ms": self._summary(self._queue_ms),
+                "handler_ms": self._summary(self._handler_ms),
+            }
+
+
+class WebhookConsumer:
+    """Bounded queue plus worker threads that process LINE webhook events."""
+
+    def __init__(self, app, workers: int = 4, queue_size: int = 1000):
+        self.app = app
+        self.workers = workers
+        self.metrics = WebhookMetrics()
+        self._queue: queue.Queue[tuple[dict, float] | None] = queue.Queue(maxsize=queue_size)
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=workers))
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._run, name=f"line-webhook-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+        logger.info("LINE webhook consumer started with %d workers", self.workers)
+
+    def submit(self, events: list[dict]) -> bool:
+        """Enqueue all of ``events`` without blocking, or none of them.
+
+        Returns False if they don't all fit in the queue; the caller should
+        then fail the webhook so LINE redelivers it. Rejected events are
+        counted under ``rejected`` and logged with their webhook event ids.
+        """
+        self.start()
+        now = time.monotonic()
+        self.metrics.incr("received", len(events))
+        # Only submit adds to the queue, so free space can't shrink while we hold the lock
+        with self._lock:
+            if self._queue.maxsize - self._queue.qsize() >= len(events):
+                for event in events:
+                    self._queue.put_nowait((event, now))
+                return True
+        self.metrics.incr("rejected", len(events))
+        logger.error("LINE webhook queue full (%d), rejecting %d event(s): %s",
+                     self._queue.maxsize, len(events),
+                     ", ".join(f"{e.get('type')} {e.get('webhookEventId')}" for e in events))
+        return False
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    def shutdown(self, wait: bool = True, timeout: float | None = None):
+        """Stop the workers once the events queued so far are handled.
+
+        With ``timeout``, gives up after that many seconds in total; events
+        still queued then are logged and lost.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        def remaining():
+            return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+        with self._lock:
+            threads, self._threads = self._threads, []
+        try:
+            for _ in threads:
+                self._queue.put(None, timeout=remaining())
+            if wait:
+                for t in threads:
+                    t.join(remaining())
+        except queue.Full:
+            pass
+        left = sum(1 for t in threads if t.is_alive())
+        if left:
+            logger.error("LINE webhook consumer stopped with %d worker(s) busy and %d event(s) queued",
+                         left, self._queue.qsize())
+        self.session.close()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            event, enqueued_at = item
+            started = time.monotonic()
+            try:
+                with self.app.app_context():
+                    self.handle_event(event)
+                self.metrics.incr("processed")
+            except Exception:
+                self.metrics.incr("failed")
+                logger.exception("LINE webhook event failed")
+            finally:
+                done = time.monotonic()
+                self.metrics.observe((started - enqueued_at) * 1000, (done - started) * 1000)
+
+    def handle_event(self, event: dict):
+        if event.get("type") != "message":
+            return
+        if event.get("message", {}).get("type") != "text":
+            return
+
+        text = event["message"]["text"].strip()
+        reply_token = event.get("replyToken")
+        line_user_id = event.get("source", {}).get("userId")
+
+        if not line_user_id:
+            return
+
+        if CODE_PATTERN.match(text):
+            _, msg = verify_binding_code(text, line_user_id, session=self.session)
+        else:
+            msg = "請輸入 6 位數驗證碼來綁定帳號"
+
+        # Event timestamps are epoch milliseconds
+        deadline = event.get("timestamp", time.time() * 1000) / 1000 + REPLY_TOKEN_TTL_SECONDS
+        if reply_token and time.time() < deadline:
+            sent = self._send(REPLY_URL, {"replyToken": reply_token,
+                                          "messages": [{"type": "text", "text": msg}]})
+            self.metrics.incr("replied" if sent else "send_failed")
+        else:
+            self.metrics.incr("reply_expired")
+            logger.warning("LINE reply token expired, pushing to %s instead", line_user_id)
+            sent = self._send(PUSH_URL, {"to": line_user_id,
+                                         "messages": [{"type": "text", "text": msg}]})
+            self.metrics.incr("pushed" if sent else "send_failed")
+
+    def _send(self, url: str, payload: dict) -> bool:
+        """POST to the LINE API; logs and returns False on failure."""
+        token = self.app.config["LINE_CHANNEL_ACCESS_TOKEN"]
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {token}",
+        }
+        try:
+            resp = self.session.post(url, headers=headers, json=payload, timeout=10)
+        except requests.RequestException as e:
+            logger.error("LINE reply failed: %s", e)
+            return False
+        if resp.status_code != 200:
+            logger.error("LINE reply error [%d]: %s", resp.status_code, resp.text)
+            return False
+        return True
+
+
+_consumer: WebhookConsumer | None = None
+_consumer_lock = threading.Lock()
+
+
+def get_consumer() -> WebhookConsumer:
+    """Return the process-wide webhook consumer, creating it for the current app."""
+    global _consumer
+    with _consumer_lock:
+        if _consumer is None:
+            app = current_app._get_current_object()
+            _consumer = WebhookConsumer(
+                app,
+                workers=app.config["LINE_WEBHOOK_WORKERS"],
+                queue_size=app.config["LINE_WEBHOOK_QUEUE_SIZE"],
+            )
+        return _consumer
+
+
+def shutdown_consumer(timeout: float | None = None):
+    """Drain and stop the process-wide consumer, if this process started one."""
+    with _consumer_lock:
+        consumer = _consumer
+    if consumer is not None:
+        consumer.shutdown(wait=True, timeout=timeout)
@@ -0,0 +1,200 @@
+"""Columnar archive of raw kapaipai listings.
+
+Every fetched listing set is buffered and written as zstd-compressed Parquet,
+partitioned as ``<root>/date=YYYY-MM-DD/variant=<variant_id>/part-*.parquet``.
+Each flush adds a small file per partition; ``compact_partitions`` merges a
+finished day's files into one per variant (run by the worker's maintenance
+job). Enabled by setting ``LISTING_ARCHIVE_DIR``; pyarrow is only imported when used.
+"""
+import hashlib
+import logging
+import os
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = [
+    "product_id", "seller_id", "price", "stock", "condition", "status",
+    "seller_area", "credit", "card_key", "rare", "pack_id", "pack_card_id",
+    "fetched_at",
+]
+
+
+def variant_id(card_key: str, rare: str,
+               pack_id: str | None = None, pack_card_id: str | None = None) -> str:
+    """Stable, path-safe identifier for a card variant."""
+    raw = "|".join([card_key, rare, pack_id or "", pack_card_id or ""])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _schema():
+    import pyarrow as pa
+    return pa.schema([
+        ("product_id", pa.int64()),
+        ("seller_id", pa.int64()),
+        ("price", pa.int32()),
+        ("stock", pa.int32()),
+        ("condition", pa.dictionary(pa.int8(), pa.string())),
+        ("status", pa.dictionary(pa.int8(), pa.string())),
+        ("seller_area", pa.dictionary(pa.int16(), pa.string())),
+        ("credit", pa.int32()),
+        ("card_key", pa.string()),
+        ("rare", pa.string()),
+        ("pack_id", pa.string()),
+        ("pack_card_id", pa.string()),
+        ("fetched_at", pa.timestamp("us", tz="UTC")),
+    ])
+
+
+class ListingArchive:
+    """Buffers listing rows per (date, variant) partition and flushes them to Parquet."""
+
+    def __init__(self, root: str, compression: str = "zstd"):
+        self.root = root
+        self.compression = compression
+        self._buffers: dict[tuple[date, str], dict[str, list]] = defaultdict(
+            lambda: {c: [] for c in COLUMNS}
+        )
+
+    def add(self, card_key: str, rare: str, pack_id: str | None,
+            pack_card_id: str | None, products: list[dict],
+            fetched_at: datetime | None = None):
+        """Buffer the raw ``products`` list returned by ``fetch_products``."""
+        fetched_at = fetched_at or datetime.now(timezone.utc)
+        buf = self._buffers[(fetched_at.date(), variant_id(card_key, rare, pack_id, pack_card_id))]
+        for p in products:
+            buf["product_id"].append(int(p["id"]))
+            buf["seller_id"].append(int(p["sellerId"]))
+            buf["price"].append(int(p["price"]))
+            buf["stock"].append(int(p["stock"]))
+            buf["condition"].append(p.get("condition"))
+            buf["status"].append(p.get("status"))
+            buf["seller_area"].append(p.get("sellerArea"))
+            buf["credit"].append(int(p.get("credit") or 0))
+            buf["card_key"].append(card_key)
+            buf["rare"].append(rare)
+            buf["pack_id"].append(pack_id)
+            buf["pack_card_id"].append(pack_card_id)
+            buf["fetched_at"].append(fetched_at)
+
+    def flush(self) -> int:
+        """Write all buffered partitions. Returns the number of rows written."""
+        if not self._buffers:
+            return 0
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = _schema()
+        written = 0
+        for (day, vid), columns in self._buffers.items():
+            if not columns["product_id"]:
+                continue
+            table = pa.Table.from_pydict(columns, schema=schema)
+            part_dir = os.path.join(self.root, f"date={day.isoformat()}", f"variant={vid}")
+            os.makedirs(part_dir, exist_ok=True)
+            path = os.path.join(part_dir, f"part-{uuid.uuid4().hex}.parquet")
+            pq.write_table(table, path, compression=self.compression)
+            written += table.num_rows
+        self._buffers.clear()
+        logger.info("Archived %d listing rows to %s", written, self.root)
+        return written
+
+
+def open_archive(app_config) -> ListingArchive | None:
+    """Return a ListingArchive if ``LISTING_ARCHIVE_DIR`` is configured."""
+    root = app_config.get("LISTING_ARCHIVE_DIR")
+    if not root:
+        return None
+    return ListingArchive(root, app_config.get("LISTING_ARCHIVE_COMPRESSION", "zstd"))
+
+
+def compact_partitions(root: str, before: date, compression: str = "zstd") -> int:
+    """Merge each variant's part files into one for every day before ``before``.
+
+    The merged file is written under a hidden name (ignored by readers) and
+    renamed into place before the parts it replaces are removed; parts
+    added meanwhile are left for the next run. Returns partitions compacted.
+    """
+    if not os.path.isdir(root):
+        return 0
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _schema()
+    compacted = 0
+    for day_dir in sorted(os.listdir(root)):
+        if not day_dir.startswith("date="):
+            continue
+        try:
+            day = date.fromisoformat(day_dir[len("date="):])
+        except ValueError:
+            continue
+        if day >= before:
+            continue
+        day_path = os.path.join(root, day_dir)
+        for variant_dir in sorted(os.listdir(day_path)):
+            part_dir = os.path.join(day_path, variant_dir)
+            parts = sorted(
+                os.path.join(part_dir, f) for f in os.listdir(part_dir)
+                if f.startswith("part-") and f.endswith(".parquet")
+            )
+            if len(parts) < 2:
+                continue
+            table = pa.concat_tables(
+                [pq.read_table(path, schema=schema) for path in parts]
+            ).sort_by("fetched_at")
+            name = f"part-{uuid.uuid4().hex}.parquet"
+            tmp = os.path.join(part_dir, f".{name}")
+            pq.write_table(table, tmp, compression=compression)
+            os.replace(tmp, os.path.join(part_dir, name))
+            for path in parts:
+                os.remove(path)
+            compacted += 1
+    if compacted:
+        logger.info("Compacted %d listing archive partition(s) in %s", compacted, root)
+    return compacted
+
+
+def scan_listings(root: str, columns: list[str] | None = None,
+                  date_from: date | None = None, date_to: date | None = None,
+                  variant: str | None = None, seller_id: int | None = None,
+                  max_price: int | None = None, condition: str | None = None):
+    """Scan the archive with projection and predicate pushdown.
+
+    Date and variant filters prune whole partitions; the remaining predicates
+    are pushed down to Parquet row-group statistics.
+
+    Returns a ``pyarrow.Table``.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    partitioning = ds.partitioning(
+        pa.schema([("date", pa.date32()), ("variant", pa.string())]), flavor="hive"
+    )
+    dataset = ds.dataset(root, format="parquet", partitioning=partitioning)
+
+    expr = None
+
+    def _and(e):
+        nonlocal expr
+        expr = e if expr is None else expr & e
+
+    if date_from:
+        _and(ds.field("date") >= date_from)
+    if date_to:
+        _and(ds.field("date") <= date_to)
+    if variant:
+        _and(ds.field("variant") == variant)
+    if seller_id is not None:
+        _and(ds.field("seller_id") == seller_id)
+    if max_price is not None:
+        _and(ds.field("price") <= max_price)
+    if condition:
+        _and(ds.field("condition") == condition)
+
+    return dataset.to_table(columns=columns, filter=expr)
@@ -0,0 +1,75 @@
+"""Periodic housekeeping run by the background worker.
+
+Deletes go in id-ordered batches, each in its own short transaction, so a
+large backlog never holds locks for long.
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import delete, select
+
+from app.extensions import db
+from app.models import AlertOutbox, LineBindingCode
+from app.services.listing_archive import compact_partitions
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+
+def purge_sent_outbox(retention: timedelta) -> int:
+    """Delete outbox rows delivered more than ``retention`` ago. Returns rows deleted.
+
+    Failed rows are kept for inspection.
+    """
+    cutoff = datetime.now(timezone.utc) - retention
+    total = 0
+    while True:
+        batch = (
+            select(AlertOutbox.id)
+            .where(AlertOutbox.status == "sent", AlertOutbox.sent_at < cutoff)
+            .order_by(AlertOutbox.id)
+            .limit(BATCH_SIZE)
+        )
+        deleted = db.session.execute(
+            delete(AlertOutbox)
+            .where(AlertOutbox.id.in_(batch.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        total += deleted
+        if deleted < BATCH_SIZE:
+            return total
+
+
+def purge_expired_binding_codes() -> int:
+    """Delete LINE binding codes past their expiry. Returns rows deleted."""
+    deleted = db.session.execute(
+        delete(LineBindingCode)
+        .where(LineBindingCode.expires_at < datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    return deleted
+
+
+def compact_listing_archive() -> int:
+    """Compact archive partitions of past days. Returns partitions compacted."""
+    root = current_app.config.get("LISTING_ARCHIVE_DIR")
+    if not root:
+        return 0
+    today = datetime.now(timezone.utc).date()
+    return compact_partitions(
+        root, today, current_app.config.get("LISTING_ARCHIVE_COMPRESSION", "zstd")
+    )
+
+
+def run_maintenance():
+    """Run every housekeeping task. Called by the worker."""
+    retention = timedelta(days=current_app.config["OUTBOX_RETENTION_DAYS"])
+    outbox = purge_sent_outbox(retention)
+    codes = purge_expired_binding_codes()
+    partitions = compact_listing_archive()
+    logger.info("Maintenance: purged %d outbox row(s), %d binding code(s); "
+                "compacted %d archive partition(s)", outbox, codes, partitions)
@@ -0,0 +1,218 @@
+"""Market statistics for one card variant's listings.
+
+Listings are turned into a columnar ``ListingColumns`` view once (one NumPy
+array per field, with condition and area dictionary-encoded) and every
+statistic is computed with array operations over it. Results are cached by a
+digest of the columns, so refetching unchanged listings costs one hash.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from operator import itemgetter
+
+import numpy as np
+
+from app.services.kapaipai import CONDITION_MAP
+
+# Same brackets as legacy/check_price.py print_summary: ≤50, 51-100, ..., 500+
+DEFAULT_BIN_EDGES = (0, 51, 101, 151, 201, 301, 501)
+PERCENTILES = (10, 25, 50, 75, 90)
+MAX_BINS = 50
+
+_FIELDS = itemgetter("price", "stock", "credit", "condition", "seller_area")
+
+
+@dataclass(frozen=True)
+class ListingColumns:
+    price: np.ndarray      # int64
+    stock: np.ndarray      # int64
+    credit: np.ndarray     # int64
+    condition: np.ndarray  # codes into ``conditions``
+    area: np.ndarray       # codes into ``areas``
+    conditions: tuple[str, ...]
+    areas: tuple[str, ...]
+    digest: str
+
+    @classmethod
+    def from_listings(cls, listings: list[dict]) -> "ListingColumns":
+        """Build the columnar view from ``filter_buyable`` output."""
+        # One pass over the dicts, then one array per column
+        rows = list(map(_FIELDS, listings))
+        price, stock, credit, condition, area = zip(*rows) if rows else ((),) * 5
+        numeric = np.array((price, stock, credit), dtype=np.int64)
+        conditions, condition = _encode(condition)
+        areas, area = _encode(area)
+
+        h = hashlib.blake2b(numeric.tobytes(), digest_size=16)
+        h.update(condition.tobytes())
+        h.update(area.tobytes())
+        for labels in (conditions, areas):
+            h.update("\x1f".join(map(str, labels)).encode())
+
+        return cls(
+            price=numeric[0],
+            stock=numeric[1],
+            credit=numeric[2],
+            condition=condition,
+            area=area,
+            conditions=conditions,
+            areas=areas,
+            digest=h.hexdigest(),
+        )
+
+    def __len__(self) -> int:
+        return len(self.price)
+
+
+def _encode(values: tuple[str, ...]) -> tuple[tuple[str, ...], np.ndarray]:
+    """Dictionary-encode strings: (distinct labels, int64 code per value)."""
+    index: dict[str, int] = {}
+    codes = [index.setdefault(v, len(index)) for v in values]
+    return tuple(index), np.array(codes, dtype=np.int64)
+
+
+def parse_bins(value: str | None) -> tuple[float, ...] | int:
+    """Parse the ``bins`` query parameter; raises ValueError if malformed.
+
+    Either a bin count (``bins=10``, equal-width between min and max price)
+    or ascending lower edges (``bins=0,100,500``; the last bin is open-ended).
+    """
+    if not value:
+        return DEFAULT_BIN_EDGES
+    if "," not in value:
+        count = int(value)
+        if not 1 <= count <= MAX_BINS:
+            raise ValueError(f"bins must be between 1 and {MAX_BINS}")
+        return count
+    edges = tuple(float(v) for v in value.split(","))
+    if len(edges) > MAX_BINS or any(b <= a for a, b in zip(edges, edges[1:])):
+        raise ValueError(f"bin edges must be ascending, at most {MAX_BINS}")
+    return edges
+
+
+def histogram(price: np.ndarray, bins: tuple[float, ...] | int) -> list[dict]:
+    if isinstance(bins, int):
+        if not len(price):
+            return []
+        bounds = np.linspace(price.min(), price.max() + 1, bins + 1)
+    else:
+        bounds = np.append(np.asarray(bins, dtype=np.float64), np.inf)
+    edges = bounds[:-1]
+    # Bin i holds prices in [bounds[i], bounds[i + 1]); below the first edge is dropped
+    index = np.searchsorted(edges, price, side="right") - 1
+    counts = np.bincount(index[index >= 0], minlength=len(edges))
+    return [
+        {"min": round(lo, 2), "max": None if np.isinf(hi) else round(hi, 2), "count": c}
+        for lo, hi, c in zip(edges.tolist(), bounds[1:].tolist(), counts.tolist())
+    ]
+
+
+def _weighted_median(values: np.ndarray, weights: np.ndarray) -> float:
+    order = np.argsort(values, kind="stable")
+    cumulative = np.cumsum(weights[order])
+    return float(values[order][np.searchsorted(cumulative, cumulative[-1] / 2)])
+
+
+def compute_stats(columns: ListingColumns, bins: tuple[float, ...] | int = DEFAULT_BIN_EDGES) -> dict:
+    """All statistics for one set of listings; see the /api/cards/stats docstring."""
+    n = len(columns)
+    if n == 0:
+        return {
+            "count": 0, "total_stock": 0, "price": None, "credit_weighted": None,
+            "histogram": histogram(columns.price, bins), "conditions": [], "areas": [],
+        }
+
+    price = columns.price.astype(np.float64)
+    percentiles = np.percentile(price, PERCENTILES)
+
+    # log1p damps the long tail of very high-credit sellers
+    weights = np.log1p(np.maximum(columns.credit, 0)).astype(np.float64)
+    if weights.sum() > 0:
+        credit_weighted = {
+            "avg": round(float(np.average(price, weights=weights)), 2),
+            "median": _weighted_median(price, weights),
+        }
+    else:
+        credit_weighted = None
+
+    cond_counts = np.bincount(columns.condition, minlength=len(columns.conditions))
+    cond_min = np.full(len(columns.conditions), np.iinfo(np.int64).max)
+    np.minimum.at(cond_min, columns.condition, columns.price)
+    conditions = [
+        {
+            "condition": code,
+            "label": CONDITION_MAP.get(code, code),
+            "count": int(cond_counts[i]),
+            "share": round(float(cond_counts[i]) / n, 4),
+            "lowest_price": int(cond_min[i]),
+        }
+        for i, code in enumerate(columns.conditions)
+    ]
+    conditions.sort(key=lambda c: -c["count"])
+
+    area_counts = np.bincount(columns.area, minlength=len(columns.areas))
+    area_stock = np.bincount(columns.area, weights=columns.stock, minlength=len(columns.areas))
+    areas = [
+        {
+            "area": columns.areas[i],
+            "count": int(area_counts[i]),
+            "share": round(float(area_counts[i]) / n, 4),
+            "stock": int(area_stock[i]),
+        }
+        for i in np.argsort(-area_counts, kind="stable").tolist()
+    ]
+
+    return {
+        "count": n,
+        "total_stock": int(columns.stock.sum()),
+        "price": {
+            "min": int(columns.price.min()),
+            "max": int(columns.price.max()),
+            "avg": round(float(price.mean()), 2),
+            "stock_weighted_avg": round(float(np.average(price, weights=columns.stock)), 2),
+            "std": round(float(price.std()), 2),
+            "percentiles": {f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, percentiles)},
+        },
+        "credit_weighted": credit_weighted,
+        "histogram": histogram(columns.price, bins),
+        "conditions": conditions,
+        "areas": areas,
+    }
+
+
+class StatsCache:
+    """LRU of computed stats keyed by (listing digest, bins)."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, dict] = OrderedDict()
+
+    def get_or_compute(self, columns: ListingColumns, bins: tuple[float, ...] | int) -> dict:
+        key = (columns.digest, bins)
+        with self._lock:
+            stats = self._entries.get(key)
+            if stats is not None:
+                self._entries.move_to_end(key)
+                return stats
+        stats = compute_stats(columns, bins)
+        if self.max_entries > 0:
+            with self._lock:
+                self._entries[key] = stats
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+stats_cache = StatsCache()
+
+
+def market_stats(listings: list[dict], bins: tuple[float, ...] | int = DEFAULT_BIN_EDGES) -> dict:
+    """Statistics for ``filter_buyable`` listings, served from ``stats_cache`` when unchanged."""
+    return stats_cache.get_or_compute(ListingColumns.from_listings(listings), bins)
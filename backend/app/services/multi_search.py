@@ -1,15 +1,23 @@
 """Multi-card search service — find sellers who stock ALL requested cards."""
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import bisect
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from operator import itemgetter
 
+from flask import current_app
+
+from app.services.basket import solve_basket
 from app.services.kapaipai import search_cards, fetch_products, filter_buyable
 
 
-def multi_card_search(card_requests, max_workers=8):
+def multi_card_search(card_requests, executor=None):
     """Find sellers who have all requested cards with sufficient stock.
 
     Args:
         card_requests: [{"name": str, "quantity": int}, ...]
-        max_workers: max concurrent threads for API calls
+        executor: pool for the upstream calls; defaults to ``get_executor()``
 
     Returns:
         {
@@ -18,165 +26,484 @@ def multi_card_search(card_requests, max_workers=8):
             "stats": {...},            # summary statistics
         }
     """
-    card_details = {}
-    card_seller_map = {}  # card_name -> {seller_nick -> {products, total_stock, ...}}
+    sellers = {}
+    for event in multi_card_search_events(card_requests, executor):
+        if event["type"] == "seller":
+            sellers[event["seller"]["seller_nickname"]] = event["seller"]
+        elif event["type"] == "summary":
+            return {
+                "sellers": [sellers[nick] for nick in event["seller_order"]],
+                "card_details": event["card_details"],
+                "stats": event["stats"],
+            }
+
+
+def multi_card_basket(card_requests, fixed_cost=0, max_sellers=3, executor=None,
+                      time_budget=0.25, exact_max_sellers=200):
+    """Cheapest plan buying every requested card from up to ``max_sellers`` sellers.
+
+    Unlike ``multi_card_search``, sellers need not stock every card; each
+    seller used adds ``fixed_cost`` (shipping). See ``basket.solve_basket``.
 
-    # Step 1: Search all card names concurrently
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {
-            executor.submit(search_cards, req["name"]): req
-            for req in card_requests
+    Returns:
+        {
+            "plan": {...},             # solve_basket result
+            "card_details": {...},     # per-card search metadata
+            "stats": {...},            # summary statistics
         }
-        for future in as_completed(futures):
-            req = futures[future]
-            try:
-                variants = future.result()
-                card_details[req["name"]] = {
-                    "variants_count": len(variants),
-                    "variants": variants,
-                    "error": None,
-                }
-            except Exception as e:
-                card_details[req["name"]] = {
-                    "variants_count": 0,
-                    "variants": [],
-                    "error": str(e),
-                }
-
-    # Step 2: For each card, fetch products for ALL variants concurrently
-    fetch_tasks = []
-    for req in card_requests:
-        name = req["name"]
-        if card_details[name]["error"]:
-            continue
-        for variant in card_details[name]["variants"]:
-            fetch_tasks.append((name, variant))
-
-    seller_by_card = {req["name"]: {} for req in card_requests}
-
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {}
-        for card_name, variant in fetch_tasks:
-            future = executor.submit(
-                fetch_products,
-                variant["card_key"],
-                variant["rare"],
-                variant.get("pack_id"),
-                variant.get("pack_card_id"),
-            )
-            futures[future] = (card_name, variant)
-
-        for future in as_completed(futures):
-            card_name, variant = futures[future]
-            try:
-                data = future.result()
-                buyable = filter_buyable(data["products"])
-                for product in buyable:
-                    seller = product["seller_nickname"]
-                    if seller not in seller_by_card[card_name]:
-                        seller_by_card[card_name][seller] = {
-                            "products": [],
-                            "total_stock": 0,
-                            "seller_area": product["seller_area"],
-                            "credit": product["credit"],
-                            "order_complete": product["order_complete"],
-                        }
-                    entry = seller_by_card[card_name][seller]
-                    entry["products"].append({
-                        **product,
-                        "card_name": variant.get("card_name", ""),
-                        "card_key": variant.get("card_key", ""),
-                        "pack_id": variant.get("pack_id", ""),
-                        "pack_card_id": variant.get("pack_card_id", ""),
-                        "variant_pack_name": variant.get("pack_name", ""),
-                        "variant_rare": variant.get("rare", ""),
-                    })
-                    entry["total_stock"] += product["stock"]
-            except Exception:
-                pass  # skip failed variant fetches
-
-    # Step 3: Cross-reference — find sellers in ALL cards with enough stock
-    valid_names = [
-        req["name"] for req in card_requests
-        if not card_details[req["name"]].get("error")
-    ]
+    """
+    listings = {}
+    for event in multi_card_search_events(card_requests, executor, listings=listings):
+        if event["type"] == "summary":
+            summary = event
+
+    demands = {req["name"]: req["quantity"] for req in card_requests}
+    offers = {
+        name: {seller: info["products"] for seller, info in sellers.items()}
+        for name, sellers in listings.items()
+    }
+    plan = solve_basket(demands, offers, fixed_cost, max_sellers,
+                        time_budget=time_budget, exact_max_sellers=exact_max_sellers)
+    return {
+        "plan": plan,
+        "card_details": summary["card_details"],
+        "stats": summary["stats"],
+    }
+
+
+def multi_card_search_events(card_requests, executor=None, listings=None):
+    """Run a multi-card search, yielding progress events as work completes.
+
+    Each card's variant fetches are submitted the moment its search returns,
+    all on one shared I/O pool (``get_executor``), so the search is done
+    when the slowest single search-plus-fetches chain is, rather than after
+    the slowest search and then the slowest fetch.
+
+    Events (dicts with a ``type`` key):
+        search      one per card name: {"card", "variants_count", "error"}
+        fetch       one per variant listing fetch:
+                    {"card", "card_key", "rare", "pack_id", "done", "total", "error"};
+                    ``total`` grows while searches are still returning
+        candidates  when every fetch for a card has finished and its seller set
+                    is final: {"card", "cards_complete", "cards_total", "candidates"};
+                    ``cards_total`` excludes cards whose search failed so far
+        seller      a seller that currently satisfies every card; re-sent with
+                    updated products/costs when later fetches add listings, so
+                    consumers should upsert by ``seller_nickname``. Only sent
+                    once every search has returned.
+        summary     last: {"seller_order", "card_details", "stats"}, where
+                    ``seller_order`` lists matching sellers by total_cost and
+                    ``stats["timings"]`` breaks down where the time went
+
+    Stock only grows as fetches complete, so a seller that has been sent
+    stays a match; only its costs can improve.
+
+    Sellers missing from a completed card can never match, so once a card
+    completes its listings from every other seller are dropped, and later
+    fetches skip them. If that leaves no candidates at all the result is
+    known to be empty: outstanding fetches are cancelled (no more fetch or
+    candidates events for them) and the summary follows. ``stats["pruning"]``
+    reports what this saved.
+
+    If ``listings`` is given it is filled with every fetched listing, as
+    card name -> seller nickname -> {"products", "total_stock", ...}; nothing
+    is pruned or cancelled, since a basket may use any seller.
+    """
+    executor = executor or get_executor()
+    timings = _Timings()
+    pruning = _Pruning(enabled=listings is None)
+    card_details = {}
     quantity_map = {req["name"]: req["quantity"] for req in card_requests}
 
-    if not valid_names:
+    seller_by_card = listings if listings is not None else {}
+    pending = {}        # card name -> variant fetches outstanding
+    candidates = None   # intersection of seller sets of completed cards
+    cards_complete = 0
+    failed_searches = 0
+    valid_names = None  # known once every search has returned
+    deferred = set()    # sellers touched before that
+    scanned = set()     # every seller seen, pruned or not
+    matches = {}
+    done = 0
+
+    futures = {
+        executor.submit(_timed, search_cards, req["name"]): ("search", req["name"], None)
+        for req in card_requests
+    }
+    searches_left = len(futures)
+    try:
+        while futures:
+            finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in finished:
+                if future not in futures:
+                    continue  # cancelled by an earlier result in this batch
+                kind, card_name, variant = futures.pop(future)
+                touched = set()
+
+                if kind == "search":
+                    searches_left -= 1
+                    try:
+                        variants, elapsed = future.result()
+                        error = None
+                    except Exception as e:
+                        variants, elapsed, error = [], None, str(e)
+                        failed_searches += 1
+                    timings.search_done(card_name, elapsed)
+                    card_details[card_name] = {
+                        "variants_count": len(variants),
+                        "variants": variants,
+                        "error": error,
+                    }
+                    yield {
+                        "type": "search",
+                        "card": card_name,
+                        "variants_count": len(variants),
+                        "error": error,
+                    }
+
+                    if error is None and pruning.exhausted:
+                        pruning.fetches_skipped(len(variants))
+                    elif error is None:
+                        # Step 2: this card's variant fetches start now
+                        seller_by_card.setdefault(card_name, {})
+                        pending[card_name] = pending.get(card_name, 0) + len(variants)
+                        for v in variants:
+                            fetch = executor.submit(
+                                _timed, fetch_products,
+                                v["card_key"], v["rare"], v.get("pack_id"), v.get("pack_card_id"),
+                            )
+                            futures[fetch] = ("fetch", card_name, v)
+                        timings.fetches_submitted(len(variants))
+                else:
+                    done += 1
+                    error = None
+                    try:
+                        data, elapsed = future.result()
+                        timings.fetch_done(card_name, elapsed)
+                        with timings.aggregating():
+                            buyable = filter_buyable(data["products"])
+                            scanned.update(p["seller_nickname"] for p in buyable)
+                            touched, added = _add_listings(seller_by_card[card_name], variant,
+                                                           buyable, pruning.keep(candidates))
+                            pruning.added(added, len(buyable) - added)
+                    except Exception as e:
+                        error = str(e)  # skip failed variant fetches
+                        timings.fetch_done(card_name, None)
+                    pending[card_name] -= 1
+                    yield {
+                        "type": "fetch",
+                        "card": card_name,
+                        "card_key": variant.get("card_key", ""),
+                        "rare": variant.get("rare", ""),
+                        "pack_id": variant.get("pack_id"),
+                        "done": done,
+                        "total": timings.fetches,
+                        "error": error,
+                    }
+
+                if pending.get(card_name) == 0:
+                    pending.pop(card_name)
+                    cards_complete += 1
+                    card_sellers = set(seller_by_card[card_name])
+                    candidates = card_sellers if candidates is None else candidates & card_sellers
+                    with timings.aggregating():
+                        pruning.drop_excluded(seller_by_card, candidates)
+                    yield _candidates_event(card_name, cards_complete,
+                                            len(card_requests) - failed_searches, candidates)
+                    if pruning.enabled and not candidates:
+                        # No seller can match any more: stop fetching
+                        pruning.cancel_fetches(futures)
+
+                if searches_left == 0 and valid_names is None:
+                    valid_names = [
+                        req["name"] for req in card_requests
+                        if not card_details[req["name"]]["error"]
+                    ]
+                    touched |= deferred
+                elif valid_names is None:
+                    deferred |= touched
+                    continue
+
+                # Step 3: Sellers whose listings changed may now satisfy every card
+                if not valid_names:
+                    continue
+                with timings.aggregating():
+                    new_matches = []
+                    for seller_nick in touched:
+                        if candidates is not None and seller_nick not in candidates:
+                            continue
+                        match = _seller_match(seller_nick, valid_names, seller_by_card, quantity_map)
+                        if match is not None:
+                            matches[seller_nick] = match
+                            new_matches.append(match)
+                for match in new_matches:
+                    yield {"type": "seller", "seller": match}
+
+        yield _summary(list(matches.values()), card_details, scanned,
+                       len(card_requests), timings.to_dict(), pruning.to_dict())
+    finally:
+        # The pool is shared: cancel only this search's queued work
+        for future in futures:
+            future.cancel()
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+class _Timings:
+    """Wall-clock phases of one multi-card search, reported in ``stats``."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.fetches = 0
+        self.searches_done_at = None
+        self.first_fetch_at = None
+        self.last_fetch_at = None
+        self.aggregate = 0.0
+        self.search = {}           # card -> search seconds
+        self.slowest_fetch = {}    # card -> slowest fetch seconds
+
+    def search_done(self, card, elapsed):
+        self.searches_done_at = time.perf_counter()
+        self.search[card] = elapsed or 0.0
+
+    def fetches_submitted(self, count):
+        if count and self.first_fetch_at is None:
+            self.first_fetch_at = time.perf_counter()
+        self.fetches += count
+
+    def fetch_done(self, card, elapsed):
+        self.last_fetch_at = time.perf_counter()
+        self.slowest_fetch[card] = max(self.slowest_fetch.get(card, 0.0), elapsed or 0.0)
+
+    @contextmanager
+    def aggregating(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.aggregate += time.perf_counter() - start
+
+    def to_dict(self) -> dict:
+        def ms(seconds):
+            return round(seconds * 1000, 1)
+
+        end = time.perf_counter()
+        fetch_window = (
+            (self.last_fetch_at or end) - self.first_fetch_at if self.first_fetch_at else 0.0
+        )
+        chains = [self.search[c] + self.slowest_fetch.get(c, 0.0) for c in self.search]
         return {
-            "sellers": [],
-            "card_details": _strip_card_details(card_details),
-            "stats": {
-                "total_sellers_scanned": 0,
-                "matching_sellers": 0,
-                "cards_requested": len(card_requests),
-            },
+            "total_ms": ms(end - self.started),
+            "search_ms": ms((self.searches_done_at or end) - self.started),
+            "fetch_ms": ms(fetch_window),
+            "aggregate_ms": ms(self.aggregate),
+            "slowest_search_ms": ms(max(self.search.values(), default=0.0)),
+            "slowest_fetch_ms": ms(max(self.slowest_fetch.values(), default=0.0)),
+            # Lower bound on total_ms: the slowest search plus its slowest fetch
+            "critical_path_ms": ms(max(chains, default=0.0)),
+            "fetches": self.fetches,
         }
 
-    seller_sets = [set(seller_by_card[name].keys()) for name in valid_names]
-    common_sellers = set.intersection(*seller_sets) if seller_sets else set()
-
-    matching_sellers = []
-    for seller_nick in common_sellers:
-        all_satisfied = True
-        cards_info = {}
-        total_cost = 0
-
-        for card_name in valid_names:
-            info = seller_by_card[card_name][seller_nick]
-            qty_needed = quantity_map[card_name]
-
-            if info["total_stock"] < qty_needed:
-                all_satisfied = False
-                break
-
-            sorted_products = sorted(info["products"], key=lambda p: p["price"])
-
-            # Greedy cheapest-first cost estimation
-            remaining = qty_needed
-            cost = 0
-            for p in sorted_products:
-                take = min(remaining, p["stock"])
-                cost += take * p["price"]
-                remaining -= take
-                if remaining <= 0:
-                    break
-
-            total_cost += cost
-            found_names = sorted(set(
-                p.get("card_name", "") for p in sorted_products if p.get("card_name")
-            ))
-            cards_info[card_name] = {
-                "total_stock": info["total_stock"],
-                "lowest_price": sorted_products[0]["price"] if sorted_products else 0,
-                "estimated_cost": cost,
-                "products": sorted_products,
-                "found_card_names": found_names,
+
+class _Pruning:
+    """Listings and fetches a multi-card search avoided, reported in ``stats``.
+
+    ``held`` counts product entries kept in memory, the bulk of a search's
+    footprint; ``peak_listings`` is its high-water mark.
+    """
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.exhausted = False
+        self.fetches_avoided = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.held = 0
+        self.peak = 0
+
+    def keep(self, candidates) -> set | None:
+        """Sellers worth keeping listings for; None means all of them."""
+        return candidates if self.enabled else None
+
+    def added(self, added: int, skipped: int):
+        self.held += added
+        self.skipped += skipped
+        self.peak = max(self.peak, self.held)
+
+    def drop_excluded(self, seller_by_card: dict, candidates: set):
+        """Drop every card's listings from sellers outside ``candidates``."""
+        if not self.enabled:
+            return
+        for sellers in seller_by_card.values():
+            for seller in [s for s in sellers if s not in candidates]:
+                count = len(sellers.pop(seller)["products"])
+                self.held -= count
+                self.dropped += count
+
+    def cancel_fetches(self, futures: dict):
+        """Stop waiting on this search's fetches and cancel those not yet started."""
+        self.exhausted = True
+        for future in [f for f, (kind, _, _) in futures.items() if kind == "fetch"]:
+            del futures[future]
+            if future.cancel():
+                self.fetches_avoided += 1
+
+    def fetches_skipped(self, count: int):
+        self.fetches_avoided += count
+
+    def to_dict(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "fetches_avoided": self.fetches_avoided,
+            "listings_skipped": self.skipped,
+            "listings_dropped": self.dropped,
+            "peak_listings": self.peak,
+        }
+
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the process-wide pool for upstream calls, sized by MULTI_SEARCH_WORKERS."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=current_app.config["MULTI_SEARCH_WORKERS"],
+                thread_name_prefix="multi-search",
+            )
+        return _executor
+
+
+_price = itemgetter("price")
+
+
+def _add_listings(sellers: dict, variant: dict, buyable: list[dict],
+                  keep: set | None = None) -> tuple[set[str], int]:
+    """Merge one variant's buyable listings into ``sellers``.
+
+    Each seller's products stay sorted by price and its card names are
+    collected as they arrive, so matching never re-sorts or re-scans them.
+    Listings from sellers outside ``keep`` (if given) are skipped. Returns the touched sellers and the number of
+    listings added.
+    """
+    touched = set()
+    added = 0
+    for product in buyable:
+        seller = product["seller_nickname"]
+        if keep is not None and seller not in keep:
+            continue
+        if seller not in sellers:
+            sellers[seller] = {
+                "products": [],
+                "card_names": set(),
+                "total_stock": 0,
+                "seller_area": product["seller_area"],
+                "credit": product["credit"],
+                "order_complete": product["order_complete"],
             }
+        entry = sellers[seller]
+        bisect.insort(entry["products"], {
+            **product,
+            "card_name": variant.get("card_name", ""),
+            "card_key": variant.get("card_key", ""),
+            "pack_id": variant.get("pack_id", ""),
+            "pack_card_id": variant.get("pack_card_id", ""),
+            "variant_pack_name": variant.get("pack_name", ""),
+            "variant_rare": variant.get("rare", ""),
+        }, key=_price)
+        entry["total_stock"] += product["stock"]
+        if variant.get("card_name"):
+            entry["card_names"].add(variant["card_name"])
+        touched.add(seller)
+        added += 1
+    return touched, added
 
-        if all_satisfied:
-            # Use seller info from first card's data
-            sample = seller_by_card[valid_names[0]][seller_nick]
-            matching_sellers.append({
-                "seller_nickname": seller_nick,
-                "seller_area": sample.get("seller_area", ""),
-                "credit": sample.get("credit", 0),
-                "order_complete": sample.get("order_complete", 0),
-                "cards": cards_info,
-                "total_cost": total_cost,
-            })
 
-    matching_sellers.sort(key=lambda s: s["total_cost"])
+def _seller_match(seller_nick, valid_names, seller_by_card, quantity_map):
+    """Build the result entry for a seller, or None if any card is short on stock.
+
+    Costs only walk the cheapest listings needed. ``products`` is the
+    seller's live, price-sorted list: events are serialized as they are
+    yielded, and a seller is re-sent after every change to it.
+    """
+    cards_info = {}
+    total_cost = 0
+
+    for card_name in valid_names:
+        info = seller_by_card[card_name].get(seller_nick)
+        qty_needed = quantity_map[card_name]
+
+        if info is None or info["total_stock"] < qty_needed:
+            return None
+
+        summary = _card_summary(info, qty_needed)
+        total_cost += summary["estimated_cost"]
+        cards_info[card_name] = summary
+
+    # Use seller info from first card's data
+    sample = seller_by_card[valid_names[0]][seller_nick]
+    return {
+        "seller_nickname": seller_nick,
+        "seller_area": sample.get("seller_area", ""),
+        "credit": sample.get("credit", 0),
+        "order_complete": sample.get("order_complete", 0),
+        "cards": cards_info,
+        "total_cost": total_cost,
+    }
 
-    all_sellers = set().union(*seller_sets) if seller_sets else set()
 
+def _card_summary(info, qty_needed):
+    sorted_products = info["products"]
+
+    # Greedy cheapest-first cost estimation
+    remaining = qty_needed
+    cost = 0
+    for p in sorted_products:
+        take = min(remaining, p["stock"])
+        cost += take * p["price"]
+        remaining -= take
+        if remaining <= 0:
+            break
+
+    found_names = sorted(info["card_names"])
+    return {
+        "total_stock": info["total_stock"],
+        "lowest_price": sorted_products[0]["price"] if sorted_products else 0,
+        "estimated_cost": cost,
+        "products": sorted_products,
+        "found_card_names": found_names,
+    }
+
+
+def _candidates_event(card_name, cards_complete, cards_total, candidates):
+    return {
+        "type": "candidates",
+        "card": card_name,
+        "cards_complete": cards_complete,
+        "cards_total": cards_total,
+        "candidates": len(candidates),
+    }
+
+
+def _summary(matching_sellers, card_details, all_sellers, cards_requested, timings, pruning):
+    matching_sellers.sort(key=lambda s: s["total_cost"])
     return {
-        "sellers": matching_sellers,
+        "type": "summary",
+        "seller_order": [s["seller_nickname"] for s in matching_sellers],
         "card_details": _strip_card_details(card_details),
         "stats": {
             "total_sellers_scanned": len(all_sellers),
             "matching_sellers": len(matching_sellers),
-            "cards_requested": len(card_requests),
+            "cards_requested": cards_requested,
+            "timings": timings,
+            "pruning": pruning,
         },
     }
 
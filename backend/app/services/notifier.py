@@ -1,11 +1,19 @@
 """LINE notification service - ported from legacy/notify_test.py."""
 import logging
+import re
 
+import orjson
 import requests
 from flask import current_app
 
 logger = logging.getLogger(__name__)
 
+MULTICAST_MAX_RECIPIENTS = 500
+CAROUSEL_MAX_BUBBLES = 12
+PUSH_MAX_MESSAGES = 5
+ALT_TEXT_MAX_LENGTH = 400
+NO_IMAGE_URL = "https://via.placeholder.com/800x600?text=No+Image"
+
 
 def send_line_message(message: str, user_id: str | None = None,
                       image_url: str | None = None) -> bool:
@@ -57,30 +65,9 @@ def send_line_message(message: str, user_id: str | None = None,
         return False
 
 
-def send_price_alert_flex(card_name: str, target_price: int, current_price: int,
-                          image_url: str | None, product_url: str | None,
-                          user_id: str | None = None,
-                          target_price_min: int = 0) -> bool:
-    """Send a price alert using Flex Message with card-style UI.
-
-    Args:
-        card_name: Card name.
-        target_price: Target price set by user.
-        current_price: Current lowest price.
-        image_url: Card image URL.
-        product_url: Product page URL.
-        user_id: LINE user ID.
-
-    Returns:
-        True if sent successfully, False otherwise.
-    """
-    token = current_app.config["LINE_CHANNEL_ACCESS_TOKEN"]
-
-    if not token or not user_id:
-        logger.error("LINE credentials not configured")
-        return False
-
-    # Build Flex Message
+def _price_alert_bubble(card_name: str, target_text: str, price_text: str,
+                        image_url: str, product_url: str | None) -> dict:
+    """Build the card-style price alert bubble from pre-formatted texts."""
     flex_content = {
         "type": "bubble",
         "body": {
@@ -89,7 +76,7 @@ def send_price_alert_flex(card_name: str, target_price: int, current_price: int,
             "contents": [
                 {
                     "type": "image",
-                    "url": image_url or "https://via.placeholder.com/800x600?text=No+Image",
+                    "url": image_url,
                     "aspectRatio": "2:3",
                     "aspectMode": "fit",
                     "size": "full",
@@ -134,7 +121,7 @@ def send_price_alert_flex(card_name: str, target_price: int, current_price: int,
                                 },
                                 {
                                     "type": "text",
-                                    "text": f"${target_price_min}~${target_price}" if target_price_min > 0 else f"≤ ${target_price}",
+                                    "text": target_text,
                                     "wrap": True,
                                     "color": "#666666",
                                     "size": "sm",
@@ -156,7 +143,7 @@ def send_price_alert_flex(card_name: str, target_price: int, current_price: int,
                                 },
                                 {
                                     "type": "text",
-                                    "text": f"${current_price}",
+                                    "text": price_text,
                                     "wrap": True,
                                     "color": "#E74C3C",
                                     "size": "lg",
@@ -192,24 +179,201 @@ def send_price_alert_flex(card_name: str, target_price: int, current_price: int,
             "flex": 0,
         }
 
+    return flex_content
+
+
+def _target_text(target_price: int, target_price_min: int) -> str:
+    return f"${target_price_min}~${target_price}" if target_price_min > 0 else f"≤ ${target_price}"
+
+
+def _alt_text(card_name: str, current_price: int) -> str:
+    return f"🎉 [卡拍拍]到價通知：{card_name} 目前 ${current_price}！"
+
+
+def build_price_alert_flex(card_name: str, target_price: int, current_price: int,
+                           image_url: str | None, product_url: str | None,
+                           target_price_min: int = 0) -> dict:
+    """Build the price alert Flex Message with card-style UI.
+
+    Args:
+        card_name: Card name.
+        target_price: Target price set by user.
+        current_price: Current lowest price.
+        image_url: Card image URL.
+        product_url: Product page URL.
+        target_price_min: Lower bound of the target range (0 = none).
+
+    Returns:
+        A LINE message object ready for the push/multicast ``messages`` array.
+    """
+    return {
+        "type": "flex",
+        "altText": _alt_text(card_name, current_price),
+        "contents": _price_alert_bubble(
+            card_name,
+            _target_text(target_price, target_price_min),
+            f"${current_price}",
+            image_url or NO_IMAGE_URL,
+            product_url,
+        ),
+    }
+
+
+class FlexTemplate:
+    """A message object pre-serialized once, with named slots spliced in per render.
+
+    Build the object with ``slot(name)`` markers where dynamic values go. Each
+    render only JSON-encodes the slot values; ``bytes`` values are inserted as
+    already-serialized JSON.
+    """
+
+    _SLOT_RE = re.compile(rb'"\\u0000(\w+)\\u0000"')
+
+    def __init__(self, obj):
+        parts = self._SLOT_RE.split(orjson.dumps(obj))
+        self._static = parts[0::2]
+        self._slots = parts[1::2]
+
+    @staticmethod
+    def slot(name: str) -> str:
+        return f"\x00{name}\x00"
+
+    def render(self, **values) -> bytes:
+        out = [self._static[0]]
+        for name, static in zip(self._slots, self._static[1:]):
+            value = values[name.decode()]
+            out.append(value if isinstance(value, bytes) else orjson.dumps(value))
+            out.append(static)
+        return b"".join(out)
+
+
+_slot = FlexTemplate.slot
+_BUBBLE_TEMPLATE = FlexTemplate(_price_alert_bubble(
+    _slot("card_name"), _slot("target_text"), _slot("price_text"),
+    _slot("image_url"), _slot("product_url"),
+))
+_BUBBLE_TEMPLATE_NO_LINK = FlexTemplate(_price_alert_bubble(
+    _slot("card_name"), _slot("target_text"), _slot("price_text"),
+    _slot("image_url"), None,
+))
+_FLEX_MESSAGE_TEMPLATE = FlexTemplate({
+    "type": "flex",
+    "altText": _slot("alt_text"),
+    "contents": _slot("contents"),
+})
+
+
+def render_price_alert_bubble(card_name: str, target_price: int, current_price: int,
+                              image_url: str | None, product_url: str | None,
+                              target_price_min: int = 0) -> bytes:
+    """Serialized price alert bubble, equivalent to ``build_price_alert_flex()["contents"]``."""
+    values = {
+        "card_name": card_name,
+        "target_text": _target_text(target_price, target_price_min),
+        "price_text": f"${current_price}",
+        "image_url": image_url or NO_IMAGE_URL,
+    }
+    if product_url:
+        return _BUBBLE_TEMPLATE.render(product_url=product_url, **values)
+    return _BUBBLE_TEMPLATE_NO_LINK.render(**values)
+
+
+def render_price_alert_flex(card_name: str, target_price: int, current_price: int,
+                            image_url: str | None, product_url: str | None,
+                            target_price_min: int = 0) -> bytes:
+    """Serialized price alert message, equivalent to ``build_price_alert_flex()``."""
+    return render_flex_message(
+        _alt_text(card_name, current_price),
+        render_price_alert_bubble(card_name, target_price, current_price,
+                                  image_url, product_url, target_price_min),
+    )
+
+
+def render_flex_message(alt_text: str, contents: bytes) -> bytes:
+    """Wrap serialized bubble/carousel ``contents`` into a flex message object."""
+    return _FLEX_MESSAGE_TEMPLATE.render(alt_text=alt_text, contents=contents)
+
+
+def _digest_alt_text(alerts: list[dict], total: int) -> str:
+    lines = [f"🎉 [卡拍拍]到價通知：{total} 張卡片到價"]
+    lines += [f"{a['card_name']} ${a['current_price']}" for a in alerts]
+    text = "\n".join(lines)
+    if len(text) > ALT_TEXT_MAX_LENGTH:
+        text = text[:ALT_TEXT_MAX_LENGTH - 1] + "…"
+    return text
+
+
+def build_digest_messages(alerts: list[dict]) -> list[tuple[list[bytes], list[int]]]:
+    """Render one user's alerts as flex carousels.
+
+    Each alert is a dict of ``render_price_alert_bubble`` keyword arguments.
+    Carousels hold up to ``CAROUSEL_MAX_BUBBLES`` bubbles, and each push carries
+    up to ``PUSH_MAX_MESSAGES`` carousels. The alt text lists every card and
+    price as a compact text fallback.
+
+    Returns ``(messages, alert_indexes)`` for each push request needed.
+    """
+    carousels = []
+    for start in range(0, len(alerts), CAROUSEL_MAX_BUBBLES):
+        chunk = alerts[start:start + CAROUSEL_MAX_BUBBLES]
+        contents = (
+            b'{"type":"carousel","contents":['
+            + b",".join(render_price_alert_bubble(**a) for a in chunk)
+            + b"]}"
+        )
+        indexes = list(range(start, start + len(chunk)))
+        carousels.append((render_flex_message(_digest_alt_text(chunk, len(alerts)), contents), indexes))
+
+    requests_ = []
+    for start in range(0, len(carousels), PUSH_MAX_MESSAGES):
+        group = carousels[start:start + PUSH_MAX_MESSAGES]
+        requests_.append(([m for m, _ in group], [i for _, idx in group for i in idx]))
+    return requests_
+
+
+def encode_messages(messages: list[bytes]) -> bytes:
+    """Join serialized message objects into a JSON ``messages`` array."""
+    return b"[" + b",".join(messages) + b"]"
+
+
+def encode_payload(to: str | list[str], messages: bytes) -> bytes:
+    """Encode a push (``to`` is a user id) or multicast (``to`` is a list) request body.
+
+    ``messages`` is a serialized JSON array, see ``encode_messages``.
+    """
+    return b'{"to":' + orjson.dumps(to) + b',"messages":' + messages + b"}"
+
+
+def send_price_alert_flex(card_name: str, target_price: int, current_price: int,
+                          image_url: str | None, product_url: str | None,
+                          user_id: str | None = None,
+                          target_price_min: int = 0) -> bool:
+    """Send a price alert Flex Message synchronously.
+
+    The price checker queues alerts through ``line_dispatch`` instead; this is
+    kept for one-off sends.
+
+    Returns:
+        True if sent successfully, False otherwise.
+    """
+    token = current_app.config["LINE_CHANNEL_ACCESS_TOKEN"]
+
+    if not token or not user_id:
+        logger.error("LINE credentials not configured")
+        return False
+
     url = "https://api.line.me/v2/bot/message/push"
     headers = {
         "Content-Type": "application/json",
         "Authorization": f"Bearer {token}",
     }
-    payload = {
-        "to": user_id,
-        "messages": [
-            {
-                "type": "flex",
-                "altText": f"🎉 [卡拍拍]到價通知：{card_name} 目前 ${current_price}！",
-                "contents": flex_content,
-            }
-        ],
-    }
+    payload = encode_payload(user_id, encode_messages([
+        render_price_alert_flex(card_name, target_price, current_price,
+                                image_url, product_url, target_price_min),
+    ]))
 
     try:
-        resp = requests.post(url, headers=headers, json=payload, timeout=10)
+        resp = requests.post(url, headers=headers, data=payload, timeout=10)
         if resp.status_code == 200:
             logger.info("LINE Flex message sent successfully to %s", user_id)
             return True
@@ -219,3 +383,36 @@ def send_price_alert_flex(card_name: str, target_price: int, current_price: int,
     except requests.RequestException as e:
         logger.error("LINE request failed: %s", e)
         return False
+
+
+class AlertBatcher:
+    """Groups outgoing alerts with identical message payloads.
+
+    Each group can then be sent with one multicast call per
+    ``MULTICAST_MAX_RECIPIENTS`` recipients instead of one push per user.
+    """
+
+    def __init__(self, max_recipients: int = MULTICAST_MAX_RECIPIENTS):
+        self.max_recipients = max_recipients
+        # payload key -> (messages, {line_user_id: [refs]}), insertion ordered
+        self._groups: dict[bytes, tuple[list[bytes], dict[str, list]]] = {}
+
+    def add(self, line_user_id: str, messages: list[bytes], ref=None):
+        """Queue serialized ``messages`` for ``line_user_id``; ``ref`` identifies the alert."""
+        key = b"\n".join(messages)
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = (messages, {})
+        group[1].setdefault(line_user_id, []).append(ref)
+
+    def batches(self):
+        """Yield ``(recipients, messages, refs)`` with at most ``max_recipients`` recipients each."""
+        for messages, recipients in self._groups.values():
+            user_ids = list(recipients)
+            for i in range(0, len(user_ids), self.max_recipients):
+                chunk = user_ids[i:i + self.max_recipients]
+                refs = [ref for uid in chunk for ref in recipients[uid]]
+                yield chunk, messages, refs
+
+    def __len__(self):
+        return sum(len(recipients) for _, recipients in self._groups.values())
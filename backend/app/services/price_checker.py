@@ -1,18 +1,37 @@
 """Price checker service - scheduled and manual price checking."""
 import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
 
+from flask import current_app
+from sqlalchemy.orm import selectinload
+
 from app.extensions import db
-from app.models import WatchlistItem, PriceSnapshot, Notification
+from app.models import WatchlistItem, PriceSnapshot, PriceRollup, Notification
 from app.services.kapaipai import get_price_summary, card_image_url
-from app.services.notifier import send_price_alert_flex
+from app.services.listing_archive import ListingArchive, open_archive
+from app.services.alert_outbox import stage_alert
 
 logger = logging.getLogger(__name__)
 
+# Variants whose snapshots share one sweep transaction
+COMMIT_BATCH = 50
+
+
+def variant_key(item: WatchlistItem) -> tuple:
+    """The fetch key shared by all watchers of the same card variant."""
+    return (item.card_key, item.rare, item.pack_id, item.pack_card_id)
+
 
-def check_single_item(item: WatchlistItem) -> PriceSnapshot | None:
+def check_single_item(item: WatchlistItem,
+                      archive: ListingArchive | None = None) -> PriceSnapshot | None:
     """Check price for a single watchlist item, save snapshot, and notify if needed.
 
+    If ``archive`` is given, the raw listings are buffered into it and the caller
+    is responsible for flushing; otherwise a configured archive is flushed here.
+
     Returns the created PriceSnapshot or None on error.
     """
     try:
@@ -23,15 +42,12 @@ def check_single_item(item: WatchlistItem) -> PriceSnapshot | None:
         logger.error("Failed to fetch price for item %d (%s): %s", item.id, item.card_name, e)
         return None
 
-    snapshot = PriceSnapshot(
-        watchlist_item_id=item.id,
-        lowest_price=summary["lowest_price"],
-        avg_price=summary["avg_price"],
-        buyable_count=summary["buyable_count"],
-        total_count=summary["total_count"],
-        checked_at=datetime.now(timezone.utc),
-    )
-    db.session.add(snapshot)
+    checked_at = datetime.now(timezone.utc)
+    _archive_listings(item, summary["raw_products"], checked_at, archive)
+
+    snapshot = _save_snapshot(item, summary, checked_at)
+    if summary["lowest_price"] is not None:
+        PriceRollup.record([item.id], summary["lowest_price"], checked_at)
     db.session.flush()
 
     # Check if we should notify (price must be within [target_price_min, target_price] range)
@@ -45,6 +61,36 @@ def check_single_item(item: WatchlistItem) -> PriceSnapshot | None:
     return snapshot
 
 
+def _save_snapshot(item: WatchlistItem, summary: dict, checked_at: datetime) -> PriceSnapshot:
+    snapshot = PriceSnapshot(
+        watchlist_item_id=item.id,
+        lowest_price=summary["lowest_price"],
+        avg_price=summary["avg_price"],
+        buyable_count=summary["buyable_count"],
+        total_count=summary["total_count"],
+        checked_at=checked_at,
+    )
+    db.session.add(snapshot)
+    return snapshot
+
+
+def _archive_listings(item: WatchlistItem, products: list[dict], fetched_at: datetime,
+                      archive: ListingArchive | None):
+    """Buffer raw listings into the archive; never let archiving break a check."""
+    standalone = archive is None
+    if standalone:
+        archive = open_archive(current_app.config)
+        if archive is None:
+            return
+    try:
+        archive.add(item.card_key, item.rare, item.pack_id, item.pack_card_id,
+                    products, fetched_at)
+        if standalone:
+            archive.flush()
+    except Exception as e:
+        logger.error("Failed to archive listings for item %d (%s): %s", item.id, item.card_name, e)
+
+
 def _maybe_notify(item: WatchlistItem, current_price: int, lowest_product: dict | None = None):
     """Send notification if not already notified at this price."""
     # Check last notification for this item
@@ -76,16 +122,18 @@ def _maybe_notify(item: WatchlistItem, current_price: int, lowest_product: dict
     line_user_id = item.user.line_user_id if item.user else None
     img_url = card_image_url(item.card_key, item.pack_id, item.pack_card_id, item.rare)
 
-    # Send Flex Message with card-style notification
-    success = send_price_alert_flex(
-        card_name=item.card_name,
-        target_price=item.target_price,
-        current_price=current_price,
-        image_url=img_url,
-        product_url=product_link,
-        user_id=line_user_id,
-        target_price_min=item.target_price_min or 0,
-    )
+    # Flex Message with card-style notification, written to the outbox on commit
+    alert = {
+        "card_name": item.card_name,
+        "target_price": item.target_price,
+        "current_price": current_price,
+        "image_url": img_url,
+        "product_url": product_link,
+        "target_price_min": item.target_price_min or 0,
+    }
+    deliverable = bool(line_user_id and current_app.config["LINE_CHANNEL_ACCESS_TOKEN"])
+    if not deliverable:
+        logger.error("LINE credentials not configured for item %d", item.id)
 
     # Keep message for notification record
     price_min = item.target_price_min or 0
@@ -104,22 +152,116 @@ def _maybe_notify(item: WatchlistItem, current_price: int, lowest_product: dict
 
     notif = Notification(
         watchlist_item_id=item.id,
+        user_id=item.user_id,
         triggered_price=current_price,
         target_price=item.target_price,
         message=message,
-        status="sent" if success else "failed",
+        status="queued" if deliverable else "failed",
         sent_at=datetime.now(timezone.utc),
     )
     db.session.add(notif)
+    if deliverable:
+        stage_alert(notif, line_user_id, alert, digest=item.user.alert_digest)
+
+
+def check_all_active_items(stop: threading.Event | None = None):
+    """Check prices for all active watchlist items. Called by the worker.
 
+    Items are grouped by card variant so each variant is fetched once and
+    snapshotted for all of its watchers.
+    Variants are fetched on PRICE_CHECK_FETCH_WORKERS threads and written on
+    this one, in order. Once ``stop`` is set the sweep writes what it has
+    checked so far and returns.
 
-def check_all_active_items():
-    """Check prices for all active watchlist items. Called by scheduler."""
-    items = WatchlistItem.query.filter_by(is_active=True).all()
+    No transaction is open while a fetch is awaited: snapshots are committed
+    in batches of up to COMMIT_BATCH variants, and always before waiting on
+    a fetch that has not finished. Alerts are written last, one transaction
+    per user, so each user's Notification rows and outbox rows (a single
+    digest, in digest mode) commit together. If the sweep dies before that,
+    those alerts fire on the next sweep instead.
+    """
+    items = (
+        WatchlistItem.query
+        .options(selectinload(WatchlistItem.user))
+        .filter_by(is_active=True)
+        .all()
+    )
     logger.info("Scheduled price check: %d active items", len(items))
 
+    groups: dict[tuple, list[WatchlistItem]] = defaultdict(list)
     for item in items:
-        check_single_item(item)
+        groups[variant_key(item)].append(item)
+
+    # The items are only read from here on, across many short transactions;
+    # detach them so commits don't expire and reload them
+    db.session.expunge_all()
+    db.session.commit()
+
+    archive = open_archive(current_app.config)
+    checked = 0
+    uncommitted = 0
+    hits: dict[int, list[tuple]] = defaultdict(list)  # user id -> items to notify
+    pool = ThreadPoolExecutor(
+        max_workers=current_app.config["PRICE_CHECK_FETCH_WORKERS"], thread_name_prefix="price-fetch"
+    )
+    try:
+        fetches = {key: pool.submit(get_price_summary, *key) for key in groups}
+        for key, group in groups.items():
+            if stop is not None and stop.is_set():
+                logger.info("Price check stopped early: %d of %d variants", checked, len(groups))
+                break
+            fetch = fetches[key]
+            if uncommitted and (uncommitted >= COMMIT_BATCH or not fetch.done()):
+                db.session.commit()
+                uncommitted = 0
+            for item, lowest, lowest_product in _check_variant(group, archive, fetch):
+                hits[item.user_id].append((item, lowest, lowest_product))
+            checked += 1
+            uncommitted += 1
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
 
     db.session.commit()
-    logger.info("Scheduled price check completed")
+
+    for user_hits in hits.values():
+        for item, lowest, lowest_product in user_hits:
+            _maybe_notify(item, lowest, lowest_product)
+        db.session.commit()
+
+    if archive is not None:
+        try:
+            archive.flush()
+        except Exception as e:
+            logger.error("Failed to flush listing archive: %s", e)
+    logger.info("Scheduled price check completed: %d variants", checked)
+
+
+def _check_variant(items: list[WatchlistItem], archive: ListingArchive | None,
+                   fetch: Future) -> list[tuple]:
+    """Snapshot one fetched variant for every watcher.
+
+    Returns ``(item, lowest_price, lowest_product)`` for the watchers in range.
+    """
+    first = items[0]
+    try:
+        summary = fetch.result()
+    except Exception as e:
+        logger.error("Failed to fetch price for %d item(s) of %s: %s", len(items), first.card_name, e)
+        return []
+
+    checked_at = datetime.now(timezone.utc)
+    _archive_listings(first, summary["raw_products"], checked_at, archive)
+
+    for item in items:
+        _save_snapshot(item, summary, checked_at)
+
+    lowest = summary["lowest_price"]
+    if lowest is None:
+        return []
+    PriceRollup.record([item.id for item in items], lowest, checked_at)
+    lowest_product = summary["products"][0] if summary["products"] else None
+    return [
+        (item, lowest, lowest_product)
+        for item in items
+        if (item.target_price_min or 0) <= lowest <= item.target_price
+    ]
@@ -0,0 +1,91 @@
+"""Bulk add/update of watchlist items.
+
+Items are written with ``INSERT ... ON CONFLICT ON CONSTRAINT uq_user_card DO
+UPDATE ... RETURNING`` in chunks, so importing a large want list is a handful
+of statements and concurrent imports resolve on the unique constraint instead
+of racing a select-then-insert.
+
+Postgres treats NULLs as distinct in unique constraints, so items without a
+``pack_id`` never conflict; their existing rows are looked up in one query
+and updated in place before the remainder is inserted.
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.postgresql import insert
+
+from app.extensions import db
+from app.models import WatchlistItem
+
+UPSERT_CHUNK_SIZE = 500
+
+REQUIRED_FIELDS = ("card_key", "card_name", "rare", "target_price")
+
+
+def item_key(item_data: dict) -> tuple:
+    return item_data["card_key"], item_data["rare"], item_data.get("pack_id")
+
+
+def upsert_items(user_id: int, items_data: list[dict],
+                 chunk_size: int = UPSERT_CHUNK_SIZE) -> list[WatchlistItem]:
+    """Insert or update ``items_data`` for ``user_id``; the caller commits.
+
+    Existing items get the new target prices and are reactivated, as with a
+    single add. Repeated keys in the body collapse to the last occurrence.
+    Returns one item per distinct key, in the order keys first appear.
+    """
+    now = datetime.now(timezone.utc)
+    rows: dict[tuple, dict] = {}
+    for item_data in items_data:
+        rows[item_key(item_data)] = {
+            "user_id": user_id,
+            "card_key": item_data["card_key"],
+            "card_name": item_data["card_name"],
+            "pack_id": item_data.get("pack_id"),
+            "pack_name": item_data.get("pack_name"),
+            "pack_card_id": item_data.get("pack_card_id"),
+            "rare": item_data["rare"],
+            "target_price": item_data["target_price"],
+            "target_price_min": item_data.get("target_price_min", 0),
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now,
+        }
+
+    items: dict[tuple, WatchlistItem] = {}
+
+    no_pack = [row for key, row in rows.items() if key[2] is None]
+    to_insert = [row for key, row in rows.items() if key[2] is not None]
+    if no_pack:
+        by_key = {(row["card_key"], row["rare"]): row for row in no_pack}
+        existing = WatchlistItem.query.filter(
+            WatchlistItem.user_id == user_id,
+            WatchlistItem.pack_id.is_(None),
+            tuple_(WatchlistItem.card_key, WatchlistItem.rare).in_(list(by_key)),
+        ).all()
+        for item in existing:
+            row = by_key.pop((item.card_key, item.rare), None)
+            if row is None:
+                continue  # duplicate row left by an earlier race
+            item.target_price = row["target_price"]
+            item.target_price_min = row["target_price_min"]
+            item.is_active = True
+            items[item_key(row)] = item
+        to_insert.extend(by_key.values())
+
+    for start in range(0, len(to_insert), chunk_size):
+        stmt = insert(WatchlistItem).values(to_insert[start:start + chunk_size])
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_user_card",
+            set_={
+                "target_price": stmt.excluded.target_price,
+                "target_price_min": stmt.excluded.target_price_min,
+                "is_active": True,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        ).returning(WatchlistItem)
+        result = db.session.scalars(stmt, execution_options={"populate_existing": True})
+        for item in result:
+            items[(item.card_key, item.rare, item.pack_id)] = item
+
+    return [items[key] for key in rows if key in items]
@@ -0,0 +1,95 @@
+"""Background worker: price checks, alert delivery and maintenance.
+
+    python -m app.worker
+
+Web processes start no background threads; this process runs the scheduled
+jobs, the alert outbox relay and the LINE dispatcher, so web and worker
+capacity scale separately. One worker per deployment is enough, but more
+are safe: the outbox relay claims rows with SKIP LOCKED, and the price
+check and maintenance jobs each take a Postgres advisory lock, so a run
+another worker has started is skipped.
+
+On SIGTERM or SIGINT the worker stops scheduling, lets a running price
+check commit what it has checked so far, and gives queued LINE pushes up
+to WORKER_SHUTDOWN_TIMEOUT seconds to go out. Anything still in flight is
+leased in the outbox and redelivered by the next worker.
+"""
+import logging
+import signal
+import threading
+
+from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from app import create_app
+from app.config import Config
+from app.scheduler import add_jobs
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerConfig(Config):
+    # This process runs the jobs itself, not through init_scheduler
+    SCHEDULER_ENABLED = False
+
+
+class Worker:
+    def __init__(self, app):
+        self.app = app
+        self.shutdown_timeout = app.config["WORKER_SHUTDOWN_TIMEOUT"]
+        self.scheduler = BackgroundScheduler(
+            executors={"default": ThreadPoolExecutor(app.config["WORKER_THREADS"])},
+        )
+        self._stop = threading.Event()
+
+    def start(self):
+        add_jobs(self.scheduler, self.app, self._stop)
+        self.scheduler.start()
+        with self.app.app_context():
+            from app.services.alert_outbox import get_relay
+            # Drains rows left by a previous worker or written by web processes
+            get_relay().start()
+        logger.info("Worker started")
+
+    def stop(self, signum=None, frame=None):
+        if signum is not None:
+            logger.info("Received %s, shutting down", signal.Signals(signum).name)
+        self._stop.set()
+
+    def run(self):
+        """Start, block until ``stop`` is called, then shut down."""
+        self.start()
+        self._stop.wait()
+        self.shutdown()
+
+    def shutdown(self):
+        from app.services.alert_outbox import get_relay
+        from app.services.line_dispatch import get_dispatcher
+
+        # Waits for running jobs; the price check sees _stop and returns early
+        self.scheduler.shutdown(wait=True)
+        with self.app.app_context():
+            get_relay().stop(self.shutdown_timeout)
+            dispatcher = get_dispatcher()
+        drain = threading.Thread(target=dispatcher.shutdown, name="dispatch-drain", daemon=True)
+        drain.start()
+        drain.join(self.shutdown_timeout)
+        if drain.is_alive():
+            logger.warning("LINE pushes still queued after %.0fs; leaving them to the outbox lease",
+                           self.shutdown_timeout)
+        logger.info("Worker stopped")
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    worker = Worker(create_app(WorkerConfig))
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
+
+
+if __name__ == "__main__":
+    main()
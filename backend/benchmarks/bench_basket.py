@@ -0,0 +1,93 @@
+"""Latency of the multi-seller basket solver, typical and worst-case inputs.
+
+Each scenario is solved with the route's defaults (250 ms budget, exact
+search up to 200 candidate sellers). ``gap`` is the plan's cost over a
+lower bound: every unit at its cheapest price anywhere, plus one seller's
+fixed cost. It is loose whenever the plan really does need several sellers. ``setup``
+is the matrix build alone; the budget's clock includes it but cannot
+interrupt it, so inputs with a large setup finish somewhat past the budget.
+
+``check_basket_exact`` verifies the exact search against brute force.
+
+    python -m benchmarks.bench_basket
+"""
+import random
+import time
+
+from app.services.basket import BasketSolver, solve_basket
+
+TIME_BUDGET = 0.25
+EXACT_MAX_SELLERS = 200
+
+
+def offers_for(rng: random.Random, cards: int, sellers: int, cover: float,
+               quantity: tuple[int, int], spread: tuple[int, int], stock: tuple[int, int] = (1, 4)):
+    demands = {f"card{c}": rng.randint(*quantity) for c in range(cards)}
+    offers = {card: {} for card in demands}
+    bases = {card: rng.randint(50, 2000) for card in demands}
+    for s in range(sellers):
+        for card in demands:
+            if rng.random() < cover:
+                offers[card][f"seller{s:05d}"] = [
+                    {"price": bases[card] + rng.randint(*spread), "stock": rng.randint(*stock), "credit": 0}
+                    for _ in range(rng.randint(1, 3))
+                ]
+    return demands, offers
+
+
+def one_card_each(rng: random.Random, cards: int, sellers: int):
+    """Every seller stocks exactly one card: any plan needs one seller per card."""
+    demands = {f"card{c}": 1 for c in range(cards)}
+    offers = {card: {} for card in demands}
+    for s in range(sellers):
+        card = f"card{s % cards}"
+        offers[card][f"seller{s:05d}"] = [{"price": rng.randint(100, 110), "stock": 1, "credit": 0}]
+    return demands, offers
+
+
+SCENARIOS = [
+    # label, builder, fixed_cost, max_sellers
+    ("typical: 10 cards, 3000 sellers, 20% cover",
+     lambda rng: offers_for(rng, 10, 3000, 0.2, (1, 3), (-200, 400)), 60, 3),
+    ("exact: 8 cards, 150 sellers, 30% cover",
+     lambda rng: offers_for(rng, 8, 150, 0.3, (1, 3), (-200, 400)), 60, 4),
+    ("worst exact: 10 cards, 200 sellers, flat prices",
+     lambda rng: offers_for(rng, 10, 200, 0.5, (1, 2), (0, 2)), 0, 5),
+    ("worst heuristic: 10 cards x qty 99, 5000 sellers",
+     lambda rng: offers_for(rng, 10, 5000, 0.3, (99, 99), (-50, 50), (5, 30)), 60, 5),
+    ("infeasible: 10 cards, 1 per seller, max 5",
+     lambda rng: one_card_each(rng, 10, 3000), 60, 5),
+]
+
+
+def lower_bound(demands, offers, fixed_cost) -> float:
+    total = fixed_cost
+    for card, q in demands.items():
+        units = sorted(
+            p["price"] for products in offers[card].values() for p in products for _ in range(p["stock"])
+        )
+        total += sum(units[:q])
+    return total
+
+
+def main():
+    print(f"{'scenario':<50}{'ms':>8}{'setup':>8}  {'method':<17}{'optimal':>8}{'nodes':>9}{'sellers':>8}{'gap':>8}")
+    for label, build, fixed_cost, max_sellers in SCENARIOS:
+        demands, offers = build(random.Random(7))
+        start = time.perf_counter()
+        BasketSolver(demands, offers, fixed_cost, max_sellers, float("inf"))
+        setup = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        plan = solve_basket(demands, offers, fixed_cost, max_sellers,
+                            time_budget=TIME_BUDGET, exact_max_sellers=EXACT_MAX_SELLERS)
+        elapsed = (time.perf_counter() - start) * 1000
+        if plan["unfilled"]:
+            gap = f"{sum(plan['unfilled'].values())} unf"
+        else:
+            gap = f"{plan['total_cost'] / lower_bound(demands, offers, fixed_cost) - 1:7.1%}"
+        print(f"{label:<50}{elapsed:8.1f}{setup:8.1f}  {plan['method']:<17}{str(plan['optimal']):>8}"
+              f"{plan['nodes']:>9}{len(plan['sellers']):>8}{gap:>8}")
+
+
+if __name__ == "__main__":
+    main()
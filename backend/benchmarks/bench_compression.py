@@ -0,0 +1,62 @@
+"""Benchmark: response size and compression cost on the synthetic catalog.
+
+For each payload, reports the encoded size and the time to compress it with
+gzip and brotli at the configured levels, and the time to serve it from
+``ResponseCache`` (stored pre-compressed) versus compressing per request.
+
+    python -m benchmarks.bench_compression
+"""
+import time
+
+from flask import Flask
+
+from app.compression import ENCODINGS, ResponseCache, compress
+from app.config import Config
+from app.json_provider import OrjsonProvider
+from benchmarks.catalog import multi_search_payload, products_payload, watchlist_payload
+
+PAYLOADS = {
+    "multi-search (5 cards, 150 sellers)": multi_search_payload(),
+    "cards/products (300 listings)": products_payload(),
+    "watchlist (300 items)": watchlist_payload(),
+}
+ROUNDS = 5
+
+
+def best_ms(fn, n: int) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for _ in range(n):
+            fn()
+        best = min(best, (time.perf_counter() - start) / n)
+    return best * 1000
+
+
+def main():
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.json = OrjsonProvider(app)
+
+    print(f"gzip level {app.config['COMPRESS_GZIP_LEVEL']}, "
+          f"brotli quality {app.config['COMPRESS_BROTLI_QUALITY']}\n")
+    for label, payload in PAYLOADS.items():
+        data = app.json.dumps_bytes(payload)
+        n = max(5, 5_000_000 // len(data))
+        print(label)
+        print(f"  {'identity':<10}{len(data) / 1024:9.1f} KiB")
+        for encoding in ENCODINGS:
+            with app.test_request_context(headers={"Accept-Encoding": encoding}):
+                body = compress(data, encoding)
+                ms = best_ms(lambda: compress(data, encoding), n)
+                cache = ResponseCache()
+                cache.store("key", payload)
+                cached_ms = best_ms(lambda: cache.get("key").get_data(), n)
+            print(f"  {encoding:<10}{len(body) / 1024:9.1f} KiB  "
+                  f"ratio {len(data) / len(body):5.1f}x  "
+                  f"compress {ms:6.2f} ms  cached serve {cached_ms:6.3f} ms")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Micro-benchmark: price alert payload construction, alerts/sec.
+
+Compares building the Flex dict and serializing it with the stdlib encoder
+(the old path) against the precompiled template.
+
+    python -m benchmarks.bench_flex_payload
+"""
+import json
+import time
+
+from app.services.notifier import (
+    build_price_alert_flex, encode_messages, encode_payload, render_price_alert_flex,
+)
+
+N = 50_000
+ALERT = dict(
+    card_name="喵喵ex", target_price=120, current_price=95,
+    image_url="https://static.kapaipai.tw/image/card/pkmtw/x/M3/061/RR.jpg",
+    product_url="https://redirect.kapaipai.tw/shop/12345/67890",
+    target_price_min=80,
+)
+
+
+def dict_and_stdlib_json():
+    payload = {"to": "U0123456789abcdef", "messages": [build_price_alert_flex(**ALERT)]}
+    return json.dumps(payload).encode()
+
+
+def precompiled_template():
+    return encode_payload("U0123456789abcdef", encode_messages([render_price_alert_flex(**ALERT)]))
+
+
+def rate(fn) -> float:
+    start = time.perf_counter()
+    for _ in range(N):
+        fn()
+    return N / (time.perf_counter() - start)
+
+
+def main():
+    baseline = rate(dict_and_stdlib_json)
+    template = rate(precompiled_template)
+    print(f"dict + json.dumps     {baseline:>12,.0f} alerts/s  ({len(dict_and_stdlib_json())} bytes)")
+    print(f"precompiled template  {template:>12,.0f} alerts/s  ({len(precompiled_template())} bytes)")
+    print(f"speedup               {template / baseline:>12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Micro-benchmark: Google ID token verification latency on the login path.
+
+Serves a signing certificate from a local HTTP server that adds a fixed delay
+to stand in for the round trip to googleapis.com, then compares:
+
+* per-request transport: ``id_token.verify_token`` with a new
+  ``google_requests.Request()`` per login (the old route)
+* cold verifier: a fresh ``GoogleTokenVerifier`` per login
+* warm verifier: one shared ``GoogleTokenVerifier`` with cached certs
+
+    python -m benchmarks.bench_google_login
+"""
+import json
+import statistics
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from google.auth import crypt
+from google.auth import jwt as google_jwt
+from google.auth.transport import requests as google_requests
+from google.oauth2 import id_token
+
+from app.services.google_auth import GoogleTokenVerifier
+
+N = 200
+FETCH_DELAY_SECONDS = 0.05  # simulated network latency to the certs endpoint
+AUDIENCE = "bench-client-id.apps.googleusercontent.com"
+KEY_ID = "bench-key"
+
+
+def make_key_and_cert() -> tuple[bytes, bytes]:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "bench")])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    key_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    return key_pem, cert.public_bytes(serialization.Encoding.PEM)
+
+
+def serve_certs(cert_pem: bytes) -> ThreadingHTTPServer:
+    body = json.dumps({KEY_ID: cert_pem.decode()}).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(FETCH_DELAY_SECONDS)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Cache-Control", "public, max-age=21600")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_token(key_pem: bytes) -> str:
+    signer = crypt.RSASigner.from_string(key_pem, KEY_ID)
+    now = int(time.time())
+    payload = {
+        "iss": "https://accounts.google.com",
+        "aud": AUDIENCE,
+        "sub": "1234567890",
+        "email": "bench@example.com",
+        "iat": now,
+        "exp": now + 3600,
+    }
+    return google_jwt.encode(signer, payload).decode()
+
+
+def measure(fn) -> list[float]:
+    samples = []
+    for _ in range(N):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label: str, samples: list[float]):
+    ordered = sorted(samples)
+    p95 = ordered[int(0.95 * len(ordered)) - 1]
+    print(f"{label:<24} p50 {statistics.median(ordered):7.2f} ms   "
+          f"p95 {p95:7.2f} ms   mean {statistics.fmean(ordered):7.2f} ms")
+
+
+def main():
+    key_pem, cert_pem = make_key_and_cert()
+    server = serve_certs(cert_pem)
+    certs_url = f"http://127.0.0.1:{server.server_port}/certs"
+    token = make_token(key_pem)
+
+    def per_request_transport():
+        id_token.verify_token(token, google_requests.Request(), AUDIENCE, certs_url=certs_url)
+
+    def cold_verifier():
+        GoogleTokenVerifier(certs_url=certs_url).verify(token, AUDIENCE)
+
+    warm = GoogleTokenVerifier(certs_url=certs_url)
+    warm.verify(token, AUDIENCE)
+
+    def warm_verifier():
+        warm.verify(token, AUDIENCE)
+
+    print(f"{N} logins each, simulated certs fetch latency {FETCH_DELAY_SECONDS * 1000:.0f} ms\n")
+    report("per-request transport", measure(per_request_transport))
+    report("cold verifier", measure(cold_verifier))
+    report("warm verifier", measure(warm_verifier))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
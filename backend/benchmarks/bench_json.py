@@ -0,0 +1,57 @@
+"""Micro-benchmark: JSON encoding of API payloads, stdlib vs orjson provider.
+
+The stdlib column is Flask's default provider (``ensure_ascii``, sorted
+keys); the orjson column is ``OrjsonProvider`` as registered in
+``create_app``. Payloads come from ``benchmarks.catalog``.
+
+    python -m benchmarks.bench_json
+"""
+import time
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.json_provider import OrjsonProvider
+from benchmarks.catalog import multi_search_payload, products_payload, watchlist_payload
+
+PAYLOADS = {
+    "multi-search (5 cards, 150 sellers)": multi_search_payload(),
+    "cards/products (300 listings)": products_payload(),
+    "watchlist (300 items)": watchlist_payload(),
+}
+ROUNDS = 3
+
+
+def best_seconds(fn, payload, n: int) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for _ in range(n):
+            fn(payload)
+        best = min(best, (time.perf_counter() - start) / n)
+    return best
+
+
+def main():
+    app = Flask(__name__)
+    stdlib = DefaultJSONProvider(app)
+    fast = OrjsonProvider(app)
+
+    def stdlib_bytes(obj):
+        return stdlib.dumps(obj).encode("utf-8")
+
+    print(f"{'payload':<38}{'stdlib':>22}{'orjson':>22}{'speedup':>9}")
+    for label, payload in PAYLOADS.items():
+        std_size = len(stdlib_bytes(payload))
+        fast_size = len(fast.dumps_bytes(payload))
+        n = max(5, 20_000_000 // std_size)
+        std_t = best_seconds(stdlib_bytes, payload, n)
+        fast_t = best_seconds(fast.dumps_bytes, payload, n)
+        print(f"{label:<38}"
+              f"{std_t * 1000:8.2f} ms {std_size / 1024:8.0f} KiB"
+              f"{fast_t * 1000:8.2f} ms {fast_size / 1024:8.0f} KiB"
+              f"{std_t / fast_t:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Micro-benchmark: /api/cards/stats computation, per-listing Python vs NumPy.
+
+The Python column computes the same statistics the way
+``legacy/check_price.py`` ``print_summary`` does (sorting and Counters over
+the listing dicts); the NumPy columns are ``market_stats`` cold (columnar
+view built and stats computed) and warm (digest hit in ``stats_cache``).
+
+    python -m benchmarks.bench_market_stats
+"""
+import math
+import time
+from collections import Counter
+
+from app.services.market_stats import DEFAULT_BIN_EDGES, market_stats, stats_cache
+from benchmarks.catalog import products, sellers, variants
+
+SIZES = (100, 1_000, 5_000, 20_000)
+ROUNDS = 5
+
+
+def python_stats(listings: list[dict]) -> dict:
+    """The same statistics as ``compute_stats``, one Python pass per statistic."""
+    prices = sorted(p["price"] for p in listings)
+    n = len(prices)
+
+    def percentile(q):
+        k = (n - 1) * q / 100
+        lo = int(k)
+        hi = min(lo + 1, n - 1)
+        return prices[lo] + (prices[hi] - prices[lo]) * (k - lo)
+
+    edges = list(DEFAULT_BIN_EDGES)
+    histogram = [0] * len(edges)
+    for price in prices:
+        for i in range(len(edges) - 1, -1, -1):
+            if price >= edges[i]:
+                histogram[i] += 1
+                break
+
+    mean = sum(prices) / n
+    weighted = sorted((p["price"], math.log1p(max(p["credit"], 0))) for p in listings)
+    total_weight = sum(w for _, w in weighted)
+    running, weighted_median = 0.0, weighted[-1][0]
+    for price, w in weighted:
+        running += w
+        if running >= total_weight / 2:
+            weighted_median = price
+            break
+
+    condition_min: dict[str, int] = {}
+    area_stock: Counter = Counter()
+    for p in listings:
+        condition_min[p["condition"]] = min(condition_min.get(p["condition"], p["price"]), p["price"])
+        area_stock[p["seller_area"]] += p["stock"]
+
+    return {
+        "avg": mean,
+        "stock_weighted_avg": sum(p["price"] * p["stock"] for p in listings) / sum(p["stock"] for p in listings),
+        "std": math.sqrt(sum((x - mean) ** 2 for x in prices) / n),
+        "percentiles": [percentile(q) for q in (10, 25, 50, 75, 90)],
+        "credit_weighted": (sum(p * w for p, w in weighted) / total_weight, weighted_median),
+        "histogram": histogram,
+        "conditions": (Counter(p["condition"] for p in listings), condition_min),
+        "areas": (Counter(p["seller_area"] for p in listings).most_common(), area_stock),
+    }
+
+
+def best_ms(fn, *args) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    pool = sellers(max(SIZES))
+    variant = variants(1)[0]
+
+    def cold(listings):
+        stats_cache.clear()
+        market_stats(listings)
+
+    print(f"{'listings':>9}{'python':>12}{'numpy cold':>13}{'numpy warm':>13}")
+    for size in SIZES:
+        listings = products(variant, pool, size)
+        market_stats(listings)
+        print(f"{size:>9}"
+              f"{best_ms(python_stats, listings):9.2f} ms"
+              f"{best_ms(cold, listings):10.2f} ms"
+              f"{best_ms(market_stats, listings):10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Multi-search latency with simulated upstream calls: pipelined vs two-phase.
+
+``search_cards`` and ``fetch_products`` are replaced by sleeps drawn from
+a skewed distribution, so one slow search or one slow fetch dominates, as
+happens against the real API. "two-phase" is the previous execution:
+every search, then every fetch, each phase waiting for its slowest call.
+"pipelined" is ``multi_card_search`` as it is now. ``critical path`` is
+the slowest single search plus that card's slowest fetch, the floor for
+any schedule.
+
+    python -m benchmarks.bench_multi_search
+"""
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services import multi_search
+from benchmarks.catalog import products, sellers, variants
+
+CARDS = 6
+VARIANTS_PER_CARD = 4
+RUNS = 15
+
+_pool = sellers(300)
+
+
+def _latency(rng: random.Random) -> float:
+    # Mostly 50-150 ms with an occasional 400-800 ms straggler
+    return rng.uniform(0.4, 0.8) if rng.random() < 0.1 else rng.uniform(0.05, 0.15)
+
+
+def make_upstream(seed: int):
+    rng = random.Random(seed)
+    delays = {}
+
+    def delay(key) -> float:
+        if key not in delays:
+            delays[key] = _latency(rng)
+        return delays[key]
+
+    def search_cards(name):
+        time.sleep(delay(("search", name)))
+        return [dict(v, card_name=name) for v in variants(VARIANTS_PER_CARD, seed=sum(map(ord, name)))]
+
+    def fetch_products(card_key, rare, pack_id, pack_card_id):
+        time.sleep(delay(("fetch", card_key, pack_id)))
+        listing_rng = random.Random(card_key)
+        listings = products({"pack_name": ""}, listing_rng.sample(_pool, 120), 120, listing_rng.randrange(1000))
+        return {
+            "total": len(listings),
+            "products": [
+                {
+                    "id": p["id"], "sellerId": p["seller_id"], "price": p["price"], "stock": p["stock"],
+                    "condition": "perfect", "status": "active", "sellerNickname": p["seller_nickname"],
+                    "sellerArea": p["seller_area"], "credit": p["credit"],
+                    "orderComplete": p["order_complete"],
+                }
+                for p in listings
+            ],
+        }
+
+    return search_cards, fetch_products
+
+
+def two_phase(card_requests, executor):
+    names = [req["name"] for req in card_requests]
+    found = dict(zip(names, executor.map(multi_search.search_cards, names)))
+    jobs = [
+        (v["card_key"], v["rare"], v.get("pack_id"), v.get("pack_card_id"))
+        for name in names for v in found[name]
+    ]
+    list(executor.map(lambda args: multi_search.fetch_products(*args), jobs))
+
+
+def main():
+    executor = ThreadPoolExecutor(max_workers=32)
+    card_requests = [{"name": f"卡{c}", "quantity": 1} for c in range(CARDS)]
+    rows = {"two-phase": [], "pipelined": [], "critical path": []}
+    for seed in range(RUNS):
+        multi_search.search_cards, multi_search.fetch_products = make_upstream(seed)
+
+        start = time.perf_counter()
+        two_phase(card_requests, executor)
+        rows["two-phase"].append((time.perf_counter() - start) * 1000)
+
+        result = multi_search.multi_card_search([dict(r) for r in card_requests], executor)
+        rows["pipelined"].append(result["stats"]["timings"]["total_ms"])
+        rows["critical path"].append(result["stats"]["timings"]["critical_path_ms"])
+
+    print(f"{CARDS} cards x {VARIANTS_PER_CARD} variants, {RUNS} runs")
+    print(f"{'':<16}{'median':>10}{'p90':>10}{'max':>10}")
+    for label, values in rows.items():
+        values.sort()
+        print(f"{label:<16}{statistics.median(values):8.0f}ms"
+              f"{values[int(len(values) * 0.9)]:8.0f}ms{values[-1]:8.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Multi-search memory and fetch counts with and without early pruning.
+
+Upstream calls are simulated as in ``bench_multi_search``. Each scenario
+runs ``multi_card_search_events`` twice: as ``multi_card_search`` runs it
+(pruned), and with ``listings`` requested, which keeps every listing and
+every fetch as basket mode must (unpruned). Peak memory is tracemalloc's
+high-water mark over the run.
+
+    python -m benchmarks.bench_multi_search_pruning
+"""
+import random
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services import multi_search
+from benchmarks.catalog import products, sellers, variants
+
+VARIANTS_PER_CARD = 8
+LISTINGS_PER_VARIANT = 300
+
+_pool = sellers(3000)
+
+
+def make_upstream(rare: set[str], empty: set[str]):
+    """Search/fetch stand-ins: ``rare`` cards have one variant with 3 sellers, ``empty`` none."""
+
+    def search_cards(name):
+        time.sleep(0.05)
+        if name in empty:
+            return []
+        count = 1 if name in rare else VARIANTS_PER_CARD
+        seed = sum(map(ord, name))
+        return [dict(v, card_name=name, card_key=f"{name}-{v['card_key']}")
+                for v in variants(count, seed=seed)]
+
+    def fetch_products(card_key, rare_code, pack_id, pack_card_id):
+        rng = random.Random(card_key)
+        is_rare = card_key.split("-")[0] in rare
+        time.sleep(0.02 if is_rare else rng.uniform(0.05, 0.3))
+        count = 3 if is_rare else LISTINGS_PER_VARIANT
+        listings = products({"pack_name": ""}, rng.sample(_pool, count), count, rng.randrange(1000))
+        return {
+            "total": len(listings),
+            "products": [
+                {
+                    "id": p["id"], "sellerId": p["seller_id"], "price": p["price"], "stock": p["stock"],
+                    "condition": "perfect", "status": "active", "sellerNickname": p["seller_nickname"],
+                    "sellerArea": p["seller_area"], "credit": p["credit"],
+                    "orderComplete": p["order_complete"],
+                }
+                for p in listings
+            ],
+        }
+
+    return search_cards, fetch_products
+
+
+SCENARIOS = [
+    # label, cards, rare, empty
+    ("6 common cards", 6, set(), set()),
+    ("1 rare (3 sellers) + 5 common", 6, {"卡0"}, set()),
+    ("1 unlisted + 5 common", 6, set(), {"卡0"}),
+]
+
+
+def run(card_requests, executor, prune: bool) -> tuple[dict, float, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    events = multi_search.multi_card_search_events(
+        card_requests, executor, listings=None if prune else {},
+    )
+    for event in events:
+        if event["type"] == "summary":
+            stats = event["stats"]
+    elapsed = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return stats, elapsed, peak / 2**20
+
+
+def main():
+    executor = ThreadPoolExecutor(max_workers=32)
+    print(f"{VARIANTS_PER_CARD} variants/card, {LISTINGS_PER_VARIANT} listings/variant")
+    print(f"{'scenario':<32}{'mode':<10}{'ms':>7}{'peak MiB':>10}{'peak lst':>10}"
+          f"{'fetches':>9}{'avoided':>9}{'matches':>9}")
+    for label, cards, rare, empty in SCENARIOS:
+        multi_search.search_cards, multi_search.fetch_products = make_upstream(rare, empty)
+        card_requests = [{"name": f"卡{c}", "quantity": 1} for c in range(cards)]
+        for prune in (False, True):
+            stats, elapsed, peak = run(card_requests, executor, prune)
+            pruning = stats["pruning"]
+            print(f"{label if not prune else '':<32}{'pruned' if prune else 'full':<10}"
+                  f"{elapsed:7.0f}{peak:10.1f}{pruning['peak_listings']:>10}"
+                  f"{stats['timings']['fetches']:>9}{pruning['fetches_avoided']:>9}"
+                  f"{stats['matching_sellers']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Closed-loop HTTP load generator for comparing serving setups.
+
+Each of ``--concurrency`` threads sends requests back to back on its own
+keep-alive session for ``--duration`` seconds; the report is throughput and
+latency percentiles over successful responses.
+
+    # dev server, as docker-compose used to run it
+    flask run --port 5001 --debug
+    # production entry point
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+    python -m benchmarks.bench_serving http://127.0.0.1:5001/api/health -c 16 -d 15
+    python -m benchmarks.bench_serving http://127.0.0.1:5001/api/watchlist \\
+        -H "Authorization: Bearer $TOKEN"
+
+/api/health measures the server alone; authenticated endpoints such as
+/api/notifications add the database and the connection pool to the
+picture. Profile at least one of each.
+"""
+import argparse
+import statistics
+import threading
+import time
+
+import requests
+
+
+def worker(url: str, headers: dict, deadline: float, latencies: list, errors: list):
+    session = requests.Session()
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = session.get(url, headers=headers, timeout=30)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - start
+        (latencies if ok else errors).append(elapsed)
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("url")
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("-d", "--duration", type=float, default=15.0)
+    parser.add_argument("-H", "--header", action="append", default=[],
+                        help='extra header, e.g. "Authorization: Bearer ..."')
+    args = parser.parse_args()
+
+    headers = dict(h.split(": ", 1) for h in args.header)
+    # Warm up connections and caches before measuring
+    requests.get(args.url, headers=headers, timeout=30)
+
+    latencies: list[float] = []
+    errors: list[float] = []
+    start = time.perf_counter()
+    deadline = start + args.duration
+    threads = [
+        threading.Thread(target=worker, args=(args.url, headers, deadline, latencies, errors))
+        for _ in range(args.concurrency)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"{args.url}  concurrency={args.concurrency}  duration={elapsed:.1f}s")
+    print(f"  requests   {len(latencies)} ok, {len(errors)} failed")
+    if latencies:
+        print(f"  throughput {len(latencies) / elapsed:.0f} req/s")
+        print(f"  latency    p50 {percentile(latencies, 50) * 1000:.1f} ms"
+              f"  p99 {percentile(latencies, 99) * 1000:.1f} ms"
+              f"  max {latencies[-1] * 1000:.1f} ms"
+              f"  mean {statistics.fmean(latencies) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark: importing a 1,000-card want list into a watchlist.
+
+Compares the old per-item path (duplicate-check SELECT, then INSERT) against
+``upsert_items``, for a fresh import and for re-importing the same list (all
+updates). Runs against the database configured by the PG_* environment
+variables inside a transaction that is rolled back, so nothing is kept.
+
+    python -m benchmarks.bench_watchlist_import
+"""
+import time
+
+from flask import Flask
+from sqlalchemy import event
+
+from app.config import Config
+from app.extensions import db
+from app.models import User, WatchlistItem
+from app.services.watchlist_import import upsert_items
+
+N = 1_000
+
+
+def want_list(target_price: int) -> list[dict]:
+    return [
+        {
+            "card_key": f"bench-card-{i}",
+            "card_name": f"Bench Card {i}",
+            "pack_id": f"P{i % 40}",
+            "pack_name": f"Bench Pack {i % 40}",
+            "pack_card_id": f"{i:03d}",
+            "rare": "RR",
+            "target_price": target_price,
+        }
+        for i in range(N)
+    ]
+
+
+def per_item(user_id: int, items_data: list[dict]):
+    """The previous add_items loop."""
+    for item_data in items_data:
+        existing = WatchlistItem.query.filter_by(
+            user_id=user_id,
+            card_key=item_data["card_key"],
+            rare=item_data["rare"],
+            pack_id=item_data.get("pack_id"),
+        ).first()
+        if existing:
+            existing.target_price = item_data["target_price"]
+            existing.target_price_min = item_data.get("target_price_min", 0)
+            existing.is_active = True
+            continue
+        db.session.add(WatchlistItem(user_id=user_id, **item_data))
+    db.session.flush()
+
+
+def run(label: str, fn, user_id: int, items_data: list[dict], counter: list[int]):
+    counter[0] = 0
+    start = time.perf_counter()
+    fn(user_id, items_data)
+    db.session.flush()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000:9.1f} ms   {counter[0]:5d} statements")
+
+
+def main():
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    db.init_app(app)
+
+    with app.app_context():
+        counter = [0]
+
+        @event.listens_for(db.engine, "before_cursor_execute")
+        def count(*args):
+            counter[0] += 1
+
+        users = []
+        for name in ("bench-per-item", "bench-upsert"):
+            user = User(nickname=name)
+            db.session.add(user)
+            users.append(user)
+        db.session.flush()
+
+        print(f"Importing {N} items\n")
+        try:
+            run("per-item, new", per_item, users[0].id, want_list(100), counter)
+            run("per-item, re-import", per_item, users[0].id, want_list(120), counter)
+            run("bulk upsert, new", upsert_items, users[1].id, want_list(100), counter)
+            run("bulk upsert, re-import", upsert_items, users[1].id, want_list(120), counter)
+        finally:
+            db.session.rollback()
+
+
+if __name__ == "__main__":
+    main()
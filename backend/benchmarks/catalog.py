@@ -0,0 +1,180 @@
+"""Deterministic synthetic catalog shared by the payload benchmarks.
+
+Builds response bodies shaped like the real endpoints (multi-search, card
+products, watchlist) from seeded random data, with CJK card names and the
+repetitive seller/condition fields real listings have.
+"""
+import random
+from datetime import datetime, timedelta
+
+from app.services.kapaipai import CONDITION_MAP
+
+CARD_NAMES = [
+    "喵喵ex", "皮卡丘ex", "噴火龍ex", "超夢ex", "耿鬼ex", "伊布", "沙奈朵ex", "路卡利歐ex",
+    "烈空坐ex", "快龍", "卡比獸", "夢幻ex", "暴鯉龍ex", "胡地", "拉普拉斯", "水君",
+]
+RARES = ["C", "U", "R", "RR", "AR", "SR", "SAR", "UR"]
+AREAS = ["台北市", "新北市", "桃園市", "台中市", "台南市", "高雄市", "新竹縣", "彰化縣"]
+CONDITIONS = list(CONDITION_MAP)
+
+
+def _rng(seed: int) -> random.Random:
+    return random.Random(seed)
+
+
+def sellers(n: int = 400, seed: int = 1) -> list[dict]:
+    rng = _rng(seed)
+    return [
+        {
+            "seller_id": 10_000 + i,
+            "seller_nickname": f"卡牌小舖{i:03d}",
+            "seller_area": rng.choice(AREAS),
+            "credit": rng.randint(0, 2000),
+            "order_complete": rng.randint(0, 5000),
+        }
+        for i in range(n)
+    ]
+
+
+def variants(n: int = 40, seed: int = 2) -> list[dict]:
+    rng = _rng(seed)
+    return [
+        {
+            "card_key": f"pkmtw-{i:04d}",
+            "card_name": rng.choice(CARD_NAMES),
+            "rare": rng.choice(RARES),
+            "pack_id": f"M{rng.randint(1, 9)}",
+            "pack_card_id": f"{rng.randint(1, 200):03d}",
+            "pack_name": f"擴充包 第{rng.randint(1, 9)}彈",
+        }
+        for i in range(n)
+    ]
+
+
+def products(variant: dict, seller_pool: list[dict], n: int = 120, seed: int = 3) -> list[dict]:
+    """Buyable listings for ``variant``, in ``filter_buyable`` output format."""
+    rng = _rng(seed)
+    base = rng.randint(20, 3000)
+    listings = []
+    for i, seller in enumerate(rng.sample(seller_pool, min(n, len(seller_pool)))):
+        condition = rng.choice(CONDITIONS)
+        listings.append({
+            "id": seed * 100_000 + i,
+            "seller_id": seller["seller_id"],
+            "price": int(base * rng.uniform(0.8, 1.6)),
+            "stock": rng.randint(1, 8),
+            "condition": condition,
+            "condition_label": CONDITION_MAP[condition],
+            "seller_nickname": seller["seller_nickname"],
+            "seller_area": seller["seller_area"],
+            "credit": seller["credit"],
+            "order_complete": seller["order_complete"],
+            "pack_name": variant["pack_name"],
+        })
+    return sorted(listings, key=lambda x: (x["price"], -x["credit"]))
+
+
+def products_payload(n: int = 300, seed: int = 4) -> dict:
+    """Body of GET /api/cards/products for a popular card."""
+    variant = variants(1, seed)[0]
+    buyable = products(variant, sellers(), n, seed)
+    prices = [p["price"] for p in buyable]
+    return {
+        "data": {
+            "products": buyable,
+            "total": len(buyable),
+            "buyable_count": len(buyable),
+            "lowest_price": min(prices),
+            "avg_price": round(sum(prices) / len(prices), 2),
+        }
+    }
+
+
+def multi_search_payload(cards: int = 5, matching_sellers: int = 150, seed: int = 5) -> dict:
+    """Body of POST /api/cards/multi-search with ``matching_sellers`` results."""
+    rng = _rng(seed)
+    pool = sellers()
+    names = rng.sample(CARD_NAMES, cards)
+    card_variants = variants(cards * 4, seed)
+    for i, variant in enumerate(card_variants):
+        variant["card_name"] = names[i // 4]
+
+    result_sellers = []
+    for seller in rng.sample(pool, matching_sellers):
+        cards_info = {}
+        total_cost = 0
+        for c, name in enumerate(names):
+            variant = card_variants[c * 4 + rng.randrange(4)]
+            listing = products(variant, [seller], 1, rng.randrange(1_000_000))
+            listing = [
+                dict(p, card_name=variant["card_name"], card_key=variant["card_key"],
+                     pack_id=variant["pack_id"], pack_card_id=variant["pack_card_id"],
+                     variant_pack_name=variant["pack_name"], variant_rare=variant["rare"])
+                for p in listing * rng.randint(1, 4)
+            ]
+            cost = sum(p["price"] for p in listing)
+            total_cost += cost
+            cards_info[name] = {
+                "total_stock": sum(p["stock"] for p in listing),
+                "lowest_price": listing[0]["price"],
+                "estimated_cost": cost,
+                "products": listing,
+                "found_card_names": [variant["card_name"]],
+            }
+        result_sellers.append({
+            "seller_nickname": seller["seller_nickname"],
+            "seller_area": seller["seller_area"],
+            "credit": seller["credit"],
+            "order_complete": seller["order_complete"],
+            "cards": cards_info,
+            "total_cost": total_cost,
+        })
+    result_sellers.sort(key=lambda s: s["total_cost"])
+
+    return {
+        "data": {
+            "sellers": result_sellers,
+            "card_details": {name: {"variants_count": 4, "error": None} for name in names},
+            "stats": {
+                "total_sellers_scanned": len(pool),
+                "matching_sellers": matching_sellers,
+                "cards_requested": cards,
+            },
+        }
+    }
+
+
+def watchlist_payload(items: int = 300, seed: int = 6) -> dict:
+    """Body of GET /api/watchlist for a user watching ``items`` cards."""
+    rng = _rng(seed)
+    now = datetime(2026, 10, 1, 12, 0, 0)
+    data = []
+    for i, variant in enumerate(variants(items, seed)):
+        target = rng.randint(50, 3000)
+        created = now - timedelta(days=rng.randint(0, 700))
+        lowest = int(target * rng.uniform(0.7, 1.5))
+        data.append({
+            "id": i + 1,
+            "user_id": 1,
+            "card_key": variant["card_key"],
+            "card_name": variant["card_name"],
+            "pack_id": variant["pack_id"],
+            "pack_name": variant["pack_name"],
+            "pack_card_id": variant["pack_card_id"],
+            "rare": variant["rare"],
+            "target_price": target,
+            "target_price_min": 0,
+            "is_active": True,
+            "created_at": created.isoformat(),
+            "updated_at": created.isoformat(),
+            "latest_snapshot": {
+                "id": 1_000_000 + i,
+                "watchlist_item_id": i + 1,
+                "lowest_price": lowest,
+                "avg_price": round(lowest * rng.uniform(1.0, 1.3), 2),
+                "buyable_count": rng.randint(0, 80),
+                "total_count": rng.randint(0, 120),
+                "checked_at": now.isoformat(),
+            },
+        })
+    return {"data": data}
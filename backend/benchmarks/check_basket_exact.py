@@ -0,0 +1,72 @@
+"""Check the basket solver's exact search against brute force.
+
+Each random instance is small enough to enumerate every seller set of size
+at most ``max_sellers``. Brute force prices each set with ``_allocate``
+instead of the solver's matrices, and ranks plans as the solver does:
+fewest unfilled units first, then the lowest total cost. The solver gets a
+generous budget, so it must finish (``optimal``) and match that cost.
+
+    python -m benchmarks.check_basket_exact [instances] [seed]
+"""
+import random
+import sys
+from itertools import combinations
+
+from app.services.basket import _allocate, solve_basket
+
+TIME_BUDGET = 5.0
+
+
+def random_instance(rng: random.Random):
+    """Up to 5 cards and 9 sellers, at least one of which has a listing."""
+    while True:
+        demands, offers = _random_offers(rng)
+        if any(offers.values()):
+            return demands, offers, rng.choice([0, 30, 60, 200]), rng.randint(1, 4)
+
+
+def _random_offers(rng: random.Random):
+    cards = rng.randint(1, 5)
+    sellers = rng.randint(1, 9)
+    demands = {f"card{c}": rng.randint(1, 3) for c in range(cards)}
+    offers = {card: {} for card in demands}
+    for s in range(sellers):
+        for card in demands:
+            if rng.random() < 0.5:
+                offers[card][f"seller{s}"] = [
+                    {"price": rng.randint(50, 500), "stock": rng.randint(1, 3), "credit": 0}
+                    for _ in range(rng.randint(1, 2))
+                ]
+    return demands, offers
+
+
+def brute_force(demands, offers, fixed_cost, max_sellers) -> tuple[int, float]:
+    sellers = sorted({s for card in demands for s in offers[card]})
+    best = None
+    for size in range(min(max_sellers, len(sellers)) + 1):
+        for subset in combinations(sellers, size):
+            plan = _allocate(list(subset), demands, offers, fixed_cost)
+            key = (sum(plan["unfilled"].values()), plan["total_cost"])
+            if best is None or key < best:
+                best = key
+    return best
+
+
+def main():
+    instances = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    rng = random.Random(int(sys.argv[2]) if len(sys.argv) > 2 else 7)
+    failures = 0
+    for i in range(instances):
+        demands, offers, fixed_cost, max_sellers = random_instance(rng)
+        plan = solve_basket(demands, offers, fixed_cost, max_sellers, time_budget=TIME_BUDGET)
+        got = (sum(plan["unfilled"].values()), plan["total_cost"])
+        want = brute_force(demands, offers, fixed_cost, max_sellers)
+        if not plan["optimal"] or got[0] != want[0] or abs(got[1] - want[1]) > 1e-6:
+            failures += 1
+            print(f"instance {i}: solver {got} optimal={plan['optimal']}, brute force {want}")
+    print(f"{instances - failures}/{instances} instances match brute force")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Gunicorn settings for the API; every value can be overridden from the environment.
+
+Threaded workers suit this app: requests mostly wait on the kapaipai API
+or Postgres. Each worker has its own SQLAlchemy pool (DB_POOL_SIZE), so
+keep it at least GUNICORN_THREADS.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5001")
+worker_class = "gthread"
+workers = int(os.getenv("GUNICORN_WORKERS", str(min(multiprocessing.cpu_count() * 2, 8))))
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+
+# Multi-search fans out to dozens of upstream calls; give it room
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Recycle workers now and then; jitter keeps them from restarting together
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "5000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "500"))
+
+# Queued LINE webhook events were already acknowledged; give them this long
+# to finish when a worker is recycled or the server stops
+webhook_drain_seconds = float(os.getenv("GUNICORN_WEBHOOK_DRAIN_SECONDS", "20"))
+
+# Set GUNICORN_ACCESS_LOG= (empty) to turn access logging off
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-") or None
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def worker_exit(server, worker):
+    from app.services.line_webhook import shutdown_consumer
+    shutdown_consumer(timeout=webhook_drain_seconds)
@@ -6,11 +6,12 @@ import type {
   Product,
   MultiSearchCardRequest,
   MultiSearchResult,
+  MultiSearchEvent,
 } from "../types";
 
 const BASE = "/api";
 
-async function request<T>(url: string, options?: RequestInit): Promise<T> {
+async function send(url: string, options?: RequestInit): Promise<Response> {
   const token = localStorage.getItem("auth_token");
   const headers: Record<string, string> = {
     "Content-Type": "application/json",
@@ -32,6 +33,11 @@ async function request<T>(url: string, options?: RequestInit): Promise<T> {
     const err = await resp.json().catch(() => ({ error: resp.statusText }));
     throw new Error(err.error || resp.statusText);
   }
+  return resp;
+}
+
+async function request<T>(url: string, options?: RequestInit): Promise<T> {
+  const resp = await send(url, options);
   return resp.json();
 }
 
@@ -124,6 +130,35 @@ export async function multiCardSearch(cards: MultiSearchCardRequest[]) {
   });
 }
 
+// Streaming multi-card search: calls onEvent for each NDJSON event line
+export async function streamMultiCardSearch(
+  cards: MultiSearchCardRequest[],
+  onEvent: (event: MultiSearchEvent) => void,
+  signal?: AbortSignal,
+) {
+  const resp = await send("/cards/multi-search/stream", {
+    method: "POST",
+    body: JSON.stringify({ cards }),
+    signal,
+  });
+  if (!resp.body) throw new Error("Streaming not supported");
+
+  const reader = resp.body.getReader();
+  const decoder = new TextDecoder();
+  let buffered = "";
+  for (;;) {
+    const { done, value } = await reader.read();
+    buffered += decoder.decode(value, { stream: !done });
+    const lines = buffered.split("\n");
+    buffered = lines.pop() ?? "";
+    for (const line of lines) {
+      if (line.trim()) onEvent(JSON.parse(line) as MultiSearchEvent);
+    }
+    if (done) break;
+  }
+  if (buffered.trim()) onEvent(JSON.parse(buffered) as MultiSearchEvent);
+}
+
 // LINE binding
 export async function updateLineBinding(line_user_id: string) {
   return request<{ user: import("../types").AuthUser }>("/auth/line-binding", {
@@ -132,6 +167,13 @@ export async function updateLineBinding(line_user_id: string) {
   });
 }
 
+export async function updateSettings(settings: { alert_digest?: boolean }) {
+  return request<{ user: import("../types").AuthUser }>("/auth/settings", {
+    method: "PATCH",
+    body: JSON.stringify(settings),
+  });
+}
+
 export async function generateLineBindingCode() {
   return request<{ code: string; bot_url: string }>("/auth/line-binding/code", {
     method: "POST",
@@ -139,8 +181,10 @@ export async function generateLineBindingCode() {
 }
 
 // Notifications
-export async function getNotifications(limit = 50) {
-  return request<{ data: NotificationRecord[] }>(
-    `/notifications?limit=${limit}`,
+export async function getNotifications(limit = 50, cursor?: string | null) {
+  const params = new URLSearchParams({ limit: String(limit) });
+  if (cursor) params.set("cursor", cursor);
+  return request<{ data: NotificationRecord[]; next_cursor: string | null }>(
+    `/notifications?${params}`,
   );
 }
@@ -2,16 +2,21 @@ import { useState, useEffect } from "react";
 import type { NotificationRecord } from "../types";
 import { getNotifications } from "../api/client";
 
+const PAGE_SIZE = 50;
+
 export default function HistoryPage() {
   const [notifications, setNotifications] = useState<NotificationRecord[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState("");
 
   useEffect(() => {
     async function load() {
       try {
-        const res = await getNotifications(100);
+        const res = await getNotifications(PAGE_SIZE);
         setNotifications(res.data);
+        setNextCursor(res.next_cursor);
       } catch (e) {
         setError(e instanceof Error ? e.message : "載入失敗");
       } finally {
@@ -21,6 +26,20 @@ export default function HistoryPage() {
     load();
   }, []);
 
+  async function loadMore() {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const res = await getNotifications(PAGE_SIZE, nextCursor);
+      setNotifications((prev) => [...prev, ...res.data]);
+      setNextCursor(res.next_cursor);
+    } catch (e) {
+      setError(e instanceof Error ? e.message : "載入失敗");
+    } finally {
+      setLoadingMore(false);
+    }
+  }
+
   function formatTime(iso: string) {
     return new Date(iso).toLocaleString("zh-TW", {
       year: "numeric",
@@ -100,7 +119,7 @@ export default function HistoryPage() {
             <div
               key={notif.id}
               className="card-frame p-4 animate-slide-up"
-              style={{ animationDelay: `${i * 40}ms` }}
+              style={{ animationDelay: `${(i % PAGE_SIZE) * 40}ms` }}
             >
               <div className="flex items-start gap-3 md:gap-4">
                 {/* Icon */}
@@ -108,10 +127,12 @@ export default function HistoryPage() {
                   className={`mt-0.5 w-9 h-9 rounded-lg flex items-center justify-center shrink-0 ${
                     notif.status === "sent"
                       ? "bg-emerald-50 text-emerald-600"
-                      : "bg-red-50 text-red-600"
+                      : notif.status === "queued"
+                        ? "bg-amber-50 text-amber-600"
+                        : "bg-red-50 text-red-600"
                   }`}
                 >
-                  {notif.status === "sent" ? (
+                  {notif.status !== "failed" ? (
                     <svg
                       className="w-4.5 h-4.5"
                       fill="none"
@@ -157,10 +178,16 @@ export default function HistoryPage() {
                       className={`badge text-[10px] ${
                         notif.status === "sent"
                           ? "bg-emerald-50 text-emerald-600 border border-emerald-200"
-                          : "bg-red-50 text-red-600 border border-red-200"
+                          : notif.status === "queued"
+                            ? "bg-amber-50 text-amber-600 border border-amber-200"
+                            : "bg-red-50 text-red-600 border border-red-200"
                       }`}
                     >
-                      {notif.status === "sent" ? "已發送" : "發送失敗"}
+                      {notif.status === "sent"
+                        ? "已發送"
+                        : notif.status === "queued"
+                          ? "發送中"
+                          : "發送失敗"}
                     </span>
                   </div>
 
@@ -195,6 +222,18 @@ export default function HistoryPage() {
               </div>
             </div>
           ))}
+
+          {nextCursor && (
+            <div className="flex justify-center pt-2">
+              <button
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="btn-ghost text-sm"
+              >
+                {loadingMore ? "載入中..." : "載入更多"}
+              </button>
+            </div>
+          )}
         </div>
       )}
     </div>
@@ -1,6 +1,10 @@
 import { useState, useEffect, useRef, useCallback } from "react";
 import { useAuth } from "../contexts/AuthContext";
-import { generateLineBindingCode, updateLineBinding } from "../api/client";
+import {
+  generateLineBindingCode,
+  updateLineBinding,
+  updateSettings,
+} from "../api/client";
 
 const CODE_TTL_SECONDS = 300; // 5 minutes
 
@@ -13,6 +17,7 @@ export default function LineBindingPage() {
   const [error, setError] = useState("");
   const [toast, setToast] = useState("");
   const [unbinding, setUnbinding] = useState(false);
+  const [savingDigest, setSavingDigest] = useState(false);
   const pollRef = useRef<ReturnType<typeof setInterval> | null>(null);
   const timerRef = useRef<ReturnType<typeof setInterval> | null>(null);
 
@@ -98,6 +103,19 @@ export default function LineBindingPage() {
     }
   }
 
+  async function handleToggleDigest() {
+    setSavingDigest(true);
+    setError("");
+    try {
+      await updateSettings({ alert_digest: !user?.alert_digest });
+      await refreshUser();
+    } catch (e) {
+      setError(e instanceof Error ? e.message : "更新設定失敗");
+    } finally {
+      setSavingDigest(false);
+    }
+  }
+
   const formatCountdown = (s: number) => {
     const m = Math.floor(s / 60);
     const sec = s % 60;
@@ -152,6 +170,21 @@ export default function LineBindingPage() {
           <p className="text-sm text-gray-500">
             到價通知會自動發送到你的 LINE，你可以隨時解除綁定。
           </p>
+          <label className="flex items-start gap-3 cursor-pointer">
+            <input
+              type="checkbox"
+              checked={!!user!.alert_digest}
+              onChange={handleToggleDigest}
+              disabled={savingDigest}
+              className="mt-0.5 accent-amber-500"
+            />
+            <span>
+              <span className="block text-sm text-gray-700">合併通知</span>
+              <span className="block text-xs text-gray-400">
+                同一次檢查中到價的卡片合併成一則輪播訊息
+              </span>
+            </span>
+          </label>
           <button
             onClick={handleUnbind}
             disabled={unbinding}
@@ -1,11 +1,11 @@
-import { useState, useMemo } from "react";
+import { useState, useMemo, useRef } from "react";
 import type {
   MultiSearchCardRequest,
   MultiSearchResult,
   SellerMatch,
   SellerCardDetail,
 } from "../types";
-import { multiCardSearch } from "../api/client";
+import { streamMultiCardSearch } from "../api/client";
 
 type SortKey = "total_cost" | "credit" | "order_complete";
 
@@ -22,6 +22,12 @@ export default function MultiSearchPage() {
   const [inputValue, setInputValue] = useState("");
   const [result, setResult] = useState<MultiSearchResult | null>(null);
   const [loading, setLoading] = useState(false);
+  const [progress, setProgress] = useState({
+    cardsSearched: 0,
+    fetched: 0,
+    fetchTotal: 0,
+  });
+  const searchAbort = useRef<AbortController | null>(null);
   const [error, setError] = useState("");
   const [sortBy, setSortBy] = useState<SortKey>("total_cost");
   const [expandedSellers, setExpandedSellers] = useState<Set<string>>(
@@ -64,20 +70,75 @@ export default function MultiSearchPage() {
 
   async function doSearch(searchTags: MultiSearchCardRequest[]) {
     if (searchTags.length < 1) return;
+    // A newer search replaces any that is still streaming
+    searchAbort.current?.abort();
+    const controller = new AbortController();
+    searchAbort.current = controller;
+
     setLoading(true);
     setError("");
     setSearched(true);
+    setResult(null);
+    setProgress({ cardsSearched: 0, fetched: 0, fetchTotal: 0 });
     setExpandedSellers(new Set());
     setPackFilters({});
     setRareFilters({});
+
+    // Sellers arrive (and are re-sent with better prices) while fetches complete
+    const sellers = new Map<string, SellerMatch>();
+    const cardDetails: MultiSearchResult["card_details"] = {};
     try {
-      const res = await multiCardSearch(searchTags);
-      setResult(res.data);
+      await streamMultiCardSearch(
+        searchTags,
+        (event) => {
+          switch (event.type) {
+            case "search":
+              cardDetails[event.card] = {
+                variants_count: event.variants_count,
+                error: event.error,
+              };
+              setProgress((p) => ({ ...p, cardsSearched: p.cardsSearched + 1 }));
+              break;
+            case "fetch":
+              setProgress((p) => ({
+                ...p,
+                fetched: event.done,
+                fetchTotal: event.total,
+              }));
+              break;
+            case "seller":
+              sellers.set(event.seller.seller_nickname, event.seller);
+              setResult({
+                sellers: [...sellers.values()],
+                card_details: { ...cardDetails },
+                stats: {
+                  total_sellers_scanned: 0,
+                  matching_sellers: sellers.size,
+                  cards_requested: searchTags.length,
+                },
+              });
+              break;
+            case "summary":
+              setResult({
+                sellers: event.seller_order
+                  .map((nickname) => sellers.get(nickname))
+                  .filter((s): s is SellerMatch => s !== undefined),
+                card_details: event.card_details,
+                stats: event.stats,
+              });
+              break;
+            case "error":
+              throw new Error(event.error);
+          }
+        },
+        controller.signal,
+      );
     } catch (e) {
+      if (controller.signal.aborted) return;
       setError(e instanceof Error ? e.message : "搜尋失敗");
       setResult(null);
     } finally {
-      setLoading(false);
+      if (searchAbort.current === controller) setLoading(false);
     }
   }
 
@@ -461,25 +522,30 @@ export default function MultiSearchPage() {
           </svg>
           <p className="text-gray-500">正在搜尋共同賣家…</p>
           <p className="text-xs text-gray-400 mt-1">
-            搜尋 {tags.length} 張卡牌的所有版本，可能需要 10-30 秒
+            {progress.fetchTotal > 0
+              ? `已查詢 ${progress.fetched} / ${progress.fetchTotal} 個版本`
+              : `已搜尋 ${progress.cardsSearched} / ${tags.length} 張卡牌`}
+            {result && `，目前找到 ${result.sellers.length} 位賣家`}
           </p>
         </div>
       )}
 
       {/* Results */}
-      {result && !loading && (
+      {result && (
         <div className="space-y-4 animate-fade-in">
           {/* Stats bar */}
           <div className="card-frame px-4 py-3">
             <div className="flex flex-col md:flex-row md:items-center md:justify-between gap-2">
               <div className="flex items-center gap-4 text-sm">
-                <span className="text-gray-500">
-                  掃描{" "}
-                  <span className="font-mono text-gray-700">
-                    {result.stats.total_sellers_scanned}
-                  </span>{" "}
-                  位賣家
-                </span>
+                {!loading && (
+                  <span className="text-gray-500">
+                    掃描{" "}
+                    <span className="font-mono text-gray-700">
+                      {result.stats.total_sellers_scanned}
+                    </span>{" "}
+                    位賣家
+                  </span>
+                )}
                 <span className="text-gray-500">
                   找到{" "}
                   <span className="font-mono text-amber-600">
@@ -794,7 +860,7 @@ export default function MultiSearchPage() {
           ))}
 
           {/* Empty result */}
-          {displaySellers.length === 0 && (
+          {displaySellers.length === 0 && !loading && (
             <div className="card-frame p-12 text-center">
               <div className="w-16 h-16 mx-auto mb-4 rounded-full bg-gray-100 flex items-center justify-center">
                 <svg
@@ -7,6 +7,7 @@ export interface AuthUser {
   is_admin: boolean;
   line_user_id: string | null;
   line_display_name: string | null;
+  alert_digest: boolean;
   created_at: string;
 }
 
@@ -66,7 +67,7 @@ export interface NotificationRecord {
   triggered_price: number;
   target_price: number;
   message: string;
-  status: "sent" | "failed";
+  status: "queued" | "sent" | "failed";
   sent_at: string;
   card_name: string | null;
   rare: string | null;
@@ -114,5 +115,55 @@ export interface MultiSearchResult {
     total_sellers_scanned: number;
     matching_sellers: number;
     cards_requested: number;
+    timings?: {
+      total_ms: number;
+      search_ms: number;
+      fetch_ms: number;
+      aggregate_ms: number;
+      slowest_search_ms: number;
+      slowest_fetch_ms: number;
+      critical_path_ms: number;
+      fetches: number;
+    };
+    pruning?: {
+      enabled: boolean;
+      fetches_avoided: number;
+      listings_skipped: number;
+      listings_dropped: number;
+      peak_listings: number;
+    };
   };
 }
+
+export type MultiSearchEvent =
+  | {
+      type: "search";
+      card: string;
+      variants_count: number;
+      error: string | null;
+    }
+  | {
+      type: "fetch";
+      card: string;
+      card_key: string;
+      rare: string;
+      pack_id: string | null;
+      done: number;
+      total: number;
+      error: string | null;
+    }
+  | {
+      type: "candidates";
+      card: string;
+      cards_complete: number;
+      cards_total: number;
+      candidates: number;
+    }
+  | { type: "seller"; seller: SellerMatch }
+  | {
+      type: "summary";
+      seller_order: string[];
+      card_details: MultiSearchResult["card_details"];
+      stats: MultiSearchResult["stats"];
+    }
+  | { type: "error"; error: string };